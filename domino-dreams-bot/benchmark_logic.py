@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Decision Benchmark
+Times GameLogic's move selection on synthetic boards of increasing size.
+No iPhone or screenshots needed.
+
+Usage:
+    python benchmark_logic.py
+    python benchmark_logic.py --sizes 100 300 1000 --repeat 500
+"""
+
+import argparse
+import os
+import random
+import time
+from typing import List
+
+import yaml
+
+from benchmark_vision import summarize
+from game_logic import GameLogic
+from game_vision import BoundingBox, Domino, GameScreen, GameState
+
+
+def synthetic_board(count: int, screen_w: int, screen_h: int, seed: int = 0) -> List[Domino]:
+    """`count` upright dominoes laid out in a grid over the board area (points)."""
+    rng = random.Random(seed)
+    left, top = int(screen_w * 0.03), int(screen_h * 0.12)
+    width, height = int(screen_w * 0.94), int(screen_h * 0.68)
+
+    cols = max(1, int((count * width / height / 2) ** 0.5))
+    rows = -(-count // cols)
+    cell_w, cell_h = width / cols, height / rows
+    dominoes = []
+    for i in range(count):
+        w, h = max(2, int(cell_w * 0.7)), max(4, int(cell_h * 0.7))
+        dominoes.append(Domino(
+            bbox=BoundingBox(x=int(left + (i % cols) * cell_w), y=int(top + (i // cols) * cell_h), w=w, h=h),
+            top_value=rng.randint(0, 6),
+            bottom_value=rng.randint(0, 6),
+            is_playable=True,
+            is_highlighted=rng.random() < 0.05,
+            track_id=i,
+        ))
+    return dominoes
+
+
+def time_ms(fn, repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GameLogic move selection")
+    parser.add_argument("--config", "-c", default="config.yaml")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200, 500])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    config_path = args.config
+    if not os.path.isabs(config_path):
+        config_path = os.path.join(os.path.dirname(__file__), config_path)
+    with open(config_path, "r") as f:
+        config = yaml.safe_load(f)
+
+    logic = GameLogic(config)
+    for size in args.sizes:
+        dominoes = synthetic_board(size, logic.screen_w, logic.screen_h)
+        targets = [d.bbox for d in dominoes]
+
+        def pick():
+            # A new state each time, so the board index is rebuilt as it is per frame
+            state = GameState(screen=GameScreen.GAMEPLAY, dominoes=dominoes)
+            logic._pick_strategic_domino(dominoes, state)
+
+        print(f"\n{size} dominoes")
+        print(f"  {'_pick_strategic_domino':24} {summarize(time_ms(pick, args.repeat))}")
+        print(f"  {'_pick_best_target':24} "
+              f"{summarize(time_ms(lambda: logic._pick_best_target(targets), args.repeat))}")
+
+        if logic.search is not None:
+            def search():
+                state = GameState(screen=GameScreen.GAMEPLAY, dominoes=dominoes)
+                logic._search_domino(dominoes, state)
+
+            # Runs to its time budget, so fewer repeats
+            samples = time_ms(search, max(1, args.repeat // 20))
+            print(f"  {'_search_domino':24} {summarize(samples)} "
+                  f"({logic.search.last_rollouts} rollouts)")
+    logic.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Vision Benchmark
+Times GameVision over a folder of saved screenshots, per frame and per
+detector, and can write a cProfile dump for deeper digging.
+
+Usage:
+    python benchmark_vision.py                        # uses bot.screenshot_dir
+    python benchmark_vision.py calibration/ --repeat 5
+    python benchmark_vision.py screenshots/ --profile vision.prof
+"""
+
+import argparse
+import cProfile
+import functools
+import os
+import pstats
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import cv2
+import numpy as np
+import yaml
+
+from game_vision import GameVision
+
+# Detector methods timed individually (times are inclusive of nested detectors)
+DETECTORS = [
+    "_detect_screen",
+    "_detect_dominoes",
+    "_find_tap_targets",
+    "_find_button_by_color",
+    "_find_x_button",
+    "_detect_stars",
+    "_detect_chain",
+    "_find_glowing_elements",
+    "_find_any_buttons",
+]
+
+
+def instrument(vision: GameVision) -> Dict[str, List[float]]:
+    """Wrap the detectors of `vision` so every call records its time in ms."""
+    timings: Dict[str, List[float]] = {name: [] for name in DETECTORS}
+
+    for name in DETECTORS:
+        method = getattr(vision, name)
+
+        @functools.wraps(method)
+        def timed(*args, _method=method, _samples=timings[name], **kwargs):
+            start = time.perf_counter()
+            try:
+                return _method(*args, **kwargs)
+            finally:
+                _samples.append((time.perf_counter() - start) * 1000)
+
+        setattr(vision, name, timed)
+    return timings
+
+
+def load_screenshots(folder: Path) -> List[np.ndarray]:
+    frames = []
+    for path in sorted(folder.glob("*.png")):
+        frame = cv2.imread(str(path), cv2.IMREAD_COLOR)
+        if frame is not None:
+            frames.append(frame)
+    return frames
+
+
+def summarize(samples: List[float]) -> str:
+    return (f"n={len(samples):<5} mean={np.mean(samples):7.2f}ms  "
+            f"p50={np.percentile(samples, 50):7.2f}ms  p95={np.percentile(samples, 95):7.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GameVision on saved screenshots")
+    parser.add_argument("folder", nargs="?", help="Folder of PNG screenshots (default: bot.screenshot_dir)")
+    parser.add_argument("--config", "-c", default="config.yaml")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the folder")
+    parser.add_argument("--profile", help="Write cProfile stats to this file")
+    args = parser.parse_args()
+
+    config_path = args.config
+    if not os.path.isabs(config_path):
+        config_path = os.path.join(os.path.dirname(__file__), config_path)
+    with open(config_path, "r") as f:
+        config = yaml.safe_load(f)
+
+    folder = Path(args.folder or config["bot"]["screenshot_dir"])
+    frames = load_screenshots(folder)
+    if not frames:
+        print(f"No PNG screenshots found in {folder}")
+        sys.exit(1)
+    print(f"Benchmarking {len(frames)} screenshots x {args.repeat} passes")
+
+    vision = GameVision(config)
+    timings = instrument(vision)
+    frame_times = []
+
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    for _ in range(args.repeat):
+        for frame in frames:
+            # Full analysis every time: no unchanged-frame reuse or animation check
+            vision.reset()
+            start = time.perf_counter()
+            vision.analyze(frame)
+            frame_times.append((time.perf_counter() - start) * 1000)
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+
+    print(f"\n{'analyze':24} {summarize(frame_times)}")
+    for name, samples in timings.items():
+        if samples:
+            print(f"{name:24} {summarize(samples)}")
+
+    if profiler:
+        print(f"\nProfile written to {args.profile}. Top functions by cumulative time:")
+        pstats.Stats(args.profile).sort_stats("cumulative").print_stats(15)
+
+
+if __name__ == "__main__":
+    main()
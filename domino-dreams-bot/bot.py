@@ -8,6 +8,8 @@ Usage:
     python bot.py --config my.yaml # Run with custom config
     python bot.py --calibrate      # Run calibration mode
     python bot.py --dry-run        # Analyze screen without sending taps
+    python bot.py --fake-device screenshots/  # Play back saved screenshots instead of an iPhone
+    python bot.py --replay screenshots/       # Score vision and timing on saved screenshots
 """
 
 import argparse
@@ -22,7 +24,10 @@ from pathlib import Path
 import yaml
 import numpy as np
 
+from capture import FolderFrameSource
 from ios_device import iOSDevice
+from pipeline import AnalysisPipeline
+from replay import run_replay
 from game_vision import GameVision, GameScreen, GameState
 from game_logic import GameLogic, Action, BotAction
 
@@ -124,18 +129,22 @@ def run_calibration(device: iOSDevice, config: dict):
 class DominoDreamsBot:
     """Main bot controller that orchestrates the game-playing loop."""
 
-    def __init__(self, config: dict, dry_run: bool = False):
+    def __init__(self, config: dict, dry_run: bool = False, frame_source=None):
         self.config = config
         self.dry_run = dry_run
         self.logger = logging.getLogger("domino_bot.main")
 
-        self.device = iOSDevice(config)
+        self.device = iOSDevice(config, frame_source=frame_source)
         self.vision = GameVision(config)
         self.logic = GameLogic(config)
 
         self.running = False
         self.start_time = None
         self.frame_count = 0
+        self.action_count = 0
+        self.pipelined = config["bot"].get("pipeline", True)
+        self._last_screen = GameScreen.UNKNOWN
+        self._out_of_lives_time = None
         self.screenshot_dir = Path(config["bot"]["screenshot_dir"])
 
         if config["bot"]["save_screenshots"]:
@@ -173,18 +182,21 @@ class DominoDreamsBot:
 
     def _run_loop(self):
         """Main bot loop: screenshot -> analyze -> decide -> act."""
-        poll_interval = self.config["timing"]["poll_interval"]
-        level_wait = self.config["timing"]["level_complete_wait"]
-        chapter_wait = self.config["timing"]["chapter_transition_wait"]
+        if self.pipelined:
+            self._run_pipelined()
+        else:
+            self._run_sequential()
 
-        last_screen = GameScreen.UNKNOWN
-        out_of_lives_time = None
+    def _run_sequential(self):
+        """One stage at a time, checking the screen every poll_interval."""
+        poll_interval = self.config["timing"]["poll_interval"]
 
         while self.running:
             loop_start = time.time()
             self.frame_count += 1
 
-            # 1. Capture screenshot
+            # 1. Capture screenshot, once the last action has taken effect
+            self.device.flush_actions()
             frame = self.device.screenshot()
             if frame is None:
                 self.logger.warning("Screenshot failed, retrying...")
@@ -194,50 +206,8 @@ class DominoDreamsBot:
             # 2. Analyze game state
             state = self.vision.analyze(frame)
 
-            # 3. Log screen transitions
-            if state.screen != last_screen:
-                self.logger.info(f"Screen: {state.screen.name}")
-                last_screen = state.screen
-
-                # Save screenshot on screen transitions
-                if self.config["bot"]["save_screenshots"]:
-                    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    path = self.screenshot_dir / f"{ts}_{state.screen.name}.png"
-                    self.device.save_screenshot(str(path), frame)
-
-            # 4. Handle out-of-lives waiting
-            if state.screen == GameScreen.OUT_OF_LIVES:
-                if out_of_lives_time is None:
-                    out_of_lives_time = datetime.now()
-                    self.logger.info(
-                        "Out of lives. Bot will wait for lives to refill. "
-                        "You can also manually add lives."
-                    )
-
-                # After dismissing the popup, wait for lives to refill
-                elapsed = (datetime.now() - out_of_lives_time).total_seconds()
-                if elapsed > 30:
-                    # Try to continue - lives may have refilled
-                    out_of_lives_time = None
-
-            if state.screen != GameScreen.OUT_OF_LIVES:
-                out_of_lives_time = None
-
-            # 5. Decide action
-            action = self.logic.decide(state)
-
-            # 6. Execute action
-            if not self.dry_run:
-                self._execute_action(action)
-            else:
-                if action.action != Action.WAIT and action.action != Action.NONE:
-                    self.logger.info(f"[DRY RUN] Would: {action.description}")
-
-            # 7. Extra wait for transitions
-            if state.screen == GameScreen.LEVEL_COMPLETE:
-                time.sleep(level_wait)
-            elif state.screen == GameScreen.CHAPTER_COMPLETE:
-                time.sleep(chapter_wait)
+            # 3-7. Decide and act
+            self._step(frame, state)
 
             # 8. Status update every 50 frames
             if self.frame_count % 50 == 0:
@@ -248,6 +218,90 @@ class DominoDreamsBot:
             if elapsed < poll_interval:
                 time.sleep(poll_interval - elapsed)
 
+    def _run_pipelined(self):
+        """
+        Capture and analysis run ahead on their own threads; the loop acts
+        on the first new state seen after its previous action finished, and
+        only falls back to poll_interval when the screen stays the same.
+        """
+        poll_interval = self.config["timing"]["poll_interval"]
+        pipeline = AnalysisPipeline(self.device, self.vision)
+        pipeline.start()
+
+        acted_at = 0.0
+        previous = None
+        try:
+            while self.running:
+                # Frames taken while the last action ran are skipped
+                analysis = pipeline.next(acted_at, previous, timeout=poll_interval)
+                if analysis is None:
+                    continue
+                previous = analysis
+                self.frame_count += 1
+
+                self._step(analysis.frame, analysis.state)
+
+                if self.frame_count % 50 == 0:
+                    self._print_status()
+
+                # Gestures are paced on the touch thread; wait for them to
+                # land so the next frame shows their effect
+                acted_at = self.device.flush_actions()
+        finally:
+            pipeline.stop()
+
+    def _step(self, frame: np.ndarray, state: GameState):
+        """Handle one analyzed frame: log, decide and act."""
+        level_wait = self.config["timing"]["level_complete_wait"]
+        chapter_wait = self.config["timing"]["chapter_transition_wait"]
+
+        # 3. Log screen transitions
+        if state.screen != self._last_screen:
+            self.logger.info(f"Screen: {state.screen.name}")
+            self._last_screen = state.screen
+
+            # Save screenshot on screen transitions
+            if self.config["bot"]["save_screenshots"]:
+                ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+                path = self.screenshot_dir / f"{ts}_{state.screen.name}.png"
+                self.device.save_screenshot(str(path), frame)
+
+        # 4. Handle out-of-lives waiting
+        if state.screen == GameScreen.OUT_OF_LIVES:
+            if self._out_of_lives_time is None:
+                self._out_of_lives_time = datetime.now()
+                self.logger.info(
+                    "Out of lives. Bot will wait for lives to refill. "
+                    "You can also manually add lives."
+                )
+
+            # After dismissing the popup, wait for lives to refill
+            elapsed = (datetime.now() - self._out_of_lives_time).total_seconds()
+            if elapsed > 30:
+                # Try to continue - lives may have refilled
+                self._out_of_lives_time = None
+
+        if state.screen != GameScreen.OUT_OF_LIVES:
+            self._out_of_lives_time = None
+
+        # 5. Decide action
+        action = self.logic.decide(state)
+        if action.action not in (Action.WAIT, Action.NONE):
+            self.action_count += 1
+
+        # 6. Execute action
+        if not self.dry_run:
+            self._execute_action(action)
+        else:
+            if action.action != Action.WAIT and action.action != Action.NONE:
+                self.logger.info(f"[DRY RUN] Would: {action.description}")
+
+        # 7. Extra wait for transitions
+        if state.screen == GameScreen.LEVEL_COMPLETE:
+            time.sleep(level_wait)
+        elif state.screen == GameScreen.CHAPTER_COMPLETE:
+            time.sleep(chapter_wait)
+
     def _execute_action(self, action: BotAction):
         """Execute a decided action on the device."""
         if action.description:
@@ -259,7 +313,8 @@ class DominoDreamsBot:
             self.device.swipe(action.x, action.y, action.x2, action.y2)
         elif action.action == Action.LONG_PRESS:
             self.device.long_press(action.x, action.y, action.duration)
-        elif action.action == Action.WAIT:
+        elif action.action == Action.WAIT and not self.pipelined:
+            # The pipelined loop waits for the screen to change instead
             time.sleep(action.duration)
         # Action.NONE = do nothing
 
@@ -276,9 +331,14 @@ class DominoDreamsBot:
             f"Levels done: {stats['levels_completed']} | "
             f"Stars: {stats['total_stars']} | "
             f"Fails: {stats['levels_failed']} | "
-            f"Frames: {self.frame_count}"
+            f"Frames: {self.frame_count} | "
+            f"Actions/min: {self._actions_per_minute():.1f}"
         )
 
+    def _actions_per_minute(self) -> float:
+        minutes = (datetime.now() - self.start_time).total_seconds() / 60
+        return self.action_count / minutes if minutes > 0 else 0.0
+
     def _signal_handler(self, signum, frame):
         """Handle Ctrl+C gracefully."""
         self.logger.info("\nStopping bot...")
@@ -286,6 +346,8 @@ class DominoDreamsBot:
 
     def _shutdown(self):
         """Clean shutdown with final stats."""
+        self.device.disconnect()
+        self.logic.close()
         self.logger.info("\n" + "=" * 50)
         self.logger.info("  BOT SESSION COMPLETE")
         self.logger.info("=" * 50)
@@ -300,6 +362,8 @@ class DominoDreamsBot:
         self.logger.info(f"Total stars:         {stats['total_stars']}")
         self.logger.info(f"Levels failed:       {stats['levels_failed']}")
         self.logger.info(f"Frames processed:    {self.frame_count}")
+        if self.start_time:
+            self.logger.info(f"Actions per minute:  {self._actions_per_minute():.1f}")
         self.logger.info("=" * 50)
 
 
@@ -333,6 +397,26 @@ def main():
         action="store_true",
         help="Analyze screen but don't send any taps"
     )
+    parser.add_argument(
+        "--fake-device",
+        metavar="DIR",
+        help="Serve screenshots from DIR instead of an iPhone (implies --dry-run)"
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="DIR",
+        help="Analyze the screenshots in DIR once, then report timing and accuracy against their labels"
+    )
+    parser.add_argument(
+        "--label",
+        action="store_true",
+        help="With --replay: write labels from the detections for screenshots that have none"
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="With --replay: write sampled call stacks to FILE for a flame graph"
+    )
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
@@ -354,7 +438,10 @@ def main():
     verbose = args.verbose or config["bot"].get("verbose", False)
     setup_logging(verbose)
 
-    if args.calibrate:
+    if args.replay:
+        if not run_replay(config, args.replay, profile=args.profile, label=args.label):
+            sys.exit(1)
+    elif args.calibrate:
         device = iOSDevice(config)
         if device.connect():
             run_calibration(device, config)
@@ -362,7 +449,9 @@ def main():
             print("Failed to connect to device.")
             sys.exit(1)
     else:
-        bot = DominoDreamsBot(config, dry_run=args.dry_run)
+        frame_source = FolderFrameSource(args.fake_device) if args.fake_device else None
+        # There is nothing to tap on a fake device
+        bot = DominoDreamsBot(config, dry_run=args.dry_run or bool(frame_source), frame_source=frame_source)
         bot.start()
 
 
@@ -0,0 +1,199 @@
+"""
+Screen Capture Layer
+Frame sources (a live DVT screenshot channel, or a folder of PNGs standing
+in for the device) and a background grabber that keeps only the newest
+frame, so the bot never waits on a screenshot round trip.
+"""
+
+import logging
+import threading
+from abc import ABC, abstractmethod
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger("domino_bot.capture")
+
+
+def decode_png(data: bytes) -> Optional[np.ndarray]:
+    """
+    Decode PNG bytes straight into a contiguous BGR array (None if the data
+    is not an image). The bytes are wrapped, not copied, and libpng writes
+    BGR directly, dropping any alpha channel as it goes.
+    """
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+class FrameSource(ABC):
+    """Something that produces screenshots on demand."""
+
+    name = "source"
+
+    def open(self) -> bool:
+        """Prepare the source; returns False if it is unavailable."""
+        return True
+
+    @abstractmethod
+    def grab(self) -> Optional[np.ndarray]:
+        """Capture one BGR frame, or None on failure."""
+
+    def close(self):
+        pass
+
+
+class DvtScreenshotSource(FrameSource):
+    """
+    Keeps one DVT instruments connection to the iPhone open and pulls
+    screenshots over it, instead of starting a pymobiledevice3 process
+    (and a fresh lockdown handshake) for every frame.
+    """
+
+    name = "dvt"
+
+    def __init__(self, udid: Optional[str] = None):
+        self.udid = udid
+        self._stack: Optional[ExitStack] = None
+        self._screenshot = None
+
+    def open(self) -> bool:
+        try:
+            from pymobiledevice3.lockdown import create_using_usbmux
+            from pymobiledevice3.services.dvt.dvt_secure_socket_proxy import DvtSecureSocketProxyService
+            from pymobiledevice3.services.dvt.instruments.screenshot import Screenshot
+        except ImportError:
+            logger.warning("Could not import pymobiledevice3 API modules")
+            return False
+
+        self.close()
+        try:
+            stack = ExitStack()
+            lockdown = create_using_usbmux(serial=self.udid)
+            dvt = stack.enter_context(DvtSecureSocketProxyService(lockdown=lockdown))
+            self._screenshot = Screenshot(dvt)
+            self._stack = stack
+            logger.debug("DVT screenshot channel open")
+            return True
+        except Exception as e:
+            logger.debug(f"DVT screenshot channel unavailable: {e}")
+            stack.close()
+            return False
+
+    def grab(self) -> Optional[np.ndarray]:
+        if self._screenshot is None and not self.open():
+            return None
+        try:
+            return decode_png(self._screenshot.get_screenshot())
+        except Exception as e:
+            # Drop the channel; the next grab reconnects
+            logger.warning(f"DVT screenshot failed, reconnecting: {e}")
+            self.close()
+            return None
+
+    def close(self):
+        if self._stack is not None:
+            try:
+                self._stack.close()
+            except Exception as e:
+                logger.debug(f"Closing DVT channel: {e}")
+        self._stack = None
+        self._screenshot = None
+
+
+class FolderFrameSource(FrameSource):
+    """
+    Fake device that serves PNG screenshots from a folder in order, for
+    running the bot and its tests without an iPhone.
+    """
+
+    name = "folder"
+
+    def __init__(self, folder: str, interval: float = 0.2, loop: bool = True):
+        self.folder = Path(folder)
+        self.interval = interval  # simulated capture time per frame
+        self.loop = loop
+        self._paths: List[Path] = []
+        self._index = 0
+
+    def open(self) -> bool:
+        self._paths = sorted(self.folder.glob("*.png"))
+        if not self._paths:
+            logger.error(f"No PNG screenshots found in {self.folder}")
+            return False
+        logger.info(f"Serving {len(self._paths)} screenshots from {self.folder}")
+        return True
+
+    def grab(self) -> Optional[np.ndarray]:
+        if self._index >= len(self._paths):
+            if not self.loop or not self._paths:
+                return None
+            self._index = 0
+        path = self._paths[self._index]
+        self._index += 1
+        time.sleep(self.interval)
+        # Decode the raw bytes the same way a device capture is decoded
+        return decode_png(path.read_bytes())
+
+
+class FrameGrabber:
+    """
+    Runs a FrameSource on a background thread and keeps only the newest
+    frame. Consumers get the latest frame without waiting on the device;
+    frames they never asked for are simply overwritten.
+    """
+
+    def __init__(self, source: FrameSource, retry_delay: float = 1.0):
+        self.source = source
+        self.retry_delay = retry_delay
+        self.frames_captured = 0
+        self.failures = 0
+
+        self._cond = threading.Condition()
+        self._frame: Optional[np.ndarray] = None
+        self._seq = -1
+        self._captured_at = 0.0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"capture-{self.source.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.source.close()
+
+    def _run(self):
+        while self._running:
+            started = time.monotonic()
+            frame = self.source.grab()
+            if frame is None:
+                self.failures += 1
+                time.sleep(self.retry_delay)
+                continue
+            with self._cond:
+                self._frame = frame
+                self._seq += 1
+                # The frame was taken somewhere during grab(); assume the start
+                self._captured_at = started
+                self.frames_captured += 1
+                self._cond.notify_all()
+
+    def latest(self, newer_than: int = -1, timeout: float = 2.0) -> Tuple[Optional[np.ndarray], int, float]:
+        """
+        Return (frame, sequence number, capture time) of the newest frame,
+        waiting up to `timeout` for one newer than `newer_than`. Falls back to
+        the newest frame available (possibly already seen), or (None, -1, 0.0)
+        if none yet. Capture times are time.monotonic() values.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > newer_than or not self._running, timeout=timeout)
+            return self._frame, self._seq, self._captured_at
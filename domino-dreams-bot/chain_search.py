@@ -0,0 +1,175 @@
+"""
+Chain Search
+A model of the board built from detected dominoes that simulates the chain
+reaction a tap sets off, and a time-boxed Monte Carlo search over taps that
+uses it to pick the one with the longest expected chain.
+
+A falling domino knocks over standing pieces within its reach (a multiple
+of its length), more reliably the closer they are. Detection cannot see
+which way a piece will fall, so each knock is a coin flip weighted by
+distance and the search averages over many simulated outcomes.
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+import numpy as np
+
+from spatial import SpatialGrid
+
+
+class Board:
+    """
+    Dominoes as a directed graph: an edge i -> j with probability p means
+    i falling knocks j over with probability p. Stored as CSR arrays so a
+    simulation step expands a whole wave of falling pieces at once.
+    """
+
+    def __init__(self, centers: np.ndarray, lengths: np.ndarray, values: np.ndarray,
+                 reach: float = 1.5, grid: Optional[SpatialGrid] = None):
+        self.centers = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+        self.lengths = np.asarray(lengths, dtype=np.float64)
+        self.values = np.asarray(values, dtype=np.int64)
+        n = len(self.centers)
+
+        self.reach = reach * self.lengths
+        max_reach = float(self.reach.max()) if n else 0.0
+        if grid is None or grid.cell_size < max_reach:
+            grid = SpatialGrid(self.centers, cell_size=max(max_reach, 1.0))
+        i, j, dist = grid.pairs_within(max(max_reach, 1e-9))
+
+        # Certain within half the reach, fading to nothing at full reach
+        prob = np.clip(2.0 * (1.0 - dist / self.reach[i]), 0.0, 1.0)
+        live = prob > 0
+        i, j, prob = i[live], j[live], prob[live]
+        order = np.argsort(i, kind="stable")
+        self.targets = j[order]
+        self.probs = prob[order]
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(i, minlength=n))])
+
+    def __len__(self) -> int:
+        return len(self.centers)
+
+    def degrees(self, standing: np.ndarray) -> np.ndarray:
+        """Expected number of standing pieces each piece would knock over directly."""
+        sources = np.repeat(np.arange(len(self)), np.diff(self.indptr))
+        weights = self.probs * standing[self.targets]
+        return np.bincount(sources, weights, minlength=len(self))
+
+    def simulate(self, start: int, standing: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """
+        Topple `start` and let the chain run. Returns the mask of pieces that
+        fell (including `start`); `standing` is not modified.
+        """
+        fallen = np.zeros(len(self), dtype=bool)
+        fallen[start] = True
+        frontier = np.array([start])
+        while len(frontier):
+            lo, hi = self.indptr[frontier], self.indptr[frontier + 1]
+            counts = hi - lo
+            total = int(counts.sum())
+            if not total:
+                break
+            edges = np.repeat(lo - (np.cumsum(counts) - counts), counts) + np.arange(total)
+            hit = self.targets[edges][rng.random(total) < self.probs[edges]]
+            hit = np.unique(hit[standing[hit] & ~fallen[hit]])
+            fallen[hit] = True
+            frontier = hit
+        return fallen
+
+
+def rollouts(board: Board, standing: np.ndarray, candidates: np.ndarray, depth: int,
+             budget: float, seed: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Simulate taps on `candidates` round-robin until `budget` seconds pass
+    (every candidate gets at least one rollout). Each rollout taps the candidate, then for
+    depth > 1 keeps tapping the standing piece with the most expected direct
+    knocks. Returns the summed chain lengths and rollout counts per candidate.
+    """
+    rng = np.random.default_rng(seed)
+    deadline = time.monotonic() + budget
+    totals = np.zeros(len(candidates))
+    counts = np.zeros(len(candidates), dtype=np.int64)
+    first_round = True
+    while True:
+        for k, start in enumerate(candidates):
+            if not first_round and time.monotonic() >= deadline:
+                return totals, counts
+            up = standing.copy()
+            tap = int(start)
+            chain = 0
+            for step in range(depth):
+                fallen = board.simulate(tap, up, rng)
+                chain += int(fallen.sum())
+                up &= ~fallen
+                if step + 1 == depth or not up.any():
+                    break
+                tap = int(np.argmax(np.where(up, board.degrees(up), -1.0)))
+            totals[k] += chain
+            counts[k] += 1
+        first_round = False
+        if time.monotonic() >= deadline:
+            return totals, counts
+
+
+class ChainSearch:
+    """
+    Picks the tap with the longest expected chain within a time budget.
+    With workers > 0 the candidates are split over a process pool, each
+    process spending the same budget on its share.
+    """
+
+    def __init__(self, budget_ms: float = 30, candidates: int = 12, depth: int = 2,
+                 workers: int = 0):
+        self.budget = budget_ms / 1000.0
+        self.max_candidates = candidates
+        self.depth = depth
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.last_rollouts = 0
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def best(self, board: Board, candidates: np.ndarray,
+             standing: Optional[np.ndarray] = None) -> Tuple[int, float]:
+        """
+        Return (board index to tap, expected chain length) among the
+        candidate indices.
+        """
+        if standing is None:
+            standing = np.ones(len(board), dtype=bool)
+        candidates = np.asarray(candidates, dtype=np.int64)
+
+        # Search the most connected candidates; the rest rarely win
+        if len(candidates) > self.max_candidates:
+            degree = board.degrees(standing)[candidates]
+            candidates = candidates[np.argsort(-degree, kind="stable")[:self.max_candidates]]
+
+        totals, counts = self._run(board, standing, candidates)
+        self.last_rollouts = int(counts.sum())
+        means = totals / np.maximum(counts, 1)
+        # Ties go to the higher pip total (more points)
+        best = max(range(len(candidates)), key=lambda k: (means[k], board.values[candidates[k]]))
+        return int(candidates[best]), float(means[best])
+
+    def _run(self, board: Board, standing: np.ndarray,
+             candidates: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if self.workers <= 0 or len(candidates) < 2:
+            return rollouts(board, standing, candidates, self.depth, self.budget)
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        chunks = [c for c in np.array_split(candidates, self.workers) if len(c)]
+        seeds = np.random.SeedSequence().spawn(len(chunks))
+        futures = [
+            self._pool.submit(rollouts, board, standing, chunk, self.depth, self.budget, seed)
+            for chunk, seed in zip(chunks, seeds)
+        ]
+        results = [f.result() for f in futures]
+        return (np.concatenate([r[0] for r in results]),
+                np.concatenate([r[1] for r in results]))
+
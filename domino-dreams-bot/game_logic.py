@@ -5,15 +5,18 @@ Handles gameplay strategy, popup dismissal, and chapter navigation.
 """
 
 import logging
-import random
 import time
 from dataclasses import dataclass
 from enum import Enum, auto
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 
 from game_vision import (
     GameScreen, GameState, Domino, BoundingBox, Point
 )
+from chain_search import Board, ChainSearch
+from spatial import SpatialGrid
 
 logger = logging.getLogger("domino_bot.logic")
 
@@ -27,6 +30,51 @@ class Action(Enum):
     NONE = auto()
 
 
+class BoardIndex:
+    """
+    Arrays describing every domino in one GameState, with a spatial grid
+    over their centers, so candidates can be scored together with NumPy.
+    """
+
+    NEAR = 80  # points; close neighbours
+    FAR = 150  # points; further neighbours
+
+    def __init__(self, dominoes: List[Domino]):
+        self.dominoes = dominoes
+        self._position = {id(d): i for i, d in enumerate(dominoes)}
+
+        n = len(dominoes)
+        boxes = np.fromiter(
+            (v for d in dominoes for v in (d.bbox.x, d.bbox.y, d.bbox.w, d.bbox.h)),
+            dtype=np.int64, count=4 * n
+        ).reshape(n, 4)
+        # Same integer centers as BoundingBox.center
+        self.centers = boxes[:, :2] + boxes[:, 2:] // 2
+        self.lengths = boxes[:, 2:].max(axis=1)
+        self.values = np.fromiter((d.top_value + d.bottom_value for d in dominoes), dtype=np.int64, count=n)
+        self.highlighted = np.fromiter((d.is_highlighted for d in dominoes), dtype=bool, count=n)
+        self.grid = SpatialGrid(self.centers, cell_size=self.FAR)
+        self._neighbour_scores: Optional[np.ndarray] = None
+        self._chain_board: Optional[Board] = None
+
+    def positions(self, dominoes: List[Domino]) -> np.ndarray:
+        """Indices of `dominoes` (which must come from this index) in its arrays."""
+        return np.fromiter((self._position[id(d)] for d in dominoes), dtype=np.int64, count=len(dominoes))
+
+    def neighbour_scores(self) -> np.ndarray:
+        """+15 per neighbour closer than NEAR and +5 per one closer than FAR."""
+        if self._neighbour_scores is None:
+            near, far = self.grid.count_within(self.NEAR, self.FAR)
+            self._neighbour_scores = 15 * near + 5 * (far - near)
+        return self._neighbour_scores
+
+    def chain_board(self, reach: float) -> Board:
+        """The chain-reaction model of these dominoes (reach in piece lengths)."""
+        if self._chain_board is None:
+            self._chain_board = Board(self.centers, self.lengths, self.values, reach=reach, grid=self.grid)
+        return self._chain_board
+
+
 @dataclass
 class BotAction:
     """A concrete action for the bot to perform."""
@@ -63,6 +111,24 @@ class GameLogic:
         self.last_screen = GameScreen.UNKNOWN
         self.same_screen_count = 0
         self.last_action_time = 0
+        # Taps per tracked domino this level, so pieces that didn't react
+        # aren't tapped again while others are untried
+        self.tapped: Dict[int, int] = {}
+        # Built once per gameplay state, shared by all scoring for it
+        self._index: Optional[BoardIndex] = None
+        self._index_state: Optional[GameState] = None
+
+        # Lookahead: simulate chain reactions to choose among playable pieces
+        strategy = config.get("strategy", {})
+        self.chain_reach = strategy.get("reach", 1.5)
+        self.search: Optional[ChainSearch] = None
+        if strategy.get("lookahead", True):
+            self.search = ChainSearch(
+                budget_ms=strategy.get("time_budget_ms", 30),
+                candidates=strategy.get("candidates", 12),
+                depth=strategy.get("depth", 2),
+                workers=strategy.get("workers", 0),
+            )
 
     def decide(self, state: GameState) -> BotAction:
         """
@@ -132,7 +198,8 @@ class GameLogic:
         # Priority 1: Tap highlighted dominoes (the game hints at these)
         highlighted = [d for d in state.dominoes if d.is_highlighted]
         if highlighted:
-            target = self._pick_best_domino(highlighted)
+            target = self._pick_best_domino(self._least_tapped(highlighted))
+            self._note_tap(target)
             center = target.bbox.center
             return BotAction(
                 action=Action.TAP,
@@ -153,7 +220,12 @@ class GameLogic:
         # Priority 3: Tap any playable domino, prioritizing edges and corners
         playable = [d for d in state.dominoes if d.is_playable]
         if playable:
-            target = self._pick_strategic_domino(playable, state)
+            candidates = self._least_tapped(playable)
+            if self.search is not None:
+                target = self._search_domino(candidates, state)
+            else:
+                target = self._pick_strategic_domino(candidates, state)
+            self._note_tap(target)
             center = target.bbox.center
             return BotAction(
                 action=Action.TAP,
@@ -182,6 +254,7 @@ class GameLogic:
         """Handle the level complete screen."""
         self.levels_completed += 1
         self.consecutive_fails = 0
+        self.tapped.clear()
         self.total_stars += state.stars_earned
         self.current_level += 1
 
@@ -219,6 +292,7 @@ class GameLogic:
         """Handle level failed screen."""
         self.levels_failed += 1
         self.consecutive_fails += 1
+        self.tapped.clear()
 
         logger.info(
             f"Level failed (attempt {self.consecutive_fails}). "
@@ -481,6 +555,16 @@ class GameLogic:
     # Strategy helpers
     # ----------------------------------------------------------------
 
+    def _least_tapped(self, dominoes: List[Domino]) -> List[Domino]:
+        """The dominoes tapped least often this level (untapped ones, if any)."""
+        counts = [self.tapped.get(d.track_id, 0) for d in dominoes]
+        fewest = min(counts)
+        return [d for d, count in zip(dominoes, counts) if count == fewest]
+
+    def _note_tap(self, domino: Domino):
+        if domino.track_id >= 0:
+            self.tapped[domino.track_id] = self.tapped.get(domino.track_id, 0) + 1
+
     def _pick_best_domino(self, dominoes: List[Domino]) -> Domino:
         """Pick the best domino to tap from highlighted options."""
         if len(dominoes) == 1:
@@ -500,12 +584,11 @@ class GameLogic:
         center_x = self.screen_w // 2
         center_y = int(self.screen_h * 0.45)
 
-        def distance_to_center(bb):
-            c = bb.center
-            return ((c.x - center_x) ** 2 + (c.y - center_y) ** 2) ** 0.5
-
-        targets.sort(key=distance_to_center)
-        return targets[0]
+        boxes = np.array([(t.x, t.y, t.w, t.h) for t in targets], dtype=np.int64)
+        dx = boxes[:, 0] + boxes[:, 2] // 2 - center_x
+        dy = boxes[:, 1] + boxes[:, 3] // 2 - center_y
+        # Squared distance orders the same as distance
+        return targets[int(np.argmin(dx * dx + dy * dy))]
 
     def _pick_strategic_domino(self, dominoes: List[Domino], state: GameState) -> Domino:
         """
@@ -518,50 +601,56 @@ class GameLogic:
         if len(dominoes) == 1:
             return dominoes[0]
 
-        scored_dominoes = []
-        board_center_x = self.screen_w // 2
-        board_center_y = int(self.screen_h * 0.45)
-
-        for domino in dominoes:
-            score = 0
-            cx, cy = domino.bbox.center.x, domino.bbox.center.y
-
-            # Value score: higher domino values = more points
-            score += (domino.top_value + domino.bottom_value) * 10
-
-            # Edge bonus: dominoes near edges often start longer chains
-            edge_dist_x = min(cx, self.screen_w - cx)
-            edge_dist_y = min(cy - int(self.screen_h * 0.12),
-                              int(self.screen_h * 0.80) - cy)
-            if edge_dist_x < self.screen_w * 0.15:
-                score += 20
-            if edge_dist_y < self.screen_h * 0.1:
-                score += 20
-
-            # Neighbor bonus: dominoes near other dominoes create chains
-            for other in dominoes:
-                if other is domino:
-                    continue
-                dist = (
-                    (cx - other.bbox.center.x) ** 2 +
-                    (cy - other.bbox.center.y) ** 2
-                ) ** 0.5
-                if dist < 80:  # Close neighbor
-                    score += 15
-                elif dist < 150:
-                    score += 5
-
-            # Highlighted bonus
-            if domino.is_highlighted:
-                score += 50
-
-            # Small random factor to avoid getting stuck in loops
-            score += random.randint(0, 10)
-
-            scored_dominoes.append((domino, score))
-
-        scored_dominoes.sort(key=lambda x: x[1], reverse=True)
-        return scored_dominoes[0][0]
+        index = self._board_index(state)
+        at = index.positions(dominoes)
+        cx, cy = index.centers[at, 0], index.centers[at, 1]
+
+        # Value score: higher domino values = more points
+        score = index.values[at] * 10
+
+        # Edge bonus: dominoes near edges often start longer chains
+        edge_dist_x = np.minimum(cx, self.screen_w - cx)
+        edge_dist_y = np.minimum(cy - int(self.screen_h * 0.12), int(self.screen_h * 0.80) - cy)
+        score += np.where(edge_dist_x < self.screen_w * 0.15, 20, 0)
+        score += np.where(edge_dist_y < self.screen_h * 0.1, 20, 0)
+
+        # Neighbor bonus: dominoes near other dominoes create chains
+        score += index.neighbour_scores()[at]
+
+        # Highlighted bonus
+        score += np.where(index.highlighted[at], 50, 0)
+
+        # Small random factor to avoid getting stuck in loops
+        score += np.random.randint(0, 11, size=len(at))
+
+        return dominoes[int(np.argmax(score))]
+
+    def _search_domino(self, dominoes: List[Domino], state: GameState) -> Domino:
+        """Pick the domino whose tap is expected to topple the most pieces."""
+        if len(dominoes) == 1:
+            return dominoes[0]
+
+        index = self._board_index(state)
+        board = index.chain_board(self.chain_reach)
+        at = index.positions(dominoes)
+        best, expected = self.search.best(board, at)
+        logger.debug(
+            f"Lookahead: {self.search.last_rollouts} rollouts over "
+            f"{min(len(at), self.search.max_candidates)} pieces, expected chain {expected:.1f}"
+        )
+        return index.dominoes[best]
+
+    def close(self):
+        """Release the search worker processes, if any."""
+        if self.search is not None:
+            self.search.close()
+
+    def _board_index(self, state: GameState) -> BoardIndex:
+        """The BoardIndex for `state`, built on first use."""
+        if self._index_state is not state:
+            self._index = BoardIndex(state.dominoes)
+            self._index_state = state
+        return self._index
 
     def _recover_stuck(self, state: GameState) -> BotAction:
         """Try to recover when the bot is stuck."""
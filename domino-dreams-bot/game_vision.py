@@ -5,13 +5,16 @@ popups, menus, progress indicators, and game state.
 """
 
 import logging
+import os
 from enum import Enum, auto
-from dataclasses import dataclass, field
-from typing import List, Optional, Tuple
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
 import cv2
 import numpy as np
 
+from screen_index import ScreenIndex
+
 logger = logging.getLogger("domino_bot.vision")
 
 
@@ -60,6 +63,7 @@ class Domino:
     bottom_value: int = 0  # dots on bottom half (0-6)
     is_playable: bool = False
     is_highlighted: bool = False
+    track_id: int = -1  # stable across frames while the piece stays put
 
 
 @dataclass
@@ -82,6 +86,222 @@ class GameState:
     board_region: Optional[BoundingBox] = None
 
 
+class FrameContext:
+    """
+    One frame plus everything derived from it, computed on first use.
+
+    Detectors share a context instead of each converting the frame, so HSV,
+    grayscale and every color mask are built at most once per frame.
+    Crops are views into these arrays and cost nothing.
+    """
+
+    def __init__(self, frame: np.ndarray, colors: dict):
+        self.frame = frame
+        self.h, self.w = frame.shape[:2]
+        self._colors = colors
+        self._hsv: Optional[np.ndarray] = None
+        self._gray: Optional[np.ndarray] = None
+        self._ranges: Dict[Tuple[int, ...], np.ndarray] = {}
+        self._results: Dict[str, object] = {}
+
+    @property
+    def hsv(self) -> np.ndarray:
+        if self._hsv is None:
+            self._hsv = cv2.cvtColor(self.frame, cv2.COLOR_BGR2HSV)
+        return self._hsv
+
+    @property
+    def gray(self) -> np.ndarray:
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    def in_range(self, lower: Sequence[int], upper: Sequence[int]) -> np.ndarray:
+        """Full-frame HSV range mask, cached by its bounds."""
+        key = (*lower, *upper)
+        if key not in self._ranges:
+            self._ranges[key] = cv2.inRange(self.hsv, np.array(lower), np.array(upper))
+        return self._ranges[key]
+
+    def mask(self, color_name: str) -> np.ndarray:
+        """Mask for a named color from config."""
+        c = self._colors[color_name]
+        return self.in_range(c[:3], c[3:])
+
+    def crop(self, image: np.ndarray, top: float, bottom: float,
+             left: float = 0.0, right: float = 1.0) -> np.ndarray:
+        """View of `image` between fractional frame coordinates."""
+        return image[int(self.h * top):int(self.h * bottom), int(self.w * left):int(self.w * right)]
+
+    def memo(self, key: str, compute: Callable[[], object]):
+        """Run a detector once per frame, e.g. one used for both classification and output."""
+        if key not in self._results:
+            self._results[key] = compute()
+        return self._results[key]
+
+
+# A board rectangle in working-frame pixels: x, y, w, h
+Rect = Tuple[int, int, int, int]
+
+
+@dataclass
+class _Track:
+    rect: Rect
+    domino: Domino
+    highlights: int = 0  # bit i set = highlighted i detections ago
+
+
+class DominoTracker:
+    """
+    Keeps domino identities across frames. Only the part of the board that
+    changed since it was last searched is searched again; pieces elsewhere
+    are carried over untouched. Pieces found again where they were keep their
+    track ID, and a pulsing glow stays "highlighted" between pulses.
+    """
+
+    HIGHLIGHT_FRAMES = 3  # detections a highlight is remembered for
+    MATCH_IOU = 0.3
+
+    def __init__(self, redetect_fraction: float = 0.5, diff_threshold: int = 25, margin: int = 4):
+        self.redetect_fraction = redetect_fraction
+        self.diff_threshold = diff_threshold
+        self.margin = margin
+        self.full_detections = 0
+        self.partial_detections = 0
+
+        self._tracks: List[_Track] = []
+        # The board as it looked when each part was last searched, so slow
+        # changes (a glow fading in) add up instead of slipping under
+        # diff_threshold one frame at a time
+        self._reference: Optional[np.ndarray] = None
+        self._next_id = 0
+
+    def reset(self):
+        self._tracks = []
+        self._reference = None
+
+    def update(self, board: np.ndarray,
+               detect: Callable[[Rect], List[Tuple[Rect, Domino]]]) -> List[Domino]:
+        """
+        Track the pieces on a BGR board image. `detect(region)` finds the
+        pieces inside a board rectangle, as (rect, Domino) pairs.
+        """
+        prev = self._reference
+        h, w = board.shape[:2]
+        if prev is None or prev.shape != board.shape:
+            return self._redetect(board, (0, 0, w, h), detect, keep=[])
+
+        # Bounding box of everything that changed since it was last searched.
+        # Channels are compared separately (a glow may barely change the
+        # brightness), as one row of w * 3 values per image row.
+        diff = cv2.absdiff(board, prev).reshape(h, w * 3)
+        _, changed = cv2.threshold(diff, self.diff_threshold, 255, cv2.THRESH_BINARY)
+        points = cv2.findNonZero(changed)
+        if points is None:
+            self._tracks = [self._age(t) for t in self._tracks]
+            return [t.domino for t in self._tracks]
+        cx, cy, cw, ch = cv2.boundingRect(points)
+        changed_rect = (cx // 3, cy, (cx + cw + 2) // 3 - cx // 3, ch)
+        region = self._expand(changed_rect, self.margin, w, h)
+
+        # Pieces touching the change are searched for again, so the region
+        # must hold all of each of them
+        keep = []
+        for track in self._tracks:
+            if self._overlap(track.rect, region) > 0:
+                region = self._union(region, self._expand(track.rect, self.margin, w, h))
+            else:
+                keep.append(track)
+
+        if region[2] * region[3] > self.redetect_fraction * w * h:
+            return self._redetect(board, (0, 0, w, h), detect, keep=[])
+        return self._redetect(board, region, detect, keep)
+
+    def _redetect(self, board: np.ndarray, region: Rect,
+                  detect: Callable[[Rect], List[Tuple[Rect, Domino]]],
+                  keep: List[_Track]) -> List[Domino]:
+        board_h, board_w = board.shape[:2]
+        if region == (0, 0, board_w, board_h):
+            self.full_detections += 1
+            self._reference = board.copy()
+        else:
+            self.partial_detections += 1
+            x, y, rw, rh = region
+            self._reference[y:y + rh, x:x + rw] = board[y:y + rh, x:x + rw]
+
+        previous = self._tracks
+        claimed = set()
+        tracks = []
+        for rect, domino in detect(region):
+            if self._is_cut(rect, region, board_w, board_h):
+                continue  # Partly outside the searched region; an unchanged piece
+            match = self._best_match(rect, previous, claimed)
+            if match is not None:
+                claimed.add(match)
+                track_id, history = previous[match].domino.track_id, previous[match].highlights
+            else:
+                track_id, history = self._next_id, 0
+                self._next_id += 1
+            history = self._push(history, domino.is_highlighted)
+            domino.track_id = track_id
+            domino.is_highlighted = history != 0
+            tracks.append(_Track(rect, domino, history))
+
+        # Unchanged pieces the search did not report (or that lie outside it) stay
+        kept = {id(t) for t in keep}
+        tracks += [self._age(t) for i, t in enumerate(previous) if i not in claimed and id(t) in kept]
+        self._tracks = tracks
+        return [t.domino for t in tracks]
+
+    def _push(self, history: int, highlighted: bool) -> int:
+        return ((history << 1) | highlighted) & ((1 << self.HIGHLIGHT_FRAMES) - 1)
+
+    def _age(self, track: _Track) -> _Track:
+        """Advance an unchanged piece's highlight history; its look is what it was last time."""
+        history = self._push(track.highlights, bool(track.highlights & 1))
+        if history == track.highlights:
+            return track
+        return _Track(track.rect, replace(track.domino, is_highlighted=history != 0), history)
+
+    def _best_match(self, rect: Rect, tracks: List[_Track], claimed: set) -> Optional[int]:
+        best, best_iou = None, self.MATCH_IOU
+        for i, track in enumerate(tracks):
+            if i in claimed:
+                continue
+            inter = self._overlap(rect, track.rect)
+            if inter:
+                iou = inter / (rect[2] * rect[3] + track.rect[2] * track.rect[3] - inter)
+                if iou > best_iou:
+                    best, best_iou = i, iou
+        return best
+
+    @staticmethod
+    def _overlap(a: Rect, b: Rect) -> int:
+        w = min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0])
+        h = min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1])
+        return w * h if w > 0 and h > 0 else 0
+
+    @staticmethod
+    def _union(a: Rect, b: Rect) -> Rect:
+        x1, y1 = min(a[0], b[0]), min(a[1], b[1])
+        x2, y2 = max(a[0] + a[2], b[0] + b[2]), max(a[1] + a[3], b[1] + b[3])
+        return x1, y1, x2 - x1, y2 - y1
+
+    @staticmethod
+    def _expand(rect: Rect, margin: int, w: int, h: int) -> Rect:
+        x1, y1 = max(rect[0] - margin, 0), max(rect[1] - margin, 0)
+        x2, y2 = min(rect[0] + rect[2] + margin, w), min(rect[1] + rect[3] + margin, h)
+        return x1, y1, x2 - x1, y2 - y1
+
+    @staticmethod
+    def _is_cut(rect: Rect, region: Rect, w: int, h: int) -> bool:
+        """True if `rect` touches an edge of `region` that is not a board edge."""
+        x, y, rw, rh = rect
+        gx, gy, gw, gh = region
+        return ((x <= gx and gx > 0) or (y <= gy and gy > 0)
+                or (x + rw >= gx + gw and gx + gw < w) or (y + rh >= gy + gh and gy + gh < h))
+
+
 class GameVision:
     """Computer vision engine for detecting Domino Dreams game elements."""
 
@@ -110,9 +330,38 @@ class GameVision:
             "center_button": (int(sw * 0.2), int(sh * 0.55), int(sw * 0.6), int(sh * 0.15)),
         }
 
-        self._prev_frame = None
+        # Detectors run on a downscaled copy of each frame; thresholds below
+        # are written for full resolution and scaled with _area()/_size()
+        self.analysis_scale = self.det.get("analysis_scale", 0.5)
+        self.unchanged_fraction = self.det.get("unchanged_fraction", 0.002)
+        self._work_scale = 1.0
+        self._pt_scale = float(self.scale)  # working-frame pixels per screen point
+
+        self._prev_thumb = None
+        self._prev_state: Optional[GameState] = None
         self._templates_loaded = False
 
+        # Gameplay frames only re-detect dominoes where the board changed
+        self.tracker: Optional[DominoTracker] = None
+        if self.det.get("track_dominoes", True):
+            self.tracker = DominoTracker(self.det.get("redetect_fraction", 0.5))
+
+        # Reference screenshots for nearest-neighbour screen classification,
+        # built with screen_index.py; the heuristics cover anything unmatched
+        self.screen_index: Optional[ScreenIndex] = None
+        self.screen_index_distance = self.det.get("screen_index_distance", 0.2)
+        index_path = self.det.get("screen_index")
+        if index_path and os.path.exists(index_path):
+            self.screen_index = ScreenIndex.load(index_path)
+            logger.info(f"Loaded screen index with {len(self.screen_index)} references")
+
+    def reset(self):
+        """Forget the previous frame, so the next one is analyzed from scratch."""
+        self._prev_thumb = None
+        self._prev_state = None
+        if self.tracker:
+            self.tracker.reset()
+
     def analyze(self, frame: np.ndarray) -> GameState:
         """
         Analyze a screenshot and return the detected game state.
@@ -121,93 +370,146 @@ class GameVision:
         if frame is None:
             return GameState(screen=GameScreen.UNKNOWN)
 
-        state = GameState()
+        # Step 1: Compare a small thumbnail with the last analyzed frame's. An
+        # unchanged screen reuses the last state; a changing one is animating.
+        # Reused frames keep the old thumbnail, so a slow fade still adds up.
+        thumb = self._thumbnail(frame)
+        diff = None
+        if self._prev_thumb is not None and self._prev_thumb.shape == thumb.shape:
+            diff = cv2.absdiff(thumb, self._prev_thumb)
+            prev = self._prev_state
+            if prev is not None and not prev.is_animating and self._is_unchanged(diff):
+                return prev
+        self._prev_thumb = thumb
 
-        # Step 1: Check if screen is animating (compare to previous frame)
-        state.is_animating = self._check_animating(frame)
-        self._prev_frame = frame.copy()
+        state = GameState()
+        state.is_animating = self._check_animating(diff)
+        self._prev_state = state
 
         if state.is_animating:
             state.screen = GameScreen.LOADING
             return state
 
+        # Detectors work on a reduced-resolution copy and share its color spaces
+        ctx = FrameContext(self._downscale(frame), self.colors)
+
         # Step 2: Detect which screen we're on
-        state.screen = self._detect_screen(frame)
+        state.screen = self._detect_screen(ctx)
+        if state.screen != GameScreen.GAMEPLAY and self.tracker:
+            self.tracker.reset()
 
         # Step 3: Based on screen, detect relevant elements
         if state.screen == GameScreen.GAMEPLAY:
-            state.board_region = self._find_board_region(frame)
-            state.dominoes = self._detect_dominoes(frame)
-            state.tap_targets = self._find_tap_targets(frame)
-            state.moves_remaining = self._detect_moves(frame)
-            state.chain_active = self._detect_chain(frame)
+            state.board_region = self._find_board_region(ctx)
+            state.dominoes = self._detect_dominoes(ctx)
+            state.tap_targets = self._find_tap_targets(ctx)
+            state.moves_remaining = self._detect_moves(ctx)
+            state.chain_active = self._detect_chain(ctx)
         elif state.screen == GameScreen.LEVEL_COMPLETE:
-            state.continue_button = self._find_button_by_color(frame, "play_button_green")
-            state.collect_button = self._find_button_by_color(frame, "reward_gold")
-            state.stars_earned = self._detect_stars(frame)
+            state.continue_button = self._find_button_by_color(ctx, "play_button_green")
+            state.collect_button = self._find_button_by_color(ctx, "reward_gold")
+            state.stars_earned = self._detect_stars(ctx)
         elif state.screen == GameScreen.LEVEL_FAILED:
-            state.retry_button = self._find_button_by_color(frame, "play_button_green")
-            state.close_button = self._find_x_button(frame)
+            state.retry_button = self._find_button_by_color(ctx, "play_button_green")
+            state.close_button = self._find_x_button(ctx)
         elif state.screen == GameScreen.CHAPTER_COMPLETE:
-            state.continue_button = self._find_button_by_color(frame, "play_button_green")
-            state.collect_button = self._find_button_by_color(frame, "reward_gold")
+            state.continue_button = self._find_button_by_color(ctx, "play_button_green")
+            state.collect_button = self._find_button_by_color(ctx, "reward_gold")
         elif state.screen in (GameScreen.HOME_MENU, GameScreen.CHAPTER_MAP, GameScreen.LEVEL_SELECT):
-            state.play_button = self._find_button_by_color(frame, "play_button_green")
+            state.play_button = self._find_button_by_color(ctx, "play_button_green")
             if state.play_button is None:
-                state.play_button = self._find_button_by_color(frame, "play_button_orange")
+                state.play_button = self._find_button_by_color(ctx, "play_button_orange")
         elif state.screen == GameScreen.REWARD_POPUP:
-            state.collect_button = self._find_button_by_color(frame, "play_button_green")
-            state.close_button = self._find_x_button(frame)
+            state.collect_button = self._find_button_by_color(ctx, "play_button_green")
+            state.close_button = self._find_x_button(ctx)
         elif state.screen == GameScreen.POPUP_DIALOG:
-            state.close_button = self._find_x_button(frame)
-            state.continue_button = self._find_button_by_color(frame, "play_button_green")
+            state.close_button = self._find_x_button(ctx)
+            state.continue_button = self._find_button_by_color(ctx, "play_button_green")
         elif state.screen == GameScreen.OUT_OF_LIVES:
-            state.close_button = self._find_x_button(frame)
+            state.close_button = self._find_x_button(ctx)
         elif state.screen == GameScreen.BUILDING_SCENE:
-            state.tap_targets = self._find_glowing_elements(frame)
-            state.continue_button = self._find_button_by_color(frame, "play_button_green")
+            state.tap_targets = self._find_glowing_elements(ctx)
+            state.continue_button = self._find_button_by_color(ctx, "play_button_green")
 
         # Always look for generic tap/close targets as fallback
         if not any([state.play_button, state.continue_button, state.close_button,
                      state.collect_button, state.retry_button, state.tap_targets]):
-            state.tap_targets = self._find_any_buttons(frame)
+            state.tap_targets = self._find_any_buttons(ctx)
 
         return state
 
-    def _check_animating(self, frame: np.ndarray) -> bool:
-        """Check if the screen is still animating by comparing frames."""
-        if self._prev_frame is None:
-            return False
+    def _thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        """Grayscale 1/16-size copy of the frame for cheap frame-to-frame comparison."""
+        # Strided sampling only touches 1/256 of the pixels, unlike a resize
+        small = np.ascontiguousarray(frame[8::16, 8::16, :3])
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def _is_unchanged(self, diff: np.ndarray) -> bool:
+        """True if almost no thumbnail pixels changed since the last analyzed frame."""
+        changed = np.count_nonzero(diff > 25)
+        return changed <= diff.size * self.unchanged_fraction
 
-        if frame.shape != self._prev_frame.shape:
+    def _check_animating(self, diff: Optional[np.ndarray]) -> bool:
+        """Check if the screen is still animating from the thumbnail difference."""
+        if diff is None:
             return False
 
         # Compare a central region to avoid UI element flicker
-        h, w = frame.shape[:2]
-        roi_curr = frame[h // 4:3 * h // 4, w // 4:3 * w // 4]
-        roi_prev = self._prev_frame[h // 4:3 * h // 4, w // 4:3 * w // 4]
-
-        diff = cv2.absdiff(roi_curr, roi_prev)
-        mean_diff = np.mean(diff)
+        h, w = diff.shape[:2]
+        mean_diff = np.mean(diff[h // 4:3 * h // 4, w // 4:3 * w // 4])
 
         # If more than 15% of pixels changed significantly, still animating
         return mean_diff > 12.0
 
-    def _detect_screen(self, frame: np.ndarray) -> GameScreen:
+    def _downscale(self, frame: np.ndarray) -> np.ndarray:
+        """Resize the frame to analysis_scale and update the coordinate mapping."""
+        s = self.analysis_scale
+        self._work_scale = s
+        self._pt_scale = self.scale * s
+        if s >= 1.0:
+            return frame
+        return cv2.resize(frame, None, fx=s, fy=s, interpolation=cv2.INTER_AREA)
+
+    def _area(self, full_res_area: float) -> float:
+        """Scale a full-resolution pixel area threshold to the working frame."""
+        return full_res_area * self._work_scale * self._work_scale
+
+    def _size(self, full_res_px: int) -> int:
+        """Scale a full-resolution pixel length to the working frame."""
+        return max(1, int(round(full_res_px * self._work_scale)))
+
+    def _kernel(self, w: int, h: int) -> np.ndarray:
+        return cv2.getStructuringElement(cv2.MORPH_RECT, (self._size(w), self._size(h)))
+
+    def _to_points(self, x: int, y: int, w: int, h: int) -> BoundingBox:
+        """Convert a working-frame pixel rectangle to screen points."""
+        p = self._pt_scale
+        return BoundingBox(x=int(x / p), y=int(y / p), w=int(w / p), h=int(h / p))
+
+    def _detect_screen(self, ctx: FrameContext) -> GameScreen:
         """Determine which game screen is currently displayed."""
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        h, w = frame.shape[:2]
+        if self.screen_index is not None:
+            name = self.screen_index.classify(ctx.frame, self.screen_index_distance)
+            if name is not None:
+                return GameScreen[name]
+
+        frame = ctx.frame
+        hsv = ctx.hsv
+        h, w = ctx.h, ctx.w
 
         # Check for dark overlay (popup/dialog)
         center_region = frame[h // 3:2 * h // 3, w // 4:3 * w // 4]
-        edge_region = np.vstack([frame[:h // 6, :], frame[5 * h // 6:, :]])
+        top_edge, bottom_edge = frame[:h // 6, :], frame[5 * h // 6:, :]
         center_brightness = np.mean(center_region)
-        edge_brightness = np.mean(edge_region)
+        edge_brightness = (
+            (top_edge.sum(dtype=np.float64) + bottom_edge.sum(dtype=np.float64))
+            / (top_edge.size + bottom_edge.size)
+        )
 
         has_dark_overlay = edge_brightness < 60 and center_brightness > edge_brightness + 40
 
         # Detect specific text/UI elements by looking for characteristic patterns
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray = ctx.gray
 
         # Check bottom region for gameplay elements (move counter, score)
         bottom_strip = gray[int(h * 0.88):, :]
@@ -218,12 +520,10 @@ class GameVision:
         top_activity = np.std(top_strip)
 
         # Check for green play button (prominent on many screens)
-        green_mask = self._color_mask(hsv, "play_button_green")
-        green_area = np.sum(green_mask > 0)
+        green_area = cv2.countNonZero(ctx.mask("play_button_green"))
 
         # Check for reward/gold colors
-        gold_mask = self._color_mask(hsv, "reward_gold")
-        gold_area = np.sum(gold_mask > 0)
+        gold_area = cv2.countNonZero(ctx.mask("reward_gold"))
 
         # Check for domino-like white rectangular objects in the middle
         mid_region = gray[int(h * 0.15):int(h * 0.8), int(w * 0.05):int(w * 0.95)]
@@ -233,24 +533,24 @@ class GameVision:
         )
         domino_like_objects = sum(
             1 for c in white_contours
-            if self.min_domino_area < cv2.contourArea(c) < self.max_domino_area
+            if self._area(self.min_domino_area) < cv2.contourArea(c) < self._area(self.max_domino_area)
         )
 
         # Decision logic
         if has_dark_overlay:
-            if gold_area > 5000:
+            if gold_area > self._area(5000):
                 return GameScreen.REWARD_POPUP
-            elif green_area > 3000:
+            elif green_area > self._area(3000):
                 # Could be level complete, failed, or generic popup
                 # Check for star-like shapes
-                stars = self._detect_stars(frame)
+                stars = self._detect_stars(ctx)
                 if stars > 0:
                     return GameScreen.LEVEL_COMPLETE
                 else:
                     return GameScreen.POPUP_DIALOG
             else:
                 # Check for X button suggesting a closeable popup
-                if self._find_x_button(frame) is not None:
+                if self._find_x_button(ctx) is not None:
                     return GameScreen.POPUP_DIALOG
                 return GameScreen.LOADING
 
@@ -259,217 +559,246 @@ class GameVision:
 
         # Check for building/decoration scene (colorful, interactive elements)
         color_variance = np.std(hsv[:, :, 0])
-        if color_variance > 40 and green_area > 2000:
+        if color_variance > 40 and green_area > self._area(2000):
             # Could be chapter map or building scene
             if bottom_white > 0.3:
                 return GameScreen.CHAPTER_MAP
             return GameScreen.BUILDING_SCENE
 
-        if green_area > 5000 and top_activity > 40:
+        if green_area > self._area(5000) and top_activity > 40:
             return GameScreen.LEVEL_SELECT
 
-        if green_area > 8000:
+        if green_area > self._area(8000):
             return GameScreen.HOME_MENU
 
         # Check for "out of lives" - typically has a heart icon
-        red_mask = cv2.inRange(hsv, np.array([0, 100, 100]), np.array([10, 255, 255]))
-        red_area = np.sum(red_mask > 0)
-        if red_area > 3000 and has_dark_overlay:
+        red_area = cv2.countNonZero(ctx.in_range((0, 100, 100), (10, 255, 255)))
+        if red_area > self._area(3000) and has_dark_overlay:
             return GameScreen.OUT_OF_LIVES
 
         return GameScreen.UNKNOWN
 
-    def _color_mask(self, hsv: np.ndarray, color_name: str) -> np.ndarray:
-        """Create a binary mask for a named color from config."""
-        c = self.colors[color_name]
-        lower = np.array(c[:3])
-        upper = np.array(c[3:])
-        return cv2.inRange(hsv, lower, upper)
-
-    def _find_board_region(self, frame: np.ndarray) -> Optional[BoundingBox]:
+    def _find_board_region(self, ctx: FrameContext) -> Optional[BoundingBox]:
         """Find the main game board area."""
-        h, w = frame.shape[:2]
+        h, w = ctx.h, ctx.w
         # The board is typically in the middle 70% of the screen
-        return BoundingBox(
-            x=int(w * 0.03),
-            y=int(h * 0.12),
-            w=int(w * 0.94),
-            h=int(h * 0.68)
-        )
+        return self._to_points(int(w * 0.03), int(h * 0.12), int(w * 0.94), int(h * 0.68))
 
-    def _detect_dominoes(self, frame: np.ndarray) -> List[Domino]:
+    def _detect_dominoes(self, ctx: FrameContext) -> List[Domino]:
         """Detect domino pieces on the game board."""
-        dominoes = []
-        h, w = frame.shape[:2]
+        h, w = ctx.h, ctx.w
 
         # Focus on the board region
         board_y1 = int(h * 0.12)
         board_y2 = int(h * 0.80)
         board_x1 = int(w * 0.03)
         board_x2 = int(w * 0.97)
-        board = frame[board_y1:board_y2, board_x1:board_x2]
 
-        # Convert to HSV for color detection
-        hsv = cv2.cvtColor(board, cv2.COLOR_BGR2HSV)
-        gray = cv2.cvtColor(board, cv2.COLOR_BGR2GRAY)
+        def detect(region: Rect) -> List[Tuple[Rect, Domino]]:
+            return self._detect_pieces(ctx, (board_x1, board_y1), region)
+
+        if self.tracker:
+            dominoes = self.tracker.update(ctx.frame[board_y1:board_y2, board_x1:board_x2], detect)
+        else:
+            dominoes = [d for _, d in detect((0, 0, board_x2 - board_x1, board_y2 - board_y1))]
+
+        logger.debug(f"Detected {len(dominoes)} dominoes")
+        return dominoes
+
+    def _detect_pieces(self, ctx: FrameContext, board_origin: Tuple[int, int],
+                       region: Rect) -> List[Tuple[Rect, Domino]]:
+        """
+        Detect the pieces inside `region` of the board, returned with their
+        board rectangles (working-frame pixels).
+        """
+        pieces = []
+        rx, ry, rw, rh = region
+        x1, y1 = board_origin[0] + rx, board_origin[1] + ry
+        x2, y2 = x1 + rw, y1 + rh
+        gray = ctx.gray[y1:y2, x1:x2]
 
         # Dominoes are typically white/light colored rectangles
         # with colored dots or dark dividing lines
         _, white_mask = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY)
 
         # Also detect colored dominoes (game uses various colors)
-        bright_mask = cv2.inRange(hsv, np.array([0, 0, 180]), np.array([180, 80, 255]))
+        bright_mask = ctx.in_range((0, 0, 180), (180, 80, 255))[y1:y2, x1:x2]
         combined = cv2.bitwise_or(white_mask, bright_mask)
 
         # Morphological operations to clean up
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
+        kernel = self._kernel(5, 5)
         combined = cv2.morphologyEx(combined, cv2.MORPH_CLOSE, kernel)
         combined = cv2.morphologyEx(combined, cv2.MORPH_OPEN, kernel)
 
-        # Find contours
-        contours, _ = cv2.findContours(combined, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if not (self.min_domino_area < area < self.max_domino_area):
-                continue
-
-            # Check aspect ratio - dominoes are roughly rectangular
-            rect = cv2.minAreaRect(contour)
-            box_w, box_h = rect[1]
-            if box_w == 0 or box_h == 0:
-                continue
-            aspect = max(box_w, box_h) / min(box_w, box_h)
-            if aspect > 4.0:
-                continue  # Too elongated
-
-            x, y, bw, bh = cv2.boundingRect(contour)
-
+        # Label every piece in one pass. Dots are holes in the mask, so each
+        # piece is labeled by its filled outline
+        labels, stats = self._label_outlines(combined)
+        areas = stats[:, cv2.CC_STAT_AREA]
+        keep = (areas > self._area(self.min_domino_area)) & (areas < self._area(self.max_domino_area))
+        keep[0] = False  # background
+        # Dominoes are roughly rectangular; drop elongated shapes
+        keep &= self._aspect_ratios(stats) <= 4.0
+        ids = np.flatnonzero(keep)
+        if not len(ids):
+            return pieces
+
+        boxes = stats[ids, :4]
+        top_dots, bottom_dots = self._count_dots(gray, labels, ids, boxes)
+        highlighted = self._highlighted(ctx.hsv[y1:y2, x1:x2], boxes)
+
+        for box, top, bottom, is_highlighted in zip(boxes, top_dots, bottom_dots, highlighted):
+            x, y, bw, bh = (int(v) for v in box)
             # Adjust coordinates back to full frame
-            abs_x = x + board_x1
-            abs_y = y + board_y1
-
-            # Convert pixel coords to screen points
-            pt_x = abs_x // self.scale
-            pt_y = abs_y // self.scale
-            pt_w = bw // self.scale
-            pt_h = bh // self.scale
-
-            bbox = BoundingBox(pt_x, pt_y, pt_w, pt_h)
-
-            # Count dots in top and bottom halves
-            domino_roi = gray[y:y + bh, x:x + bw] if bh > 0 and bw > 0 else None
-            top_val, bottom_val = 0, 0
-            if domino_roi is not None and domino_roi.size > 0:
-                top_val = self._count_dots(domino_roi[:bh // 2, :])
-                bottom_val = self._count_dots(domino_roi[bh // 2:, :])
-
-            # Check if domino is highlighted (glowing/pulsing = playable)
-            is_highlighted = self._is_highlighted(
-                frame[abs_y:abs_y + bh, abs_x:abs_x + bw]
-            )
-
-            dominoes.append(Domino(
+            bbox = self._to_points(x + x1, y + y1, bw, bh)
+            pieces.append(((x + rx, y + ry, bw, bh), Domino(
                 bbox=bbox,
-                top_value=top_val,
-                bottom_value=bottom_val,
+                top_value=int(top),
+                bottom_value=int(bottom),
                 is_playable=True,  # Assume playable, refined in game logic
-                is_highlighted=is_highlighted
-            ))
-
-        logger.debug(f"Detected {len(dominoes)} dominoes")
-        return dominoes
-
-    def _count_dots(self, roi: np.ndarray) -> int:
-        """Count the number of dots in a domino half."""
-        if roi is None or roi.size == 0:
-            return 0
-
-        # Dots are dark circles on light background
-        _, dark_mask = cv2.threshold(roi, 100, 255, cv2.THRESH_BINARY_INV)
-
-        # Find circular blobs
-        contours, _ = cv2.findContours(dark_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-
-        dot_count = 0
-        min_dot_area = roi.size * 0.005  # Minimum 0.5% of ROI
-        max_dot_area = roi.size * 0.15  # Maximum 15% of ROI
-
-        for c in contours:
-            area = cv2.contourArea(c)
-            if min_dot_area < area < max_dot_area:
-                # Check circularity
-                perimeter = cv2.arcLength(c, True)
-                if perimeter > 0:
-                    circularity = 4 * 3.14159 * area / (perimeter * perimeter)
-                    if circularity > 0.4:  # Reasonably circular
-                        dot_count += 1
-
-        return min(dot_count, 6)  # Cap at 6
+                is_highlighted=bool(is_highlighted)
+            )))
+        return pieces
+
+    @staticmethod
+    def _components(mask: np.ndarray) -> Tuple[int, np.ndarray, np.ndarray, np.ndarray]:
+        """connectedComponentsWithStats, with 16-bit labels unless there are too many."""
+        try:
+            # Stats are computed noticeably faster over 16-bit labels
+            return cv2.connectedComponentsWithStats(mask, connectivity=8, ltype=cv2.CV_16U)
+        except cv2.error:
+            return cv2.connectedComponentsWithStats(mask, connectivity=8, ltype=cv2.CV_32S)
+
+    def _label_outlines(self, mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Label image and connectedComponentsWithStats-style stats of the mask
+        components with their holes (dots, dividers) filled. Drawing the
+        outer contours is much cheaper than flood filling and labeling the
+        whole board; specks too small to be a piece are left unlabeled.
+        """
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        labels = np.zeros(mask.shape, dtype=np.uint16 if len(contours) < 65535 else np.int32)
+        stats = np.zeros((len(contours) + 1, 5), dtype=np.int32)
+        min_area = self._area(self.min_domino_area)
+        for i, contour in enumerate(contours, 1):
+            x, y, w, h = cv2.boundingRect(contour)
+            stats[i, :4] = x, y, w, h
+            if w * h <= min_area:
+                continue
+            box = labels[y:y + h, x:x + w]
+            cv2.drawContours(box, [contour], -1, i, cv2.FILLED, offset=(-x, -y))
+            stats[i, cv2.CC_STAT_AREA] = np.count_nonzero(box == i)
+        return labels, stats
 
-    def _is_highlighted(self, roi: np.ndarray) -> bool:
-        """Check if a domino region is highlighted/glowing."""
-        if roi is None or roi.size == 0:
-            return False
+    @staticmethod
+    def _aspect_ratios(stats: np.ndarray) -> np.ndarray:
+        """
+        Long/short side ratio of every component, treating it as a filled
+        rectangle at some rotation. Its area a*b and bounding box w x h pin
+        down the sides: with s = sin(t)cos(t),
+            w*h = a*b + (a^2 + b^2)*s  and  w^2 + h^2 = a^2 + b^2 + 4*a*b*s
+        Exact for rectangles like minAreaRect, and 1 for round blobs.
+        """
+        area = np.maximum(stats[:, cv2.CC_STAT_AREA], 1).astype(np.float64)
+        w = stats[:, cv2.CC_STAT_WIDTH].astype(np.float64)
+        h = stats[:, cv2.CC_STAT_HEIGHT].astype(np.float64)
+        diag = w * w + h * h
+
+        # Smaller root of 4A*s^2 - (w^2 + h^2)*s + (wh - A) = 0
+        disc = np.maximum(diag * diag - 16 * area * (w * h - area), 0)
+        s = (diag - np.sqrt(disc)) / (8 * area)
+        sides = np.maximum(diag - 4 * area * s, 2 * area) / area  # a/b + b/a
+        return (sides + np.sqrt(sides * sides - 4)) / 2
+
+    def _count_dots(self, gray: np.ndarray, labels: np.ndarray, ids: np.ndarray,
+                    boxes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Count the dots in the top and bottom half of the pieces labeled `ids`,
+        with (x, y, w, h) `boxes`. Returns two arrays in the order of `ids`.
+        """
+        zeros = np.zeros(len(ids), dtype=np.int64)
+
+        # Dots are dark circles inside the piece. Only the pieces' boxes can
+        # hold any, so they are laid side by side in one strip, a blank column
+        # apart, and labeled at once in far fewer pixels than the board
+        x, y, w, h = (boxes[:, i] for i in range(4))
+        left = np.concatenate(([0], np.cumsum(w + 1)[:-1]))
+        strip = np.zeros((h.max(), left[-1] + w[-1]), dtype=np.uint8)
+        for i, bx, by, bw, bh, sx in zip(ids, x, y, w, h, left):
+            box = (slice(by, by + bh), slice(bx, bx + bw))
+            strip[:bh, sx:sx + bw] = (gray[box] <= 100) & (labels[box] == i)
+        n, _, dots, centroids = self._components(strip)
+        if n <= 1:
+            return zeros, zeros
+        dots, centroids = dots[1:], centroids[1:]
+        piece = np.searchsorted(left, dots[:, cv2.CC_STAT_LEFT], side="right") - 1
+        cx = np.rint(centroids[:, 0]).astype(int) - left[piece]
+        cy = np.rint(centroids[:, 1]).astype(int)
+        pw, ph = w[piece], h[piece]
+
+        # Size limits are relative to the half of the piece the dot sits in
+        in_top = cy < ph // 2
+        half_size = pw * np.where(in_top, ph // 2, ph - ph // 2)
+        area = dots[:, cv2.CC_STAT_AREA]
+        dw, dh = dots[:, cv2.CC_STAT_WIDTH], dots[:, cv2.CC_STAT_HEIGHT]
+
+        # On the piece itself, and reasonably circular: fills most of its box
+        # and is not a streak
+        is_dot = (
+            (labels[y[piece] + cy, x[piece] + cx] == ids[piece])
+            & (area > half_size * 0.005) & (area < half_size * 0.15)
+            & (area >= 0.5 * dw * dh)
+            & (np.maximum(dw, dh) <= 5 * np.minimum(dw, dh))
+        )
+        top = np.bincount(piece[is_dot & in_top], minlength=len(ids))
+        bottom = np.bincount(piece[is_dot & ~in_top], minlength=len(ids))
+        return np.minimum(top, 6), np.minimum(bottom, 6)  # Cap at 6
 
-        hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
-        # Highlighted dominoes often have higher saturation or brightness
-        avg_sat = np.mean(hsv[:, :, 1])
-        avg_val = np.mean(hsv[:, :, 2])
+    @staticmethod
+    def _highlighted(hsv: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+        """Whether each (x, y, w, h) box of an HSV image is highlighted/glowing."""
+        means = np.array([cv2.mean(hsv[y:y + h, x:x + w]) for x, y, w, h in boxes])
+        avg_sat, avg_val = means[:, 1], means[:, 2]
 
         # A glow typically shows high value and moderate saturation
-        return avg_val > 200 and avg_sat > 30
+        return (avg_val > 200) & (avg_sat > 30)
 
-    def _find_tap_targets(self, frame: np.ndarray) -> List[BoundingBox]:
+    def _find_tap_targets(self, ctx: FrameContext) -> List[BoundingBox]:
         """
         Find tappable/interactive elements during gameplay.
         In Domino Dreams, players tap domino pieces to trigger chain reactions.
         """
         targets = []
-        h, w = frame.shape[:2]
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        h = ctx.h
 
         # Look for glowing/pulsing elements (typically brighter, saturated)
         # These are the dominoes you're supposed to tap
-        glow_mask = cv2.inRange(
-            hsv,
-            np.array([0, 40, 220]),
-            np.array([180, 255, 255])
-        )
+        glow_mask = ctx.in_range((0, 40, 220), (180, 255, 255))
 
-        # Focus on board region
-        board_mask = np.zeros_like(glow_mask)
+        # Focus on board region (copy: the cached mask is shared)
         board_y1 = int(h * 0.12)
         board_y2 = int(h * 0.80)
-        board_mask[board_y1:board_y2, :] = 255
-        glow_mask = cv2.bitwise_and(glow_mask, board_mask)
+        glow_mask = glow_mask.copy()
+        glow_mask[:board_y1] = 0
+        glow_mask[board_y2:] = 0
 
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (7, 7))
-        glow_mask = cv2.morphologyEx(glow_mask, cv2.MORPH_CLOSE, kernel)
+        glow_mask = cv2.morphologyEx(glow_mask, cv2.MORPH_CLOSE, self._kernel(7, 7))
 
         contours, _ = cv2.findContours(glow_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
         for c in contours:
             area = cv2.contourArea(c)
-            if area < self.min_domino_area:
+            if area < self._area(self.min_domino_area):
                 continue
-            x, y, bw, bh = cv2.boundingRect(c)
-            targets.append(BoundingBox(
-                x=x // self.scale,
-                y=y // self.scale,
-                w=bw // self.scale,
-                h=bh // self.scale
-            ))
+            targets.append(self._to_points(*cv2.boundingRect(c)))
 
         return targets
 
-    def _find_button_by_color(self, frame: np.ndarray, color_name: str) -> Optional[BoundingBox]:
+    def _find_button_by_color(self, ctx: FrameContext, color_name: str) -> Optional[BoundingBox]:
         """Find a button matching a specific color profile."""
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        mask = self._color_mask(hsv, color_name)
+        mask = ctx.mask(color_name)
 
         # Clean up the mask
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (10, 10))
+        kernel = self._kernel(10, 10)
         mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
         mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
 
@@ -481,26 +810,25 @@ class GameVision:
 
         for c in contours:
             area = cv2.contourArea(c)
-            if area < 2000:  # Too small to be a button
+            if area < self._area(2000):  # Too small to be a button
                 continue
             if area > best_area:
                 x, y, bw, bh = cv2.boundingRect(c)
                 # Buttons are wider than tall
                 if bw > bh * 0.5:
-                    best = BoundingBox(
-                        x=x // self.scale,
-                        y=y // self.scale,
-                        w=bw // self.scale,
-                        h=bh // self.scale
-                    )
+                    best = self._to_points(x, y, bw, bh)
                     best_area = area
 
         return best
 
-    def _find_x_button(self, frame: np.ndarray) -> Optional[BoundingBox]:
+    def _find_x_button(self, ctx: FrameContext) -> Optional[BoundingBox]:
         """Find an X/close button, typically in the top-right of a popup."""
-        h, w = frame.shape[:2]
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        # Also used by screen classification; HoughCircles is too slow to run twice
+        return ctx.memo("x_button", lambda: self._search_x_button(ctx))
+
+    def _search_x_button(self, ctx: FrameContext) -> Optional[BoundingBox]:
+        h, w = ctx.h, ctx.w
+        gray = ctx.gray
 
         # X buttons are usually in the top-right quadrant of popups
         # Scan the upper portion of the frame
@@ -508,8 +836,8 @@ class GameVision:
 
         # X buttons are often circular with an X pattern inside
         circles = cv2.HoughCircles(
-            search_region, cv2.HOUGH_GRADIENT, 1, 30,
-            param1=100, param2=30, minRadius=10, maxRadius=40
+            search_region, cv2.HOUGH_GRADIENT, 1, self._size(30),
+            param1=100, param2=30, minRadius=self._size(10), maxRadius=self._size(40)
         )
 
         if circles is not None:
@@ -517,12 +845,8 @@ class GameVision:
             for cx, cy, r in circles[0]:
                 abs_x = int(cx + w * 0.5)
                 abs_y = int(cy)
-                return BoundingBox(
-                    x=(abs_x - r) // self.scale,
-                    y=(abs_y - r) // self.scale,
-                    w=(2 * r) // self.scale,
-                    h=(2 * r) // self.scale
-                )
+                r = int(r)
+                return self._to_points(abs_x - r, abs_y - r, 2 * r, 2 * r)
 
         # Fallback: look for small dark circles in corners of detected popups
         _, dark_mask = cv2.threshold(gray[:int(h * 0.5), :], 80, 255, cv2.THRESH_BINARY_INV)
@@ -530,106 +854,80 @@ class GameVision:
 
         for c in contours:
             area = cv2.contourArea(c)
-            if 200 < area < 5000:
+            if self._area(200) < area < self._area(5000):
                 perimeter = cv2.arcLength(c, True)
                 if perimeter > 0:
                     circularity = 4 * 3.14159 * area / (perimeter * perimeter)
                     if circularity > 0.6:
                         x, y, bw, bh = cv2.boundingRect(c)
                         if x > w * 0.5:  # Right side
-                            return BoundingBox(
-                                x=x // self.scale,
-                                y=y // self.scale,
-                                w=bw // self.scale,
-                                h=bh // self.scale
-                            )
+                            return self._to_points(x, y, bw, bh)
 
         return None
 
-    def _find_glowing_elements(self, frame: np.ndarray) -> List[BoundingBox]:
+    def _find_glowing_elements(self, ctx: FrameContext) -> List[BoundingBox]:
         """Find glowing/interactive elements in building scenes."""
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
         targets = []
 
         # Glowing elements have high brightness and often a colored outline
-        glow = cv2.inRange(hsv, np.array([0, 50, 230]), np.array([180, 255, 255]))
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (10, 10))
-        glow = cv2.morphologyEx(glow, cv2.MORPH_CLOSE, kernel)
+        glow = ctx.in_range((0, 50, 230), (180, 255, 255))
+        glow = cv2.morphologyEx(glow, cv2.MORPH_CLOSE, self._kernel(10, 10))
 
         contours, _ = cv2.findContours(glow, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         for c in contours:
             area = cv2.contourArea(c)
-            if 1000 < area < 100000:
-                x, y, bw, bh = cv2.boundingRect(c)
-                targets.append(BoundingBox(
-                    x=x // self.scale,
-                    y=y // self.scale,
-                    w=bw // self.scale,
-                    h=bh // self.scale
-                ))
+            if self._area(1000) < area < self._area(100000):
+                targets.append(self._to_points(*cv2.boundingRect(c)))
 
         return targets
 
-    def _find_any_buttons(self, frame: np.ndarray) -> List[BoundingBox]:
+    def _find_any_buttons(self, ctx: FrameContext) -> List[BoundingBox]:
         """Last resort: find anything that looks like a tappable button."""
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        h, w = frame.shape[:2]
         targets = []
 
         # Look for saturated, bright rectangular regions (buttons)
-        sat_mask = cv2.inRange(hsv, np.array([0, 80, 150]), np.array([180, 255, 255]))
+        sat_mask = ctx.in_range((0, 80, 150), (180, 255, 255))
 
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (15, 10))
-        sat_mask = cv2.morphologyEx(sat_mask, cv2.MORPH_CLOSE, kernel)
+        sat_mask = cv2.morphologyEx(sat_mask, cv2.MORPH_CLOSE, self._kernel(15, 10))
 
         contours, _ = cv2.findContours(sat_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         for c in contours:
             area = cv2.contourArea(c)
-            if 3000 < area < 80000:
+            if self._area(3000) < area < self._area(80000):
                 x, y, bw, bh = cv2.boundingRect(c)
                 # Button-like aspect ratio
-                if bw > bh * 1.2 and bh > 20:
-                    targets.append(BoundingBox(
-                        x=x // self.scale,
-                        y=y // self.scale,
-                        w=bw // self.scale,
-                        h=bh // self.scale
-                    ))
+                if bw > bh * 1.2 and bh > self._size(20):
+                    targets.append(self._to_points(x, y, bw, bh))
 
         return targets
 
-    def _detect_stars(self, frame: np.ndarray) -> int:
+    def _detect_stars(self, ctx: FrameContext) -> int:
         """Detect number of stars earned on level complete screen."""
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        h, w = frame.shape[:2]
+        return ctx.memo("stars", lambda: self._count_stars(ctx))
 
+    def _count_stars(self, ctx: FrameContext) -> int:
         # Stars are golden/yellow, typically in the upper-center of the popup
-        star_region = hsv[int(h * 0.15):int(h * 0.45), int(w * 0.15):int(w * 0.85)]
-        gold_mask = cv2.inRange(star_region, np.array([15, 100, 150]), np.array([35, 255, 255]))
+        gold_mask = ctx.crop(ctx.in_range((15, 100, 150), (35, 255, 255)), 0.15, 0.45, 0.15, 0.85)
 
         # Count distinct gold blobs
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
-        gold_mask = cv2.morphologyEx(gold_mask, cv2.MORPH_OPEN, kernel)
+        gold_mask = cv2.morphologyEx(gold_mask, cv2.MORPH_OPEN, self._kernel(5, 5))
         contours, _ = cv2.findContours(gold_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
-        star_count = sum(1 for c in contours if cv2.contourArea(c) > 500)
+        star_count = sum(1 for c in contours if cv2.contourArea(c) > self._area(500))
         return min(star_count, 3)
 
-    def _detect_moves(self, frame: np.ndarray) -> int:
+    def _detect_moves(self, ctx: FrameContext) -> int:
         """Detect remaining moves counter (returns -1 if not found)."""
         # This would ideally use OCR - for now, return -1 (unknown)
         # The bot doesn't strictly need this since it plays by visual cues
         return -1
 
-    def _detect_chain(self, frame: np.ndarray) -> bool:
+    def _detect_chain(self, ctx: FrameContext) -> bool:
         """Detect if a domino chain reaction is currently in progress."""
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        h, w = frame.shape[:2]
-
         # During chain reactions, there are usually bright particle effects
-        board_region = hsv[int(h * 0.15):int(h * 0.8), :]
-        bright_count = np.sum(board_region[:, :, 2] > 240)
-        total_pixels = board_region[:, :, 2].size
+        board_value = ctx.crop(ctx.hsv, 0.15, 0.8)[:, :, 2]
+        bright_count = np.count_nonzero(board_value > 240)
+        total_pixels = board_value.size
 
         # If more than 5% of the board is extremely bright, likely a chain
         return (bright_count / total_pixels) > 0.05
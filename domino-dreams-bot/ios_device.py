@@ -4,7 +4,6 @@ Handles connecting to an iPhone over USB, taking screenshots,
 and sending touch/swipe events using pymobiledevice3.
 """
 
-import io
 import time
 import logging
 import subprocess
@@ -12,16 +11,25 @@ import struct
 from pathlib import Path
 from typing import Optional, Tuple
 
-from PIL import Image
+import cv2
 import numpy as np
 
+from capture import DvtScreenshotSource, FrameGrabber, FrameSource, decode_png
+from touch import ActionQueue, Gesture, TouchSession
+
 logger = logging.getLogger("domino_bot.device")
 
 
 class iOSDevice:
     """Manages connection to an iPhone and provides screen capture + touch input."""
 
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, frame_source: Optional[FrameSource] = None):
+        """
+        Args:
+            config: Bot configuration.
+            frame_source: Capture from this source instead of a USB device,
+                          e.g. a FolderFrameSource for testing.
+        """
         self.config = config
         self.screen_width = config["device"]["screen_width"]
         self.screen_height = config["device"]["screen_height"]
@@ -30,9 +38,25 @@ class iOSDevice:
         self.swipe_delay = config["timing"]["swipe_delay"]
         self._device_udid: Optional[str] = None
         self._connected = False
+        self.stream_screenshots = config["device"].get("stream_screenshots", True)
+        self._frame_source = frame_source
+        self._grabber: Optional[FrameGrabber] = None
+        self._last_seq = -1
+        # time.monotonic() at which the last returned screenshot was taken (at the latest)
+        self.last_frame_time = 0.0
+        self.persistent_touch = config["device"].get("persistent_touch", True)
+        self._touch_session: Optional[TouchSession] = None
+        self._actions: Optional[ActionQueue] = None
 
     def connect(self) -> bool:
         """Discover and connect to an iOS device over USB."""
+        if self._frame_source is not None:
+            if not self._frame_source.open():
+                return False
+            self._start_grabber(self._frame_source)
+            self._connected = True
+            return True
+
         logger.info("Searching for connected iOS devices...")
         try:
             # Use pymobiledevice3 CLI to list devices
@@ -75,6 +99,10 @@ class iOSDevice:
             if self._device_udid:
                 logger.info(f"Connected to device: {self._device_udid}")
                 self._connected = True
+                if self.stream_screenshots:
+                    self._start_streaming()
+                if self.persistent_touch:
+                    self._start_touch()
                 return True
             else:
                 logger.error("Could not parse device UDID from output.")
@@ -91,6 +119,42 @@ class iOSDevice:
             logger.error("Timed out searching for devices.")
             return False
 
+    def _start_streaming(self):
+        """Keep a screenshot channel open in the background, if the device allows it."""
+        source = DvtScreenshotSource(self._device_udid)
+        if source.open():
+            self._start_grabber(source)
+            logger.info("Streaming screenshots over a persistent DVT channel")
+        else:
+            logger.info("Persistent screenshot channel unavailable, capturing per frame")
+
+    def _start_grabber(self, source: FrameSource):
+        self._grabber = FrameGrabber(source)
+        self._grabber.start()
+
+    def _start_touch(self):
+        """Open a touch session that stays connected, fed by a background action queue."""
+        self._touch_session = TouchSession(self._device_udid)
+        if self._touch_session.open():
+            self._actions = ActionQueue(self._touch_session, fallback=self._send_gesture_cli)
+            self._actions.start()
+            logger.info("Sending touches over a persistent session")
+        else:
+            logger.info("Persistent touch session unavailable, sending touches per gesture")
+
+    def disconnect(self):
+        """Stop background capture and touch, and release the device."""
+        if self._grabber:
+            self._grabber.stop()
+            self._grabber = None
+        if self._actions:
+            self._actions.stop()
+            self._actions = None
+        if self._touch_session:
+            self._touch_session.close()
+            self._touch_session = None
+        self._connected = False
+
     @property
     def is_connected(self) -> bool:
         return self._connected
@@ -104,6 +168,20 @@ class iOSDevice:
             logger.error("Not connected to a device.")
             return None
 
+        if self._grabber:
+            # Newest frame from the background channel, never one already returned
+            frame, seq, captured_at = self._grabber.latest(newer_than=self._last_seq)
+            if seq != self._last_seq:
+                self._last_seq = seq
+                self.last_frame_time = captured_at
+                return frame
+            if self._frame_source is not None:
+                logger.warning(f"No new frame from the {self._grabber.source.name} source")
+                return None
+            # The channel has stalled; capture this frame the slow way
+            logger.warning("Screenshot channel produced no new frame, capturing directly")
+
+        self.last_frame_time = time.monotonic()
         try:
             # pymobiledevice3 screenshot command outputs PNG to stdout
             cmd = ["pymobiledevice3", "developer", "dvt", "screenshot", "/dev/stdout"]
@@ -118,17 +196,7 @@ class iOSDevice:
                 # Fallback: try the lockdown-based screenshot method
                 return self._screenshot_fallback()
 
-            # Convert PNG bytes to numpy array
-            img = Image.open(io.BytesIO(result.stdout))
-            img_array = np.array(img)
-
-            # Convert RGB(A) to BGR for OpenCV
-            if img_array.shape[2] == 4:
-                img_bgr = img_array[:, :, [2, 1, 0]]  # RGBA -> BGR
-            else:
-                img_bgr = img_array[:, :, [2, 1, 0]]  # RGB -> BGR
-
-            return img_bgr
+            return decode_png(result.stdout)
 
         except subprocess.TimeoutExpired:
             logger.warning("Screenshot timed out, retrying...")
@@ -156,11 +224,7 @@ class iOSDevice:
                 result = subprocess.run(cmd2, capture_output=True, timeout=15)
 
             if result.returncode == 0 and Path(tmp_path).exists():
-                img = Image.open(tmp_path)
-                img_array = np.array(img)
-                if len(img_array.shape) == 3 and img_array.shape[2] >= 3:
-                    return img_array[:, :, [2, 1, 0]]
-                return img_array
+                return cv2.imread(tmp_path, cv2.IMREAD_COLOR)
 
             logger.error(
                 "Screenshot fallback also failed. Ensure developer services are available:\n"
@@ -183,20 +247,43 @@ class iOSDevice:
             return
 
         logger.debug(f"Tap at ({x}, {y})")
+        self._perform(Gesture("tap", x, y, settle=self.tap_delay))
+
+    def _perform(self, gesture: Gesture):
+        """
+        Queue a gesture on the persistent session, whose thread also waits
+        out its settle time, or send it directly and wait here.
+        """
+        if self._actions:
+            self._actions.submit(gesture)
+            return
         try:
-            cmd = [
-                "pymobiledevice3", "developer", "dvt", "simulate-location",
-                "play", str(x), str(y)
-            ]
-            # The above is for location - for touch we use accessibility or hid
-            # Use the HID (Human Interface Device) approach
-            self._send_touch_event(x, y)
+            if gesture.kind == "swipe":
+                self._swipe_cli(gesture)
+            else:
+                self._send_touch_event(gesture.x, gesture.y, gesture.duration)
         except Exception as e:
-            logger.error(f"Tap failed: {e}")
+            logger.error(f"{gesture.kind.capitalize()} failed: {e}")
+        time.sleep(gesture.settle)
 
-        time.sleep(self.tap_delay)
-
-    def _send_touch_event(self, x: int, y: int, duration: float = 0.05):
+    def flush_actions(self) -> float:
+        """
+        Wait until every queued gesture has reached the device and settled.
+        Returns the time.monotonic() at which that was true; frames captured
+        after it show the effect of every gesture.
+        """
+        if self._actions:
+            self._actions.flush()
+        return time.monotonic()
+
+    def _send_gesture_cli(self, gesture: Gesture):
+        """Send a gesture through the pymobiledevice3 CLI (persistent session fallback)."""
+        if gesture.kind == "swipe":
+            self._swipe_cli(gesture)
+        else:
+            self._send_touch_event(gesture.x, gesture.y, gesture.duration, try_api=False)
+
+    def _send_touch_event(self, x: int, y: int, duration: float = 0.05, try_api: bool = True):
         """Send a touch event via pymobiledevice3 accessibility or HID."""
         try:
             # Method 1: Using pymobiledevice3 developer dvt accessibility
@@ -225,34 +312,21 @@ class iOSDevice:
                 return
 
             # Method 3: Use Python API directly
-            self._send_touch_via_api(x, y, duration)
+            if try_api:
+                self._send_touch_via_api(x, y, duration)
 
         except Exception as e:
             logger.error(f"Touch event failed: {e}")
-            self._send_touch_via_api(x, y, duration)
+            if try_api:
+                self._send_touch_via_api(x, y, duration)
 
     def _send_touch_via_api(self, x: int, y: int, duration: float = 0.05):
         """Send touch event using pymobiledevice3 Python API."""
-        try:
-            from pymobiledevice3.lockdown import create_using_usbmux
-            from pymobiledevice3.services.dvt.dvt_secure_socket_proxy import DvtSecureSocketProxyService
-            from pymobiledevice3.services.dvt.instruments.device_info import DeviceInfo
-
-            lockdown = create_using_usbmux(serial=self._device_udid)
-
-            # Use the remote HID simulation
-            with DvtSecureSocketProxyService(lockdown=lockdown) as dvt:
-                # Simulate a tap using the HID channel
-                # Touch down
-                dvt.send_message(
-                    "_WDAutomation",
-                    "tap",
-                    {"x": x, "y": y, "duration": duration}
-                )
-        except ImportError:
-            logger.warning("Could not import pymobiledevice3 API modules")
-        except Exception as e:
-            logger.debug(f"API touch event: {e}")
+        # Reuse one session rather than a new lockdown + DVT handshake per tap
+        if self._touch_session is None:
+            self._touch_session = TouchSession(self._device_udid)
+        if not self._touch_session.send([Gesture("tap", x, y, duration=duration)]):
+            logger.debug("API touch event was not delivered")
 
     def swipe(self, x1: int, y1: int, x2: int, y2: int, duration: float = 0.3):
         """
@@ -262,21 +336,19 @@ class iOSDevice:
             return
 
         logger.debug(f"Swipe from ({x1},{y1}) to ({x2},{y2})")
-        try:
-            cmd = [
-                "pymobiledevice3", "developer", "dvt", "accessibility",
-                "run-action", "swipe",
-                str(x1), str(y1), str(x2), str(y2),
-                "--duration", str(duration)
-            ]
-            if self._device_udid:
-                cmd.extend(["--udid", self._device_udid])
+        self._perform(Gesture("swipe", x1, y1, x2, y2, duration, settle=self.swipe_delay))
 
-            subprocess.run(cmd, capture_output=True, timeout=10)
-        except Exception as e:
-            logger.error(f"Swipe failed: {e}")
+    def _swipe_cli(self, gesture: Gesture):
+        cmd = [
+            "pymobiledevice3", "developer", "dvt", "accessibility",
+            "run-action", "swipe",
+            str(gesture.x), str(gesture.y), str(gesture.x2), str(gesture.y2),
+            "--duration", str(gesture.duration)
+        ]
+        if self._device_udid:
+            cmd.extend(["--udid", self._device_udid])
 
-        time.sleep(self.swipe_delay)
+        subprocess.run(cmd, capture_output=True, timeout=10)
 
     def long_press(self, x: int, y: int, duration: float = 1.0):
         """Simulate a long press at (x, y)."""
@@ -284,15 +356,12 @@ class iOSDevice:
             return
 
         logger.debug(f"Long press at ({x}, {y}) for {duration}s")
-        self._send_touch_event(x, y, duration=duration)
-        time.sleep(duration + self.tap_delay)
+        self._perform(Gesture("long_press", x, y, duration=duration, settle=duration + self.tap_delay))
 
     def save_screenshot(self, path: str, frame: Optional[np.ndarray] = None):
         """Save a screenshot to disk for debugging."""
         if frame is None:
             frame = self.screenshot()
         if frame is not None:
-            # Convert BGR back to RGB for saving
-            img = Image.fromarray(frame[:, :, [2, 1, 0]])
-            img.save(path)
+            cv2.imwrite(path, frame)
             logger.debug(f"Screenshot saved: {path}")
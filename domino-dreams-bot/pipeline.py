@@ -0,0 +1,100 @@
+"""
+Analysis Pipeline
+Captures and analyzes screenshots on a worker thread, so a fresh GameState
+is ready the moment the bot finishes an action instead of being produced
+only after it asks for one.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from game_vision import GameState, GameVision
+from ios_device import iOSDevice
+
+logger = logging.getLogger("domino_bot.pipeline")
+
+
+@dataclass
+class Analysis:
+    """One analyzed frame."""
+    frame: np.ndarray
+    state: GameState
+    captured_at: float  # time.monotonic() of the capture
+    seq: int
+
+
+class AnalysisPipeline:
+    """
+    Keeps the newest analyzed frame available.
+
+    The worker analyzes every frame it gets, including those taken while an
+    action is running, which keeps GameVision's frame-to-frame animation
+    check current. The bot only acts on frames captured after its last
+    action finished, and reacts as soon as the screen shows something new
+    rather than on a fixed timer.
+    """
+
+    def __init__(self, device: iOSDevice, vision: GameVision, retry_delay: float = 2.0):
+        self.device = device
+        self.vision = vision
+        self.retry_delay = retry_delay
+        self.frames_analyzed = 0
+
+        self._cond = threading.Condition()
+        self._latest: Optional[Analysis] = None
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="vision", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        seq = 0
+        while self._running:
+            frame = self.device.screenshot()
+            if frame is None:
+                logger.warning("Screenshot failed, retrying...")
+                time.sleep(self.retry_delay)
+                continue
+            captured_at = self.device.last_frame_time
+            state = self.vision.analyze(frame)
+            seq += 1
+            with self._cond:
+                self._latest = Analysis(frame, state, captured_at, seq)
+                self.frames_analyzed += 1
+                self._cond.notify_all()
+
+    def next(self, captured_after: float, previous: Optional[Analysis], timeout: float) -> Optional[Analysis]:
+        """
+        Wait for an analysis of a frame captured after `captured_after` whose
+        state differs from `previous`. An unchanged screen yields the same
+        GameState object, so after `timeout` the newest qualifying analysis
+        is returned anyway (None if there is none yet).
+        """
+        def is_fresh() -> bool:
+            latest = self._latest
+            return latest is not None and latest.captured_at >= captured_after
+
+        def is_new() -> bool:
+            return is_fresh() and (previous is None or self._latest.state is not previous.state)
+
+        with self._cond:
+            self._cond.wait_for(lambda: is_new() or not self._running, timeout=timeout)
+            if not is_fresh():
+                # Capture is slower than the timeout; allow one more period
+                self._cond.wait_for(lambda: is_fresh() or not self._running, timeout=timeout)
+            return self._latest if is_fresh() else None
@@ -0,0 +1,281 @@
+"""
+Screenshot Replay
+Drives GameVision and GameLogic from saved screenshots instead of an
+iPhone, and scores the results against ground-truth labels. Used by
+`python bot.py --replay DIR`.
+
+A screenshot's screen label comes from a folder or file name, as for
+screen_index.py (screenshots/GAMEPLAY/a.png, 20240101_120000_GAMEPLAY.png).
+A JSON file with the same name overrides it and can list the dominoes too,
+in screen points:
+
+    {"screen": "GAMEPLAY",
+     "dominoes": [{"x": 40, "y": 210, "w": 28, "h": 56, "top": 3, "bottom": 5}]}
+
+`--label` writes that file for every screenshot that has none, filled in
+from the current detections, as a starting point for correcting by hand.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from benchmark_vision import instrument, summarize
+from game_logic import GameLogic
+from game_vision import Domino, GameScreen, GameState, GameVision, Rect
+from screen_index import SKIP_LABELS, screenshot_label, signature
+
+logger = logging.getLogger("domino_bot.replay")
+
+MATCH_IOU = 0.5  # a detected domino counts as found above this overlap
+SELF_MATCH_DISTANCE = 1e-6  # a screen index reference this close is the screenshot itself
+
+
+class StackSampler:
+    """
+    Samples the call stack of the thread that started it at a fixed
+    interval, and writes the samples as folded stacks ("a;b;c 12" per
+    line), the input of flamegraph.pl, speedscope and inferno.
+    """
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._target = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def write(self, path: str):
+        with open(path, "w") as f:
+            for stack, count in sorted(self.samples.items()):
+                f.write(f"{stack} {count}\n")
+
+
+def load_labels(path: Path, valid: set) -> Tuple[Optional[str], Optional[List[Rect]], Optional[List[Tuple[int, int]]]]:
+    """
+    Ground truth for one screenshot: (screen, domino boxes, domino values).
+    Boxes and values are None when the dominoes were not labeled; values
+    are None when any labeled domino lacks them.
+    """
+    screen = screenshot_label(path, valid)
+    boxes = values = None
+    sidecar = path.with_suffix(".json")
+    if sidecar.exists():
+        with open(sidecar, "r") as f:
+            data = json.load(f)
+        screen = data.get("screen", screen)
+        if "dominoes" in data:
+            pieces = data["dominoes"]
+            boxes = [(d["x"], d["y"], d["w"], d["h"]) for d in pieces]
+            if all("top" in d and "bottom" in d for d in pieces):
+                values = [(d["top"], d["bottom"]) for d in pieces]
+    return screen, boxes, values
+
+
+def write_labels(path: Path, state: GameState, screen: Optional[str]):
+    """
+    Write the sidecar JSON for `path` from a detected state, keeping the
+    screen label from the file name if there is one.
+    """
+    screen = screen or state.screen.name
+    lines = [f'{{"screen": {json.dumps(screen)}']
+    if screen == GameScreen.GAMEPLAY.name:
+        # One domino per line, to keep hand edits easy
+        pieces = [
+            json.dumps({"x": d.bbox.x, "y": d.bbox.y, "w": d.bbox.w, "h": d.bbox.h,
+                        "top": d.top_value, "bottom": d.bottom_value})
+            for d in state.dominoes
+        ]
+        lines[0] += ","
+        lines.append(' "dominoes": [\n  ' + ",\n  ".join(pieces) + "\n ]")
+    with open(path.with_suffix(".json"), "w") as f:
+        f.write("\n".join(lines) + "}\n")
+
+
+def match_dominoes(truth: List[Rect], found: List[Domino]) -> List[Tuple[int, int]]:
+    """
+    Pairs (truth index, detection index) matched greedily by IoU, best
+    first, each side used at most once and only above MATCH_IOU.
+    """
+    if not truth or not found:
+        return []
+    a = np.array(truth, dtype=np.float64).reshape(-1, 4)
+    b = np.array([(d.bbox.x, d.bbox.y, d.bbox.w, d.bbox.h) for d in found], dtype=np.float64)
+    w = np.minimum(a[:, None, 0] + a[:, None, 2], b[None, :, 0] + b[None, :, 2]) - np.maximum(a[:, None, 0], b[None, :, 0])
+    h = np.minimum(a[:, None, 1] + a[:, None, 3], b[None, :, 1] + b[None, :, 3]) - np.maximum(a[:, None, 1], b[None, :, 1])
+    inter = np.clip(w, 0, None) * np.clip(h, 0, None)
+    iou = inter / (a[:, None, 2] * a[:, None, 3] + b[None, :, 2] * b[None, :, 3] - inter)
+
+    pairs = []
+    used_truth, used_found = set(), set()
+    for flat in np.argsort(-iou, axis=None, kind="stable"):
+        i, j = divmod(int(flat), len(found))
+        if iou[i, j] <= MATCH_IOU:
+            break
+        if i not in used_truth and j not in used_found:
+            used_truth.add(i)
+            used_found.add(j)
+            pairs.append((i, j))
+    return pairs
+
+
+def ratio(num: int, den: int) -> str:
+    return f"{num}/{den} ({100.0 * num / den:.1f}%)" if den else "n/a"
+
+
+def run_replay(config: dict, folder: str, profile: Optional[str] = None, label: bool = False) -> bool:
+    """
+    Analyze and decide on every PNG under `folder`, in name order, and print
+    latency and accuracy. Every screenshot is analyzed from scratch, so no
+    result is reused from the one before. Screenshots that are references in
+    the screen index are left out of the screen accuracy. Returns False if
+    there was nothing to replay.
+    """
+    paths = sorted(Path(folder).rglob("*.png"))
+    if not paths:
+        logger.error(f"No PNG screenshots found in {folder}")
+        return False
+
+    vision = GameVision(config)
+    logic = GameLogic(config)
+    timings = instrument(vision)
+    valid = set(GameScreen.__members__) - SKIP_LABELS
+    analyze_times: List[float] = []
+    decide_times: List[float] = []
+
+    screens_total = screens_correct = 0
+    per_screen: Dict[str, List[int]] = {}  # label -> [correct, total]
+    confusions: Counter = Counter()
+    tp = fp = fn = values_total = values_correct = 0
+    actions: Counter = Counter()
+    labeled = indexed = 0
+
+    sampler = StackSampler() if profile else None
+    if sampler:
+        sampler.start()
+    try:
+        for path in paths:
+            frame = cv2.imread(str(path), cv2.IMREAD_COLOR)
+            if frame is None:
+                logger.warning(f"Could not read {path}")
+                continue
+
+            # Full analysis every time: no unchanged-frame reuse or tracking
+            vision.reset()
+            start = time.perf_counter()
+            state = vision.analyze(frame)
+            analyze_times.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            action = logic.decide(state)
+            decide_times.append((time.perf_counter() - start) * 1000)
+            actions[action.action.name] += 1
+
+            if label and not path.with_suffix(".json").exists():
+                write_labels(path, state, screenshot_label(path, valid))
+                labeled += 1
+                continue
+
+            screen, boxes, values = load_labels(path, valid)
+            if screen and vision.screen_index is not None:
+                # An index built from these screenshots classifies each one
+                # by matching it with itself, which says nothing
+                _, dist = vision.screen_index.nearest(signature(frame))
+                if dist <= SELF_MATCH_DISTANCE:
+                    indexed += 1
+                    screen = None
+            detected = state.screen.name
+            if screen:
+                screens_total += 1
+                counts = per_screen.setdefault(screen, [0, 0])
+                counts[1] += 1
+                if detected == screen:
+                    screens_correct += 1
+                    counts[0] += 1
+                else:
+                    confusions[(screen, detected)] += 1
+                logger.debug(f"{path.name}: {screen} -> {detected}")
+
+            if boxes is not None:
+                found = state.dominoes if state.screen == GameScreen.GAMEPLAY else []
+                pairs = match_dominoes(boxes, found)
+                tp += len(pairs)
+                fp += len(found) - len(pairs)
+                fn += len(boxes) - len(pairs)
+                if values is not None:
+                    values_total += len(pairs)
+                    values_correct += sum(
+                        (found[j].top_value, found[j].bottom_value) == values[i] for i, j in pairs
+                    )
+    finally:
+        if sampler:
+            sampler.stop()
+        logic.close()
+
+    print(f"\nReplayed {len(analyze_times)} screenshots from {folder}")
+
+    print("\nLatency")
+    print(f"  {'analyze':24} {summarize(analyze_times)}")
+    for name, samples in timings.items():
+        if samples:
+            print(f"  {name:24} {summarize(samples)}")
+    print(f"  {'decide':24} {summarize(decide_times)}")
+
+    print("\nScreen classification")
+    print(f"  Correct: {ratio(screens_correct, screens_total)}")
+    if indexed:
+        print(f"  Not scored: {indexed} screenshots are in the screen index")
+    for screen, (correct, total) in sorted(per_screen.items()):
+        print(f"  {screen:18} {ratio(correct, total)}")
+    for (truth, detected), n in confusions.most_common():
+        print(f"  {truth} seen as {detected}: {n}")
+
+    print("\nDomino detection")
+    print(f"  Precision: {ratio(tp, tp + fp)}")
+    print(f"  Recall:    {ratio(tp, tp + fn)}")
+    print(f"  Values:    {ratio(values_correct, values_total)} of found dominoes with the right dots")
+
+    print("\nActions: " + ", ".join(f"{name} {n}" for name, n in actions.most_common()))
+
+    if indexed:
+        logger.warning(
+            f"{indexed} screenshots are references in {vision.det.get('screen_index')} and were not "
+            f"scored for screen classification; rebuild the index without them to score them"
+        )
+    if labeled:
+        print(f"\nWrote labels for {labeled} screenshots; correct them and replay again")
+    if sampler:
+        sampler.write(profile)
+        print(f"\nSampled stacks written to {profile} ({sum(sampler.samples.values())} samples). "
+              f"Render with: flamegraph.pl {profile} > replay.svg")
+    return True
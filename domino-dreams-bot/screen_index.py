@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Screen Signature Index
+Classifies screens by nearest neighbour against reference screenshots. Each
+screenshot is reduced to a compact signature (a coarse HSV color histogram
+and a perceptual hash), so a lookup is a few vector operations
+instead of a pass of heuristics over the whole frame.
+
+Build the index from screenshots the bot saved (named <time>_<SCREEN>.png)
+or from folders named after each screen (screenshots/GAMEPLAY/*.png), which
+take precedence and are the place for hand-sorted corrections:
+
+    python screen_index.py                         # uses bot.screenshot_dir
+    python screen_index.py calibration/ sorted/ -o screen_index.npz
+"""
+
+import argparse
+import logging
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+import yaml
+
+logger = logging.getLogger("domino_bot.screen_index")
+
+HIST_BINS = (8, 4, 4)  # hue, saturation, value
+SIGNATURE_SIZE = (32, 64)  # width, height of the color thumbnail
+
+# Labels that describe a moment rather than a screen; not worth indexing
+SKIP_LABELS = {"UNKNOWN", "LOADING"}
+
+
+@dataclass
+class Signature:
+    hist: np.ndarray  # L1-normalized HSV histogram, float32
+    phash: np.uint64
+
+
+def signature(frame: np.ndarray) -> Signature:
+    """Compute the signature of a BGR frame of any resolution."""
+    # Sample down to about 4x the thumbnail first; area-averaging the whole
+    # frame costs milliseconds and changes nothing at this size
+    w, h = SIGNATURE_SIZE
+    step = max(1, min(frame.shape[0] // (4 * h), frame.shape[1] // (4 * w)))
+    sampled = np.ascontiguousarray(frame[step // 2::step, step // 2::step, :3])
+    small = cv2.resize(sampled, SIGNATURE_SIZE, interpolation=cv2.INTER_AREA)
+
+    hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+    hist = cv2.calcHist([hsv], [0, 1, 2], None, list(HIST_BINS), [0, 180, 0, 256, 0, 256])
+    hist = hist.ravel().astype(np.float32)
+    hist /= max(hist.sum(), 1.0)
+
+    # pHash: sign of the low-frequency DCT coefficients against their median
+    gray = cv2.cvtColor(cv2.resize(small, (32, 32), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+    low = cv2.dct(gray.astype(np.float32))[:8, :8].ravel()
+    bits = np.packbits(low[1:] > np.median(low[1:]))  # 63 bits, skipping the DC term
+    phash = np.frombuffer(bits.tobytes(), dtype=">u8")[0]
+    return Signature(hist=hist, phash=np.uint64(phash))
+
+
+class ScreenIndex:
+    """
+    Reference signatures and their screen names. The distance between two
+    signatures is the mean of the histogram difference (half the L1 norm)
+    and the share of differing hash bits, both in 0..1.
+    """
+
+    def __init__(self, labels: List[str], hists: np.ndarray, hashes: np.ndarray):
+        self.labels = np.asarray(labels)
+        self.hists = np.asarray(hists, dtype=np.float32).reshape(len(labels), -1)
+        self.hashes = np.asarray(hashes, dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    @classmethod
+    def build(cls, samples: List[Tuple[str, np.ndarray]]) -> "ScreenIndex":
+        """Index (label, frame) pairs."""
+        sigs = [signature(frame) for _, frame in samples]
+        return cls(
+            [label for label, _ in samples],
+            np.stack([s.hist for s in sigs]) if sigs else np.zeros((0, int(np.prod(HIST_BINS)))),
+            np.array([s.phash for s in sigs], dtype=np.uint64),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "ScreenIndex":
+        data = np.load(path, allow_pickle=False)
+        return cls(list(data["labels"]), data["hists"], data["hashes"])
+
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            np.savez_compressed(f, labels=self.labels.astype(str), hists=self.hists, hashes=self.hashes)
+
+    def distances(self, sig: Signature) -> np.ndarray:
+        """Distance from `sig` to every reference."""
+        hist_dist = 0.5 * np.abs(self.hists - sig.hist).sum(axis=1)
+        xor = (self.hashes ^ sig.phash).view(np.uint8).reshape(-1, 8)
+        hash_dist = np.unpackbits(xor, axis=1).sum(axis=1) / 63.0
+        return 0.5 * (hist_dist + hash_dist)
+
+    def nearest(self, sig: Signature, exclude: Optional[int] = None) -> Tuple[Optional[str], float]:
+        """Label of the closest reference and its distance ((None, 1.0) if empty)."""
+        if not len(self):
+            return None, 1.0
+        dist = self.distances(sig)
+        if exclude is not None:
+            dist[exclude] = np.inf
+        i = int(np.argmin(dist))
+        return str(self.labels[i]), float(dist[i])
+
+    def classify(self, frame: np.ndarray, max_distance: float) -> Optional[str]:
+        """Screen name for `frame`, or None if nothing is close enough."""
+        label, dist = self.nearest(signature(frame))
+        return label if dist <= max_distance else None
+
+
+def screenshot_label(path: Path, valid: set) -> Optional[str]:
+    """
+    Screen name for a screenshot: a parent folder named after a screen wins
+    over the screen name at the end of the file name. None if neither is.
+    """
+    label = path.parent.name.upper()
+    if label in valid:
+        return label
+    # Screen names contain underscores themselves (LEVEL_COMPLETE)
+    stem = path.stem.upper()
+    matches = [name for name in valid if stem == name or stem.endswith("_" + name)]
+    return max(matches, key=len) if matches else None
+
+
+def labeled_screenshots(folder: Path, valid: set) -> Iterator[Tuple[str, Path]]:
+    """(label, path) for every labeled PNG under `folder`."""
+    for path in sorted(folder.rglob("*.png")):
+        label = screenshot_label(path, valid)
+        if label:
+            yield label, path
+
+
+def main():
+    from game_vision import GameScreen
+
+    parser = argparse.ArgumentParser(description="Build the screen classifier index from saved screenshots")
+    parser.add_argument("folders", nargs="*", help="Screenshot folders (default: bot.screenshot_dir)")
+    parser.add_argument("--config", "-c", default="config.yaml")
+    parser.add_argument("--output", "-o", help="Index file (default: detection.screen_index)")
+    args = parser.parse_args()
+
+    config_path = args.config
+    if not os.path.isabs(config_path):
+        config_path = os.path.join(os.path.dirname(__file__), config_path)
+    with open(config_path, "r") as f:
+        config = yaml.safe_load(f)
+
+    folders = [Path(p) for p in args.folders] or [Path(config["bot"]["screenshot_dir"])]
+    output = args.output or config["detection"].get("screen_index", "screen_index.npz")
+    max_distance = config["detection"].get("screen_index_distance", 0.2)
+    valid = set(GameScreen.__members__) - SKIP_LABELS
+
+    samples = []
+    for folder in folders:
+        for label, path in labeled_screenshots(folder, valid):
+            frame = cv2.imread(str(path), cv2.IMREAD_COLOR)
+            if frame is not None:
+                samples.append((label, frame))
+    if not samples:
+        print(f"No labeled screenshots found in {', '.join(map(str, folders))}")
+        sys.exit(1)
+
+    index = ScreenIndex.build(samples)
+    index.save(output)
+
+    counts: Dict[str, int] = {}
+    for label in index.labels:
+        counts[str(label)] = counts.get(str(label), 0) + 1
+    print(f"Indexed {len(index)} screenshots -> {output}")
+    for label, n in sorted(counts.items()):
+        print(f"  {label:18} {n}")
+
+    # Leave-one-out check: how each reference would be classified without itself
+    correct = unmatched = 0
+    for i, (label, frame) in enumerate(samples):
+        nearest, dist = index.nearest(signature(frame), exclude=i)
+        if dist > max_distance:
+            unmatched += 1
+        elif nearest == label:
+            correct += 1
+    print(f"Leave-one-out: {correct}/{len(samples)} correct, {unmatched} beyond "
+          f"screen_index_distance={max_distance} (fall back to heuristics)")
+
+
+if __name__ == "__main__":
+    main()
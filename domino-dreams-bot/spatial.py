@@ -0,0 +1,117 @@
+"""
+Spatial Index
+A uniform grid over 2D points for neighbour queries. Points are bucketed
+once; a query for every point at once looks only at the 3x3 cells around
+each one, using NumPy instead of comparing every pair in Python.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+
+class SpatialGrid:
+    """Points bucketed into square cells of `cell_size`."""
+
+    # From this many points count_within compares whole cells, not a pair list
+    DENSE_MIN_POINTS = 150
+
+    def __init__(self, points: np.ndarray, cell_size: float):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self.cell_size = float(cell_size)
+
+        n = len(self.points)
+        cells = np.floor(self.points / self.cell_size).astype(np.int64)
+        # Offset so neighbouring cells of every point have non-negative
+        # coordinates, and pad the row width so +/-1 never wraps a row
+        origin = cells.min(axis=0) - 1 if n else np.zeros(2, dtype=np.int64)
+        rel = cells - origin
+        self._width = int(rel[:, 0].max()) + 3 if n else 1
+        self._keys = rel[:, 1] * self._width + rel[:, 0]
+
+        # Points sorted by cell, so each cell is one contiguous run
+        self._order = np.argsort(self._keys, kind="stable").astype(np.int32)
+        self._sorted_keys = self._keys[self._order]
+        self._points32 = self.points.astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def pairs_within(self, radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Every ordered pair (i, j), i != j, of points closer than `radius`
+        (at most cell_size), as index arrays i and j plus their distances.
+        """
+        if radius > self.cell_size:
+            raise ValueError(f"radius {radius} exceeds the grid cell size {self.cell_size}")
+
+        # Each pair of neighbouring cells is visited once: a point's own cell
+        # and the four cells after it (right, and the row below), with the
+        # pairs found mirrored at the end
+        offsets = np.array([0, 1, self._width - 1, self._width, self._width + 1])
+        targets = (self._keys[:, None] + offsets).ravel()
+        start = np.searchsorted(self._sorted_keys, targets, side="left")
+        counts = np.searchsorted(self._sorted_keys, targets, side="right") - start
+
+        # Expand every (point, cell) into that cell's run of candidates
+        total = int(counts.sum())
+        run_starts = np.repeat(start - (np.cumsum(counts) - counts), counts)
+        i = np.repeat(np.arange(len(self), dtype=np.int32).repeat(len(offsets)), counts)
+        j = self._order[run_starts + np.arange(total, dtype=np.int32)]
+
+        # Within a point's own cell, keep each pair once
+        own_cell = np.repeat(np.tile(offsets == 0, len(self)), counts)
+        delta = self._points32[i] - self._points32[j]
+        dist2 = np.einsum("ij,ij->i", delta, delta)
+        close = (dist2 < radius * radius) & ~(own_cell & (j <= i))
+
+        i, j, dist = i[close], j[close], np.sqrt(dist2[close])
+        return np.concatenate([i, j]), np.concatenate([j, i]), np.concatenate([dist, dist])
+
+    def count_within(self, *radii: float) -> np.ndarray:
+        """
+        Number of other points closer than each of `radii` (at most
+        cell_size) to each point, one row per radius. With many points no
+        pair list is built: neighbouring cells are compared as dense blocks,
+        which stays cheap however crowded the cells are.
+        """
+        if max(radii) > self.cell_size:
+            raise ValueError(f"radius {max(radii)} exceeds the grid cell size {self.cell_size}")
+        n = len(self)
+        if n < self.DENSE_MIN_POINTS:
+            i, _, dist = self.pairs_within(max(radii))
+            return np.stack([np.bincount(i[dist < r], minlength=n) for r in radii])
+
+        # Pad every occupied cell's points (NaN never compares close) to the
+        # same length, so each pair of neighbouring cells is one dense block
+        first = np.flatnonzero(np.diff(self._sorted_keys, prepend=-1))
+        keys = self._sorted_keys[first]
+        size = np.diff(first, append=n)
+        cell = np.repeat(np.arange(len(keys)), size)
+        slot = np.arange(n) - first[cell]
+        block = np.full((len(keys), size.max(), 2), np.nan, dtype=np.float32)
+        block[cell, slot] = self._points32[self._order]
+        limits = np.square(np.array(radii, dtype=np.float32)).reshape(-1, 1, 1, 1)
+
+        # As in pairs_within, a cell meets itself and the four cells after it.
+        # Close pairs are summed per row and column with matrix products,
+        # which NumPy runs faster than reductions over booleans
+        found = np.zeros((len(radii), len(keys), size.max()), dtype=np.float32)
+        ones = np.ones(size.max(), dtype=np.float32)
+        for offset in (0, 1, self._width - 1, self._width, self._width + 1):
+            other = np.minimum(np.searchsorted(keys, keys + offset), len(keys) - 1)
+            a = np.flatnonzero(keys[other] == keys + offset)
+            if not len(a):
+                continue
+            b = other[a]
+            dx = block[a, :, None, 0] - block[b, None, :, 0]
+            dy = block[a, :, None, 1] - block[b, None, :, 1]
+            close = ((dx * dx + dy * dy) < limits).astype(np.float32)
+            found[:, a] += close @ ones
+            if offset:
+                found[:, b] += ones @ close
+
+        # Every point was counted as its own neighbour once
+        counts = np.empty((len(radii), n), dtype=np.int64)
+        counts[:, self._order] = found[:, cell, slot].astype(np.int64) - 1
+        return counts
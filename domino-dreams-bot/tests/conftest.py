@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def config():
+    with open(os.path.join(ROOT, "config.yaml"), "r") as f:
+        return yaml.safe_load(f)
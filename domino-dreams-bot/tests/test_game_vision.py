@@ -0,0 +1,63 @@
+import numpy as np
+
+from game_vision import BoundingBox, Domino, DominoTracker, GameVision
+
+
+def screen_size(config):
+    device = config["device"]
+    scale = device["scale_factor"]
+    return device["screen_height"] * scale, device["screen_width"] * scale
+
+
+def test_gradual_change_forces_reanalysis(config):
+    """A fade too slow to notice frame to frame must still be picked up."""
+    config["detection"]["screen_index"] = None
+    vision = GameVision(config)
+    h, w = screen_size(config)
+    frame = np.full((h, w, 3), 60, dtype=np.uint8)
+    first = vision.analyze(frame)
+    assert vision.analyze(frame.copy()) is first
+
+    # 8 levels per frame stays under the thumbnail's 25-level change threshold
+    states = []
+    for level in range(68, 160, 8):
+        frame = frame.copy()
+        frame[400:1100, 100:1100] = level
+        states.append(vision.analyze(frame))
+    assert any(state is not first for state in states)
+
+
+class FakeDetector:
+    """Reports one piece, highlighted once its box is bright enough."""
+
+    def __init__(self, rect):
+        self.rect = rect
+        self.board = None
+
+    def __call__(self, region):
+        x, y, w, h = self.rect
+        rx, ry, rw, rh = region
+        if x < rx or y < ry or x + w > rx + rw or y + h > ry + rh:
+            return []
+        glow = self.board[y:y + h, x:x + w].mean() > 200
+        domino = Domino(bbox=BoundingBox(x, y, w, h), top_value=1, bottom_value=2,
+                        is_playable=True, is_highlighted=bool(glow))
+        return [(self.rect, domino)]
+
+
+def test_tracker_sees_highlight_that_ramps_in():
+    tracker = DominoTracker()
+    detect = FakeDetector((100, 100, 30, 60))
+    board = np.full((400, 300, 3), 100, dtype=np.uint8)
+
+    detect.board = board
+    assert not tracker.update(board, detect)[0].is_highlighted
+
+    # 10 levels per frame stays under the tracker's 25-level diff threshold
+    for level in range(110, 260, 10):
+        board = board.copy()
+        board[100:160, 100:130] = level
+        detect.board = board
+        dominoes = tracker.update(board, detect)
+    assert dominoes[0].is_highlighted
+    assert tracker.partial_detections >= 1
@@ -0,0 +1,176 @@
+"""
+Touch Input Layer
+A touch session that stays connected to the iPhone between gestures, and an
+action queue that sends gestures from a background thread, batching any
+that pile up into a single round trip.
+"""
+
+import logging
+import queue
+import threading
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+logger = logging.getLogger("domino_bot.touch")
+
+
+@dataclass
+class Gesture:
+    """One touch gesture, in screen points."""
+    kind: str  # "tap", "swipe" or "long_press"
+    x: int
+    y: int
+    x2: int = 0
+    y2: int = 0
+    duration: float = 0.05
+    settle: float = 0.0  # pause after sending, before the next gesture
+
+    def to_message(self) -> dict:
+        message = {"x": self.x, "y": self.y, "duration": self.duration}
+        if self.kind == "swipe":
+            message.update({"x2": self.x2, "y2": self.y2})
+        return message
+
+
+class TouchSession:
+    """
+    Keeps one lockdown + DVT connection open for touch events, instead of
+    creating both for every tap. Reconnects on the next send after a failure.
+    """
+
+    def __init__(self, udid: Optional[str] = None):
+        self.udid = udid
+        self._stack: Optional[ExitStack] = None
+        self._dvt = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._dvt is not None
+
+    def open(self) -> bool:
+        try:
+            from pymobiledevice3.lockdown import create_using_usbmux
+            from pymobiledevice3.services.dvt.dvt_secure_socket_proxy import DvtSecureSocketProxyService
+        except ImportError:
+            logger.warning("Could not import pymobiledevice3 API modules")
+            return False
+
+        self.close()
+        stack = ExitStack()
+        try:
+            lockdown = create_using_usbmux(serial=self.udid)
+            self._dvt = stack.enter_context(DvtSecureSocketProxyService(lockdown=lockdown))
+            self._stack = stack
+            logger.debug("Touch session open")
+            return True
+        except Exception as e:
+            logger.debug(f"Touch session unavailable: {e}")
+            stack.close()
+            self._dvt = None
+            return False
+
+    def send(self, gestures: List[Gesture]) -> int:
+        """Send gestures back to back over the open connection; returns how many went out."""
+        if not self.is_open and not self.open():
+            return 0
+        sent = 0
+        try:
+            for gesture in gestures:
+                # Long presses are taps with a longer duration
+                selector = "swipe" if gesture.kind == "swipe" else "tap"
+                self._dvt.send_message("_WDAutomation", selector, gesture.to_message())
+                sent += 1
+        except Exception as e:
+            logger.warning(f"Touch session failed, will reconnect: {e}")
+            self.close()
+        return sent
+
+    def close(self):
+        if self._stack is not None:
+            try:
+                self._stack.close()
+            except Exception as e:
+                logger.debug(f"Closing touch session: {e}")
+        self._stack = None
+        self._dvt = None
+
+
+class ActionQueue:
+    """
+    Sends gestures from a background thread so callers never wait on the
+    device. Gestures queued while a send is in flight go out together in the
+    next batch, up to the first one that asks for a settle pause. A batch the session cannot deliver, even after reconnecting,
+    is handed to `fallback` one gesture at a time.
+    """
+
+    def __init__(self, session: TouchSession, fallback: Optional[Callable[[Gesture], None]] = None,
+                 max_batch: int = 16):
+        self.session = session
+        self.fallback = fallback
+        self.max_batch = max_batch
+        self.batches_sent = 0
+        self.gestures_sent = 0
+
+        self._queue: "queue.Queue[Optional[Gesture]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="touch", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._queue.put(None)
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.session.close()
+
+    def submit(self, gesture: Gesture):
+        self._queue.put(gesture)
+
+    def flush(self):
+        """Block until every gesture submitted so far has been sent and settled."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in batch
+            gestures = [g for g in batch if g is not None]
+            try:
+                while gestures:
+                    # Send up to and including the next gesture that needs
+                    # time to take effect, then pause for it
+                    end = next((i + 1 for i, g in enumerate(gestures) if g.settle > 0), len(gestures))
+                    self._deliver(gestures[:end])
+                    if gestures[end - 1].settle > 0:
+                        time.sleep(gestures[end - 1].settle)
+                    gestures = gestures[end:]
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _deliver(self, gestures: List[Gesture]):
+        # One retry covers a dropped connection (send() reconnects first);
+        # gestures that already went out are not repeated
+        sent = self.session.send(gestures)
+        if sent < len(gestures):
+            sent += self.session.send(gestures[sent:])
+        self.batches_sent += 1
+        self.gestures_sent += sent
+        gestures = gestures[sent:]
+        if gestures and self.fallback:
+            for gesture in gestures:
+                try:
+                    self.fallback(gesture)
+                except Exception as e:
+                    logger.error(f"Fallback {gesture.kind} failed: {e}")
@@ -0,0 +1,132 @@
+"""
+Instant answer cache for recognized interview questions.
+
+Interviewers reuse a small set of questions ("tell me about yourself", "why
+are you leaving"). Answers to questions we've seen before are matched with a
+fuzzy token similarity and can be shown immediately, while a fresh answer is
+generated in the background.
+"""
+
+import json
+import math
+import re
+from collections import Counter, OrderedDict
+from pathlib import Path
+
+# Unlike retrieval, question matching keeps words like "why", "me" and "about":
+# they distinguish "why leaving" from "tell me about yourself"
+FILLER_WORDS = {
+    "a", "an", "and", "are", "at", "can", "could", "did", "do", "does", "for",
+    "in", "is", "just", "like", "of", "ok", "okay", "on", "or", "s", "so", "the",
+    "to", "uh", "um", "well", "what", "would", "you", "your",
+}
+
+
+# Words that only point back at the conversation ("tell me more about that",
+# "why?", "give me an example"). A question made of nothing else means
+# something different in every interview, so it is neither cached nor matched
+FOLLOW_UP_WORDS = {
+    "about", "again", "describe", "elaborate", "else", "example", "expand",
+    "explain", "give", "go", "how", "it", "me", "mean", "more", "oh", "please",
+    "really", "right", "say", "sure", "talk", "tell", "that", "there", "these",
+    "this", "those", "through", "walk", "when", "where", "which", "who", "why",
+    "yeah",
+}
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase question tokens with filler removed and plurals folded."""
+    tokens = []
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        if word in FILLER_WORDS:
+            continue
+        if len(word) > 4 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+def needs_context(tokens: list[str]) -> bool:
+    """True if a tokenized question only makes sense after the previous one."""
+    return all(token in FOLLOW_UP_WORDS for token in tokens)
+
+
+def _similarity(a: Counter, b: Counter) -> float:
+    """Cosine similarity between two token bags."""
+    if not a or not b:
+        return 0.0
+    dot = sum(count * b[term] for term, count in a.items())
+    norm = math.sqrt(sum(v * v for v in a.values())) * math.sqrt(sum(v * v for v in b.values()))
+    return dot / norm
+
+
+class AnswerCache:
+    """Fuzzy question -> answer lookup with LRU eviction for learned entries."""
+
+    def __init__(self, threshold: float = 0.7, max_entries: int = 256, path: str | None = None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.path = Path(path) if path else None
+        # Seeds (pre-written answers) are never evicted
+        self._seeds: dict[str, tuple[Counter, str]] = {}
+        self._learned: OrderedDict[str, tuple[Counter, str]] = OrderedDict()
+        if self.path and self.path.exists():
+            self._load()
+
+    def seed(self, question: str, answer: str):
+        """Add a permanent entry, e.g. from experience.json common_answers."""
+        self._seeds[question] = (Counter(tokenize(question)), answer)
+
+    def seed_common_answers(self, common_answers: dict):
+        for key, answer in common_answers.items():
+            self.seed(key.replace("_", " "), answer)
+
+    def put(self, question: str, answer: str):
+        """Remember a generated answer, evicting the least recently used if full."""
+        words = tokenize(question)
+        if needs_context(words) or not answer:
+            return
+        tokens = Counter(words)
+        self._learned[question] = (tokens, answer)
+        self._learned.move_to_end(question)
+        while len(self._learned) > self.max_entries:
+            self._learned.popitem(last=False)
+
+    def lookup(self, question: str) -> tuple[str, str, float] | None:
+        """
+        Return (matched_question, answer, score) for the closest entry at or
+        above the similarity threshold, or None. Follow-ups that depend on
+        the conversation never match.
+        """
+        words = tokenize(question)
+        if needs_context(words):
+            return None
+        tokens = Counter(words)
+        best = None
+        best_score = self.threshold
+        for source in (self._learned, self._seeds):
+            for cached_question, (cached_tokens, answer) in source.items():
+                score = _similarity(tokens, cached_tokens)
+                if score >= best_score:
+                    best, best_score = (cached_question, answer, score), score
+
+        if best and best[0] in self._learned:
+            self._learned.move_to_end(best[0])
+        return best
+
+    def _load(self):
+        try:
+            entries = json.loads(self.path.read_text())
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"[cache] Could not load {self.path}: {e}")
+            return
+        for entry in entries[-self.max_entries:]:
+            self.put(entry["question"], entry["answer"])
+        print(f"[cache] Loaded {len(self._learned)} answers from past sessions.")
+
+    def save(self):
+        """Persist learned answers so the next session starts warm."""
+        if not self.path:
+            return
+        entries = [{"question": q, "answer": a} for q, (_tokens, a) in self._learned.items()]
+        self.path.write_text(json.dumps(entries, ensure_ascii=False))
@@ -2,16 +2,27 @@
 Real-time audio capture and speech-to-text transcription.
 
 Captures system audio (the interview call) and transcribes it in real-time
-using OpenAI's Whisper model running locally via faster-whisper.
+using OpenAI's Whisper model running locally via faster-whisper. A frame-level
+voice activity detector sits in front of the model so that only speech is
+ever transcribed.
+
+When the candidate's microphone is captured on its own channel (a second
+device, or a second channel of an aggregate device), frames where the mic is
+clearly louder than the call audio are treated as the candidate talking and
+are muted before the VAD, so only interviewer speech reaches Whisper.
 """
 
 import asyncio
 import queue
 import threading
+from collections.abc import Callable
 import numpy as np
 import sounddevice as sd
 from faster_whisper import WhisperModel
 
+from latency import Trace
+from vad import VoiceActivityDetector
+
 
 class AudioTranscriber:
     """Captures audio from a selected input device and transcribes in real-time."""
@@ -20,25 +31,58 @@ class AudioTranscriber:
         self,
         model_size: str = "base.en",
         device_index: int | None = None,
+        candidate_device_index: int | None = None,
+        interviewer_channel: int = 0,
+        candidate_channel: int | None = None,
+        dominance_ratio: float = 2.0,
         sample_rate: int = 16000,
-        chunk_duration: float = 3.0,
+        chunk_duration: float = 0.25,
         silence_threshold: float = 0.01,
+        min_silence_ms: int = 500,
+        max_utterance_s: float = 15.0,
+        partial_interval: float = 1.0,
+        beam_size: int = 3,
+        compute_type: str = "int8",
+        cpu_threads: int = 0,
+        model: WhisperModel | None = None,
     ):
         self.sample_rate = sample_rate
-        self.chunk_duration = chunk_duration
+        self.chunk_duration = chunk_duration  # capture block length, not utterance length
         self.silence_threshold = silence_threshold
         self.device_index = device_index
-        self.audio_queue: queue.Queue[np.ndarray] = queue.Queue()
+        # Candidate mic: either its own device or a channel of device_index
+        self.candidate_device_index = candidate_device_index
+        self.interviewer_channel = interviewer_channel
+        self.candidate_channel = candidate_channel
+        self.dominance_ratio = dominance_ratio
+        self.gated_frames = 0
+        self.partial_interval = partial_interval
+        self.beam_size = beam_size
+        self.vad = VoiceActivityDetector(
+            sample_rate=sample_rate,
+            energy_threshold=silence_threshold,
+            min_silence_ms=min_silence_ms,
+            max_utterance_s=max_utterance_s,
+        )
+        # (ADC time of the block's first sample or None if unknown, samples)
+        self.audio_queue: queue.Queue[tuple[float | None, np.ndarray]] = queue.Queue()
+        self.candidate_queue: queue.Queue[tuple[float, np.ndarray]] = queue.Queue()
+        self._candidate_next: tuple[float, np.ndarray] | None = None
         self._running = False
         self._stream = None
+        self._candidate_stream = None
 
-        print(f"[transcriber] Loading Whisper model '{model_size}'...")
-        self.model = WhisperModel(
-            model_size,
-            device="cpu",
-            compute_type="int8",
-        )
-        print("[transcriber] Model loaded.")
+        # A preloaded model can be shared, e.g. across offline replay runs
+        if model is None:
+            print(f"[transcriber] Loading Whisper model '{model_size}' ({compute_type})...")
+            model = WhisperModel(
+                model_size,
+                device="cpu",
+                compute_type=compute_type,
+                cpu_threads=cpu_threads,  # 0 lets CTranslate2 choose
+            )
+            print("[transcriber] Model loaded.")
+        self.model = model
 
     @staticmethod
     def list_devices() -> list[dict]:
@@ -54,89 +98,203 @@ class AudioTranscriber:
         """Called by sounddevice for each audio chunk."""
         if status:
             print(f"[audio] {status}")
-        self.audio_queue.put(indata.copy())
+        captured_at = time_info.inputBufferAdcTime
+        self.audio_queue.put((captured_at, indata[:, self.interviewer_channel].copy()))
+        if self.candidate_channel is not None:
+            self.candidate_queue.put((captured_at, indata[:, self.candidate_channel].copy()))
+
+    def _candidate_callback(self, indata: np.ndarray, frames: int, time_info, status):
+        """Called by sounddevice for each chunk from the candidate's own mic device."""
+        if status:
+            print(f"[audio] candidate: {status}")
+        self.candidate_queue.put((time_info.inputBufferAdcTime, indata[:, 0].copy()))
 
     def start_stream(self):
         """Start capturing audio from the selected device."""
         self._running = True
+        # Blocks left from an earlier session would never line up
+        for q in (self.audio_queue, self.candidate_queue):
+            while not q.empty():
+                q.get_nowait()
+        self._candidate_next = None
+        blocksize = int(self.sample_rate * self.chunk_duration)
+        channels = self.interviewer_channel + 1
+        if self.candidate_channel is not None:
+            channels = max(channels, self.candidate_channel + 1)
         self._stream = sd.InputStream(
             samplerate=self.sample_rate,
-            blocksize=int(self.sample_rate * self.chunk_duration),
+            blocksize=blocksize,
             device=self.device_index,
-            channels=1,
+            channels=channels,
             dtype="float32",
             callback=self._audio_callback,
         )
+        if self.candidate_device_index is not None:
+            self._candidate_stream = sd.InputStream(
+                samplerate=self.sample_rate,
+                blocksize=blocksize,
+                device=self.candidate_device_index,
+                channels=1,
+                dtype="float32",
+                callback=self._candidate_callback,
+            )
+            self._candidate_stream.start()
+            print(f"[audio] Candidate mic on device: {self.candidate_device_index}")
         self._stream.start()
         print(f"[audio] Capturing from device: {self.device_index or 'default'}")
 
+    def start_feed(self):
+        """Accept audio pushed with feed() instead of a capture device (offline replay)."""
+        self._running = True
+
+    def feed(self, audio: np.ndarray):
+        """Queue a block of mono float32 samples as if it had been captured."""
+        self.audio_queue.put((None, audio.astype("float32", copy=False)))
+
     def stop_stream(self):
         """Stop the audio capture stream."""
         self._running = False
-        if self._stream:
-            self._stream.stop()
-            self._stream.close()
-            self._stream = None
+        for stream in (self._stream, self._candidate_stream):
+            if stream:
+                stream.stop()
+                stream.close()
+        self._stream = None
+        self._candidate_stream = None
+        if self.gated_frames:
+            print(f"[audio] Muted {self.gated_frames} frames of candidate speech.")
         print("[audio] Stream stopped.")
 
-    def _is_silence(self, audio: np.ndarray) -> bool:
-        """Check if an audio chunk is silence."""
-        rms = np.sqrt(np.mean(audio**2))
-        return rms < self.silence_threshold
+    def _next_candidate_block(self, captured_at: float | None) -> np.ndarray | None:
+        """
+        The candidate block captured closest to the interviewer block starting
+        at `captured_at`, matched on the PortAudio ADC timestamps so the two
+        streams stay paired however they started or drift. Older candidate
+        blocks are discarded; a later one is kept for the next call.
+        """
+        half_block = self.chunk_duration / 2
+        while True:
+            if self._candidate_next is None:
+                try:
+                    self._candidate_next = self.candidate_queue.get_nowait()
+                except queue.Empty:
+                    return None
+            at, candidate = self._candidate_next
+            if captured_at is not None and at > captured_at + half_block:
+                return None
+            self._candidate_next = None
+            if captured_at is None or at >= captured_at - half_block:
+                return candidate.flatten()
+
+    def _gate_candidate(self, audio: np.ndarray, captured_at: float | None) -> np.ndarray:
+        """Mute frames where the candidate's mic dominates the call audio."""
+        candidate = self._next_candidate_block(captured_at)
+        if candidate is None:
+            return audio
 
-    async def transcribe_stream(self, on_transcript: callable):
+        frame_len = self.vad.frame_len
+        n_frames = min(len(audio), len(candidate)) // frame_len
+        if n_frames == 0:
+            return audio
+        size = n_frames * frame_len
+        ours = np.sqrt(np.mean(audio[:size].reshape(n_frames, frame_len) ** 2, axis=1))
+        theirs = np.sqrt(np.mean(candidate[:size].reshape(n_frames, frame_len) ** 2, axis=1))
+        candidate_talking = (theirs >= self.silence_threshold) & (theirs > ours * self.dominance_ratio)
+        if not candidate_talking.any():
+            return audio
+
+        self.gated_frames += int(candidate_talking.sum())
+        gated = audio.copy()
+        gated[:size].reshape(n_frames, frame_len)[candidate_talking] = 0.0
+        return gated
+
+    async def transcribe_stream(self, on_transcript: callable, on_partial: Callable | None = None):
         """
         Continuously pull audio from the queue, transcribe, and call the callback.
 
+        Audio is run through the VAD first; only complete utterances (speech
+        followed by a pause, or split at a word gap when very long) are sent
+        to Whisper, so silence and background noise never reach the model.
+
         Args:
-            on_transcript: async callable(speaker: str, text: str) invoked
-                           each time a new segment is transcribed.
+            on_transcript: async callable(speaker: str, text: str, trace: Trace)
+                           invoked each time a new segment is transcribed.
+            on_partial: optional async callable(speaker: str, text: str)
+                        invoked every `partial_interval` seconds with a quick
+                        transcript of the utterance still in progress.
         """
-        buffer = np.array([], dtype="float32")
-        min_buffer = self.sample_rate * 2  # at least 2 seconds before transcribing
+        partial_task: asyncio.Task | None = None
+        next_partial_at = self.partial_interval
 
         while self._running:
             try:
-                chunk = self.audio_queue.get(timeout=0.5)
+                captured_at, chunk = self.audio_queue.get_nowait()
             except queue.Empty:
-                await asyncio.sleep(0.05)
+                await asyncio.sleep(0.02)
                 continue
 
-            audio = chunk.flatten()
+            audio = self._gate_candidate(chunk.flatten(), captured_at)
+            for utterance in self.vad.process(audio):
+                # A stale partial must not arrive after its final transcript
+                if partial_task and not partial_task.done():
+                    partial_task.cancel()
+                partial_task = None
+                next_partial_at = self.partial_interval
+                trace = Trace()
+                trace.mark("capture_end")
+                await self._transcribe_buffer(utterance, on_transcript, trace)
 
-            if self._is_silence(audio):
-                # If we have buffered speech followed by silence, flush the buffer
-                if len(buffer) >= min_buffer:
-                    await self._transcribe_buffer(buffer, on_transcript)
-                    buffer = np.array([], dtype="float32")
-                continue
-
-            buffer = np.concatenate([buffer, audio])
+            if (
+                on_partial
+                and self.vad.utterance_duration >= next_partial_at
+                and (partial_task is None or partial_task.done())
+            ):
+                next_partial_at = self.vad.utterance_duration + self.partial_interval
+                partial_task = asyncio.create_task(
+                    self._transcribe_partial(self.vad.current_speech(), on_partial)
+                )
 
-            # Transcribe when buffer is long enough
-            if len(buffer) >= self.sample_rate * self.chunk_duration * 2:
-                await self._transcribe_buffer(buffer, on_transcript)
-                buffer = np.array([], dtype="float32")
+        if partial_task and not partial_task.done():
+            partial_task.cancel()
 
-        # Flush remaining buffer
-        if len(buffer) >= min_buffer:
-            await self._transcribe_buffer(buffer, on_transcript)
+        # Flush any speech still in progress
+        utterance = self.vad.flush()
+        if utterance is not None:
+            trace = Trace()
+            trace.mark("capture_end")
+            await self._transcribe_buffer(utterance, on_transcript, trace)
 
-    async def _transcribe_buffer(self, audio: np.ndarray, on_transcript: callable):
-        """Run Whisper on a buffer and invoke the callback with results."""
+    async def _run_whisper(self, audio: np.ndarray, beam_size: int) -> list:
+        """Decode a buffer with Whisper in the default executor."""
         loop = asyncio.get_event_loop()
-        segments, info = await loop.run_in_executor(
-            None,
-            lambda: self.model.transcribe(
+
+        def run():
+            segments, _info = self.model.transcribe(
                 audio,
-                beam_size=3,
+                beam_size=beam_size,
                 language="en",
-                vad_filter=True,
-                vad_parameters=dict(min_silence_duration_ms=500),
-            ),
-        )
+                # Utterances are already speech-only, skip Whisper's own VAD pass
+                vad_filter=False,
+                condition_on_previous_text=False,
+            )
+            # segments is lazy; decode here so the work stays off the event loop
+            return list(segments)
+
+        return await loop.run_in_executor(None, run)
+
+    async def _transcribe_buffer(self, audio: np.ndarray, on_transcript: callable, trace: Trace):
+        """Run Whisper on a buffer and invoke the callback with results."""
+        trace.mark("transcribe_start")
+        segments = await self._run_whisper(audio, beam_size=self.beam_size)
+        trace.mark("transcribe_end")
 
         for segment in segments:
             text = segment.text.strip()
             if text and len(text) > 3:
-                await on_transcript("Interviewer", text)
+                await on_transcript("Interviewer", text, trace)
+
+    async def _transcribe_partial(self, audio: np.ndarray, on_partial: callable):
+        """Greedy-decode the utterance so far and report it as a partial transcript."""
+        segments = await self._run_whisper(audio, beam_size=1)
+        text = " ".join(segment.text.strip() for segment in segments).strip()
+        if len(text) > 3:
+            await on_partial("Interviewer", text)
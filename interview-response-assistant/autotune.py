@@ -0,0 +1,131 @@
+"""
+Startup auto-tuner for CPU transcription.
+
+Benchmarks Whisper model sizes, compute types and thread counts on this host
+and picks the most accurate configuration whose real-time factor (seconds of
+compute per second of audio) stays under a target. The choice is saved per
+host, so later sessions start with it immediately.
+
+Usage:
+    python autotune.py                       # tune with synthetic audio
+    python autotune.py --sample call.wav     # tune on a real recording (recommended)
+    python autotune.py --target-rtf 0.2 --force
+"""
+
+import argparse
+import json
+import os
+import platform
+import time
+from pathlib import Path
+
+import numpy as np
+from faster_whisper import WhisperModel
+
+TUNING_PATH = Path(__file__).parent / "transcriber_tuning.json"
+
+# Most accurate first; the first model that meets the target wins
+MODELS = ["small.en", "base.en", "tiny.en"]
+COMPUTE_TYPES = ["int8", "int8_float32", "float32"]
+DEFAULT_TUNING = {"model_size": "base.en", "compute_type": "int8", "cpu_threads": 0}
+
+
+def host_fingerprint() -> dict:
+    return {"node": platform.node(), "machine": platform.machine(), "cpus": os.cpu_count()}
+
+
+def thread_counts() -> list[int]:
+    cpus = os.cpu_count() or 4
+    return sorted({max(1, cpus // 4), max(1, cpus // 2), cpus})
+
+
+def synthetic_audio(seconds: float = 10.0, sample_rate: int = 16000) -> np.ndarray:
+    """Voice-band tones with a syllable-rate envelope, for hosts with no sample."""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = 140 + 40 * np.sin(2 * np.pi * 0.5 * t)
+    voice = sum(np.sin(2 * np.pi * k * np.cumsum(pitch) / sample_rate) / k for k in range(1, 6))
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)
+    return (0.1 * voice * envelope).astype("float32")
+
+
+def measure_rtf(model: WhisperModel, audio: np.ndarray, sample_rate: int = 16000, beam_size: int = 3) -> float:
+    """Best-of-two real-time factor for transcribing `audio`."""
+    timings = []
+    for _ in range(2):
+        start = time.perf_counter()
+        segments, _info = model.transcribe(audio, beam_size=beam_size, language="en", vad_filter=False)
+        list(segments)  # decoding is lazy
+        timings.append(time.perf_counter() - start)
+    return min(timings) / (len(audio) / sample_rate)
+
+
+def autotune(audio: np.ndarray, target_rtf: float = 0.3) -> dict:
+    """Return the most accurate configuration meeting `target_rtf`, with the measurements."""
+    results = []
+    for model_size in MODELS:
+        best = None
+        for compute_type in COMPUTE_TYPES:
+            for threads in thread_counts():
+                try:
+                    model = WhisperModel(model_size, device="cpu", compute_type=compute_type, cpu_threads=threads)
+                except ValueError as e:
+                    # Compute type not supported on this CPU
+                    print(f"[autotune] Skipping {model_size}/{compute_type}: {e}")
+                    break
+                rtf = measure_rtf(model, audio)
+                print(f"[autotune] {model_size:9} {compute_type:13} threads={threads:<3} rtf={rtf:.3f}")
+                result = {"model_size": model_size, "compute_type": compute_type, "cpu_threads": threads, "rtf": round(rtf, 3)}
+                results.append(result)
+                if best is None or rtf < best["rtf"]:
+                    best = result
+        if best and best["rtf"] <= target_rtf:
+            return {**best, "target_rtf": target_rtf, "measurements": results}
+
+    # Nothing met the target: fall back to the fastest configuration measured
+    fastest = min(results, key=lambda r: r["rtf"]) if results else DEFAULT_TUNING
+    print(f"[autotune] No configuration met rtf <= {target_rtf}; using the fastest.")
+    return {**fastest, "target_rtf": target_rtf, "measurements": results}
+
+
+def load_tuning() -> dict | None:
+    """Saved tuning for this host, or None if missing or from another machine."""
+    try:
+        saved = json.loads(TUNING_PATH.read_text())
+    except (OSError, json.JSONDecodeError):
+        return None
+    if saved.get("host") != host_fingerprint():
+        return None
+    return saved
+
+
+def ensure_tuning(sample: Path | None = None, target_rtf: float = 0.3, force: bool = False) -> dict:
+    """Load this host's tuning, running the benchmark first if there is none."""
+    saved = None if force else load_tuning()
+    if saved:
+        return saved
+
+    if sample:
+        from replay import load_wav
+        audio = load_wav(sample)
+    else:
+        audio = synthetic_audio()
+    print(f"[autotune] Benchmarking transcription on this host (target rtf <= {target_rtf})...")
+    tuning = autotune(audio, target_rtf)
+    tuning["host"] = host_fingerprint()
+    TUNING_PATH.write_text(json.dumps(tuning, indent=2))
+    print(f"[autotune] Selected {tuning['model_size']} / {tuning['compute_type']} / "
+          f"{tuning['cpu_threads']} threads (rtf {tuning.get('rtf', '?')}), saved to {TUNING_PATH.name}")
+    return tuning
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pick the best Whisper configuration for this host")
+    parser.add_argument("--sample", type=Path, help="WAV recording to benchmark on")
+    parser.add_argument("--target-rtf", type=float, default=0.3, help="Maximum real-time factor")
+    parser.add_argument("--force", action="store_true", help="Re-run even if a saved tuning exists")
+    args = parser.parse_args()
+    ensure_tuning(args.sample, args.target_rtf, args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Non-blocking WebSocket fan-out for the dashboard.
+
+Each client gets a bounded send queue drained by its own writer task, so a
+slow browser tab never holds up other clients or the LLM stream. Messages are
+serialized once per broadcast, and streamed token chunks are coalesced into
+one frame every few tens of milliseconds.
+"""
+
+import asyncio
+import json
+from collections.abc import Callable
+
+from fastapi import WebSocket
+
+
+class ClientConnection:
+    """A dashboard client with its own bounded queue and writer task."""
+
+    def __init__(self, ws: WebSocket, max_queue: int):
+        self.ws = ws
+        # (payload, called once the payload is written to the socket)
+        self.queue: asyncio.Queue[tuple[str, Callable | None]] = asyncio.Queue(maxsize=max_queue)
+        self.closed = False
+        self.task = asyncio.create_task(self._writer())
+
+    def offer(self, payload: str, on_sent: Callable | None = None) -> bool:
+        """Queue a serialized message; False if the client has fallen behind."""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait((payload, on_sent))
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def _writer(self):
+        try:
+            while True:
+                payload, on_sent = await self.queue.get()
+                await self.ws.send_text(payload)
+                if on_sent:
+                    on_sent()
+        except Exception:
+            self.closed = True
+
+    def close(self):
+        self.closed = True
+        self.task.cancel()
+
+
+class Broadcaster:
+    """Serializes each message once and hands it to every client's queue."""
+
+    def __init__(self, coalesce_interval: float = 0.03, max_queue: int = 256):
+        self.coalesce_interval = coalesce_interval
+        self.max_queue = max_queue
+        self.connections: dict[WebSocket, ClientConnection] = {}
+        self._slow: set[WebSocket] = set()  # dropped for falling behind, still open
+        self._pending_chunks: list[str] = []
+        self._on_sent: list[Callable] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+
+    def connect(self, ws: WebSocket):
+        self.connections[ws] = ClientConnection(ws, self.max_queue)
+
+    def disconnect(self, ws: WebSocket) -> bool:
+        """Forget a client; False if the server had dropped it for falling behind."""
+        conn = self.connections.pop(ws, None)
+        if conn:
+            conn.close()
+        if ws in self._slow:
+            self._slow.discard(ws)
+            return False
+        return True
+
+    def send(self, ws: WebSocket, message: dict):
+        """Send to a single client, keeping order with its broadcasts."""
+        conn = self.connections.get(ws)
+        if conn and not conn.offer(json.dumps(message)):
+            self._drop(ws)
+
+    def publish(self, message: dict):
+        """Broadcast a message; any coalesced chunks still pending go first."""
+        self.flush_chunks()
+        self._fanout(json.dumps(message))
+
+    def publish_chunk(self, text: str, on_sent: Callable | None = None):
+        """
+        Buffer a streamed token chunk; buffered chunks go out as one frame.
+
+        `on_sent` is called each time the frame holding this chunk has been
+        written to a client's socket.
+        """
+        self._pending_chunks.append(text)
+        if on_sent:
+            self._on_sent.append(on_sent)
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.coalesce_interval, self.flush_chunks)
+
+    def flush_chunks(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending_chunks:
+            return
+        text = "".join(self._pending_chunks)
+        self._pending_chunks.clear()
+        callbacks, self._on_sent = self._on_sent, []
+
+        def on_sent():
+            for callback in callbacks:
+                callback()
+
+        self._fanout(json.dumps({"type": "response_chunk", "text": text}), on_sent if callbacks else None)
+
+    def _fanout(self, payload: str, on_sent: Callable | None = None):
+        for ws, conn in list(self.connections.items()):
+            if not conn.offer(payload, on_sent):
+                self._drop(ws)
+
+    def _drop(self, ws: WebSocket):
+        """Disconnect a client whose queue is full or whose socket failed."""
+        print("[ws] Dropping slow or closed client.")
+        conn = self.connections.pop(ws, None)
+        if conn:
+            if not conn.closed:
+                self._slow.add(ws)  # queue full; its socket is still fine
+            conn.close()
+        # The dashboard reconnects on close and picks up from the next message
+        asyncio.create_task(self._close_quietly(ws))
+
+    @staticmethod
+    async def _close_quietly(ws: WebSocket):
+        try:
+            await ws.close(code=1013)  # "try again later"
+        except Exception:
+            pass
@@ -0,0 +1,180 @@
+"""
+Token-budgeted rolling memory of the interview conversation.
+
+Recent turns are kept verbatim up to a token budget. Older turns are folded
+into a running summary in the background, so the transcript sent with each
+request stays roughly the same size however long the interview runs. The
+rendered message list is cached and only rebuilt when the memory changes.
+"""
+
+import asyncio
+from collections.abc import Callable
+
+SUGGESTION_SPEAKER = "Suggested Response"
+# Marks a prompt prefix as reusable so the API can serve it from its cache
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English)."""
+    return len(text) // 4 + 1
+
+
+class ConversationMemory:
+    """Recent turns verbatim plus an incrementally updated summary of the rest."""
+
+    def __init__(
+        self,
+        summarize: Callable | None = None,
+        recent_token_budget: int = 1500,
+        summary_batch_tokens: int = 400,
+    ):
+        """
+        Args:
+            summarize: async callable(previous_summary: str, transcript: str) -> str
+                       that folds older turns into the summary. None keeps a
+                       plain list of the interviewer's earlier questions.
+            recent_token_budget: tokens of recent turns kept verbatim.
+            summary_batch_tokens: evicted tokens to collect before summarizing.
+        """
+        self.summarize = summarize
+        self.recent_token_budget = recent_token_budget
+        self.summary_batch_tokens = summary_batch_tokens
+
+        self.turns: list[dict] = []
+        self.summary = ""
+        self._evicted: list[dict] = []  # dropped from turns, not yet summarized
+        self._summarizing_batch: list[dict] = []
+        self._recent_tokens = 0
+        self._summary_task: asyncio.Task | None = None
+        self._messages: list[dict] | None = None  # cached render of the above
+
+    def add(self, speaker: str, text: str) -> dict:
+        entry = {"speaker": speaker, "text": text, "tokens": estimate_tokens(text)}
+        self.turns.append(entry)
+        self._recent_tokens += entry["tokens"]
+        self._enforce_budget()
+        self._messages = None
+        return entry
+
+    def remove(self, entry: dict):
+        """
+        Drop a turn, e.g. a question whose suggestion was cancelled. Matched
+        by identity, so an earlier turn with the same text stays. A turn
+        already being summarized can no longer be taken back.
+        """
+        for turns in (self.turns, self._evicted):
+            at = next((i for i, e in enumerate(turns) if e is entry), None)
+            if at is not None:
+                del turns[at]
+                if turns is self.turns:
+                    self._recent_tokens -= entry["tokens"]
+                self._messages = None
+                return
+
+    def clear(self):
+        if self._summary_task and not self._summary_task.done():
+            self._summary_task.cancel()
+        self.turns.clear()
+        self._evicted.clear()
+        self._summarizing_batch = []
+        self.summary = ""
+        self._recent_tokens = 0
+        self._messages = None
+
+    def _enforce_budget(self):
+        # Always keep the latest exchange, however long it is
+        while self._recent_tokens > self.recent_token_budget and len(self.turns) > 2:
+            entry = self.turns.pop(0)
+            self._recent_tokens -= entry["tokens"]
+            self._evicted.append(entry)
+
+        evicted_tokens = sum(e["tokens"] for e in self._evicted)
+        if evicted_tokens >= self.summary_batch_tokens and not self._summarizing():
+            self._start_summary()
+
+    def _summarizing(self) -> bool:
+        return self._summary_task is not None and not self._summary_task.done()
+
+    def _start_summary(self):
+        batch, self._evicted = self._evicted, []
+        if self.summarize is None:
+            self._fold_without_llm(batch)
+            return
+        try:
+            self._summary_task = asyncio.get_running_loop().create_task(self._summarize_batch(batch))
+        except RuntimeError:
+            # No event loop (synchronous use): fall back to the plain fold
+            self._fold_without_llm(batch)
+
+    async def _summarize_batch(self, batch: list[dict]):
+        self._summarizing_batch = batch
+        transcript = "\n".join(f"{e['speaker']}: {e['text']}" for e in batch)
+        try:
+            self.summary = (await self.summarize(self.summary, transcript)).strip()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[memory] Summary failed, keeping questions only: {e}")
+            self._fold_without_llm(batch)
+        finally:
+            self._summarizing_batch = []
+        self._messages = None
+        # Anything evicted while we were waiting goes into the next round
+        if sum(e["tokens"] for e in self._evicted) >= self.summary_batch_tokens:
+            self._start_summary()
+
+    def _fold_without_llm(self, batch: list[dict]):
+        questions = [e["text"][:160] for e in batch if e["speaker"] != SUGGESTION_SPEAKER]
+        if questions:
+            earlier = "\n".join(f"- {q}" for q in questions)
+            self.summary = f"{self.summary}\n{earlier}".strip()
+        self._messages = None
+
+    def messages(self) -> list[dict]:
+        """
+        The conversation as alternating user/assistant turns.
+
+        Earlier suggestions become assistant turns, so each request only
+        appends to the previous one. The last assistant turn carries a cache
+        breakpoint, letting the API reuse everything up to it. The result is
+        cached; callers must copy before modifying it.
+        """
+        if self._messages is not None:
+            return self._messages
+
+        messages: list[dict] = []
+        earlier = self.summary
+        pending = [
+            e for e in self._summarizing_batch + self._evicted if e["speaker"] != SUGGESTION_SPEAKER
+        ]
+        if pending:
+            # Not summarized yet; keep the questions so nothing goes missing
+            earlier += "\n" + "\n".join(f"- {e['text'][:160]}" for e in pending)
+        if earlier.strip():
+            messages.append({
+                "role": "user",
+                "content": [{"type": "text", "text": f"EARLIER IN THE INTERVIEW (summary):\n{earlier.strip()}"}],
+            })
+
+        for entry in self.turns:
+            if not entry["text"]:
+                continue  # the API rejects empty turns
+            if entry["speaker"] == SUGGESTION_SPEAKER:
+                role, text = "assistant", entry["text"]
+            else:
+                role, text = "user", f"{entry['speaker']}: {entry['text']}"
+            if not messages and role == "assistant":
+                continue  # conversations must open with a user turn
+            if messages and messages[-1]["role"] == role:
+                messages[-1]["content"][0]["text"] += f"\n{text}"
+            else:
+                messages.append({"role": role, "content": [{"type": "text", "text": text}]})
+
+        for message in reversed(messages):
+            if message["role"] == "assistant":
+                message["content"][-1]["cache_control"] = CACHE_CONTROL
+                break
+
+        self._messages = messages
+        return messages
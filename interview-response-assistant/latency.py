@@ -0,0 +1,84 @@
+"""
+Per-utterance latency tracing for the interview pipeline.
+
+A Trace follows one utterance from the end of capture through Whisper, the
+LLM and the WebSocket fan-out, recording a monotonic timestamp at each step.
+The LatencyTracker keeps recent traces and reports p50/p95 per stage, which
+shows whether a slow suggestion came from Whisper, the API or the socket.
+"""
+
+import math
+import time
+from collections import deque
+
+# stage name -> (start mark, end mark)
+STAGES = {
+    "queue": ("capture_end", "transcribe_start"),
+    "whisper": ("transcribe_start", "transcribe_end"),
+    "schedule": ("transcribe_end", "request_start"),
+    "api_first_token": ("request_start", "first_token"),
+    "stream": ("first_token", "last_token"),
+    "socket": ("first_token", "first_broadcast"),
+    "end_to_end": ("capture_end", "first_broadcast"),
+}
+
+# Marks owned by the transcriber, carried over when a speculative trace is adopted
+CAPTURE_MARKS = ("capture_end", "transcribe_start", "transcribe_end")
+
+
+class Trace:
+    """Timestamps for one utterance as it moves through the pipeline."""
+
+    def __init__(self):
+        self.marks: dict[str, float] = {}
+
+    def mark(self, name: str):
+        """Record a step; the first timestamp for a name wins."""
+        self.marks.setdefault(name, time.monotonic())
+
+    def adopt(self, other: "Trace"):
+        """Take capture/transcription marks from the final transcript's trace."""
+        for name in CAPTURE_MARKS:
+            if name in other.marks:
+                self.marks[name] = other.marks[name]
+
+    def durations(self) -> dict[str, float]:
+        """Milliseconds per stage, for stages with both marks recorded."""
+        result = {}
+        for stage, (start, end) in STAGES.items():
+            if start in self.marks and end in self.marks:
+                # Speculative suggestions can start before capture ends
+                result[stage] = max(0.0, (self.marks[end] - self.marks[start]) * 1000)
+        return result
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+class LatencyTracker:
+    """Rolling window of completed traces with per-stage percentiles."""
+
+    def __init__(self, window: int = 200):
+        self.recent: deque[dict[str, float]] = deque(maxlen=window)
+
+    def record(self, trace: Trace) -> dict[str, float]:
+        durations = trace.durations()
+        self.recent.append(durations)
+        return durations
+
+    def summary(self) -> dict[str, dict]:
+        """{stage: {"p50": ms, "p95": ms, "count": n}} over the window."""
+        result = {}
+        for stage in STAGES:
+            values = [d[stage] for d in self.recent if stage in d]
+            if values:
+                result[stage] = {
+                    "p50": round(percentile(values, 50), 1),
+                    "p95": round(percentile(values, 95), 1),
+                    "count": len(values),
+                }
+        return result
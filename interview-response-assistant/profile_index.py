@@ -0,0 +1,120 @@
+"""
+In-process retrieval over the experience profile.
+
+The profile is split into small self-contained chunks (one job highlight,
+achievement, project, pre-written answer, ...) and indexed with BM25 once at
+startup. For each interviewer question only the best-matching chunks are
+injected into the prompt, so prompt size stays small no matter how large
+experience.json grows.
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "can", "do", "does",
+    "for", "from", "have", "how", "i", "in", "is", "it", "me", "my", "of", "on",
+    "or", "so", "that", "the", "this", "to", "was", "we", "what", "when", "where",
+    "which", "who", "why", "with", "you", "your",
+}
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens with stopwords removed and plurals folded."""
+    tokens = []
+    for word in re.findall(r"[a-z0-9$%+]+", text.lower()):
+        if len(word) < 2 or word in STOPWORDS:
+            continue
+        if len(word) > 4 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+@dataclass
+class ProfileChunk:
+    """One retrievable piece of the experience profile."""
+    section: str
+    text: str
+
+    def render(self) -> str:
+        return f"[{self.section}] {self.text}"
+
+
+def chunk_experience(exp: dict) -> list[ProfileChunk]:
+    """Split an experience profile into retrievable chunks."""
+    chunks = []
+
+    for job in exp.get("work_experience", []):
+        header = f"{job.get('role', '')} at {job.get('company', '')} ({job.get('dates', '')})"
+        for highlight in job.get("highlights", []):
+            chunks.append(ProfileChunk("experience", f"{header}: {highlight}"))
+
+    for group, items in exp.get("skills", {}).items():
+        chunks.append(ProfileChunk("skills", f"{group}: {', '.join(items)}"))
+
+    for edu in exp.get("education", []):
+        chunks.append(ProfileChunk("education", ", ".join(str(v) for v in edu.values())))
+
+    for achievement in exp.get("achievements", []):
+        chunks.append(ProfileChunk("achievement", achievement))
+
+    for project in exp.get("projects", []):
+        text = " ".join(str(project.get(k, "")) for k in ("name", "description", "impact"))
+        chunks.append(ProfileChunk("project", text.strip()))
+
+    for value in exp.get("values_and_motivations", []):
+        chunks.append(ProfileChunk("motivation", value))
+
+    for key, answer in exp.get("common_answers", {}).items():
+        question = key.replace("_", " ")
+        chunks.append(ProfileChunk(f"pre-written answer: {question}", answer))
+
+    return chunks
+
+
+class ProfileIndex:
+    """BM25 index over profile chunks, built once and queried per question."""
+
+    def __init__(self, chunks: list[ProfileChunk], k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+
+        # term -> [(chunk index, term frequency)]
+        self.postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        self.doc_lengths: list[int] = []
+        for i, chunk in enumerate(chunks):
+            # Section labels ("why leaving", "handling conflict") say what a
+            # chunk is about better than its body, so they count triple
+            tokens = tokenize(chunk.section) * 3 + tokenize(chunk.text)
+            self.doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                self.postings[term].append((i, tf))
+
+        n = len(chunks)
+        self.avg_length = sum(self.doc_lengths) / n if n else 0.0
+        self.idf = {
+            term: math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    @classmethod
+    def from_experience(cls, exp: dict) -> "ProfileIndex":
+        return cls(chunk_experience(exp))
+
+    def search(self, query: str, top_k: int = 8) -> list[ProfileChunk]:
+        """Return up to `top_k` chunks ranked by BM25 score, best first."""
+        scores: dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for i, tf in self.postings[term]:
+                norm = 1 - self.b + self.b * self.doc_lengths[i] / self.avg_length
+                scores[i] += idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+
+        ranked = sorted(scores, key=scores.get, reverse=True)[:top_k]
+        return [self.chunks[i] for i in ranked]
@@ -0,0 +1,250 @@
+"""
+Offline replay and benchmark harness for the interview assistant.
+
+Feeds recorded WAV files through AudioTranscriber at real-time or accelerated
+speed, answers each transcript with a mock LLM backend, and reports word error
+rate, time-to-transcript and time-to-first-suggestion for every combination of
+the tuning parameters given. Needs no microphone, API key or GPU.
+
+A reference transcript next to each recording (interview1.wav + interview1.txt)
+enables the WER column.
+
+Usage:
+    python replay.py recordings/
+    python replay.py recordings/ --speed 0 --model tiny.en base.en --beam-size 1 3
+    python replay.py call.wav --chunk-duration 0.25 0.5 --silence-threshold 0.01 0.02 --json results.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import re
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+from faster_whisper import WhisperModel
+
+from audio_capture import AudioTranscriber
+
+SAMPLE_RATE = 16000
+
+
+def load_wav(path: Path, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Read a PCM WAV file as mono float32 at `sample_rate`."""
+    with wave.open(str(path), "rb") as wf:
+        channels = wf.getnchannels()
+        width = wf.getsampwidth()
+        rate = wf.getframerate()
+        raw = wf.readframes(wf.getnframes())
+
+    if width == 3:
+        # 24-bit: widen each little-endian sample to the top of an int32
+        padded = np.zeros((len(raw) // 3, 4), dtype=np.uint8)
+        padded[:, 1:] = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        audio = padded.view("<i4").ravel().astype("float32") / float(np.iinfo(np.int32).max)
+    elif width in (1, 2, 4):
+        dtype = {1: np.uint8, 2: np.int16, 4: np.int32}[width]
+        audio = np.frombuffer(raw, dtype=dtype).astype("float32")
+        if width == 1:
+            audio = (audio - 128) / 128
+        else:
+            audio /= float(np.iinfo(dtype).max)
+    else:
+        raise ValueError(f"{path}: unsupported sample width of {width} bytes")
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    if rate != sample_rate:
+        positions = np.arange(0, len(audio), rate / sample_rate)
+        audio = np.interp(positions, np.arange(len(audio)), audio).astype("float32")
+    return audio
+
+
+def _words(text: str) -> list[str]:
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level Levenshtein distance divided by the reference length."""
+    ref, hyp = _words(reference), _words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        current = [i]
+        for j, h in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (r != h)))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+class MockLLM:
+    """Stands in for the Claude API with a fixed time-to-first-token and token rate."""
+
+    def __init__(self, first_token_delay: float = 0.4, token_interval: float = 0.02):
+        self.first_token_delay = first_token_delay
+        self.token_interval = token_interval
+
+    async def generate_response_stream(self, interviewer_text: str):
+        await asyncio.sleep(self.first_token_delay)
+        for word in f"**SUGGESTED RESPONSE**: You asked about {interviewer_text}".split():
+            yield word + " "
+            await asyncio.sleep(self.token_interval)
+
+
+async def replay_file(transcriber: AudioTranscriber, audio: np.ndarray, speed: float, llm: MockLLM) -> dict:
+    """Stream one recording through the transcriber and mock LLM."""
+    transcripts: list[str] = []
+    time_to_transcript: list[float] = []
+    time_to_suggestion: list[float] = []
+    whisper_seconds = 0.0
+    suggestion_tasks = []
+    seen_traces = set()  # an utterance split into several segments shares one trace
+
+    async def suggest(text: str, captured_at: float):
+        async for _chunk in llm.generate_response_stream(text):
+            time_to_suggestion.append((time.monotonic() - captured_at) * 1000)
+            break
+
+    async def on_transcript(speaker: str, text: str, trace):
+        nonlocal whisper_seconds
+        marks = trace.marks
+        transcripts.append(text)
+        if trace in seen_traces:
+            return
+        seen_traces.add(trace)
+        time_to_transcript.append((marks["transcribe_end"] - marks["capture_end"]) * 1000)
+        whisper_seconds += marks["transcribe_end"] - marks["transcribe_start"]
+        # Like the server's scheduler, generation must not hold up the audio loop
+        suggestion_tasks.append(asyncio.create_task(suggest(text, marks["capture_end"])))
+
+    transcriber.start_feed()
+    loop_task = asyncio.create_task(transcriber.transcribe_stream(on_transcript))
+
+    block = int(transcriber.sample_rate * transcriber.chunk_duration)
+    # Trailing silence closes the last utterance the way a pause would
+    padded = np.concatenate([audio, np.zeros(transcriber.sample_rate, dtype="float32")])
+    start = time.monotonic()
+    for i, offset in enumerate(range(0, len(padded), block)):
+        transcriber.feed(padded[offset:offset + block])
+        if speed > 0:
+            delay = start + (i + 1) * transcriber.chunk_duration / speed - time.monotonic()
+            await asyncio.sleep(max(0.0, delay))
+        else:
+            await asyncio.sleep(0)
+
+    while not transcriber.audio_queue.empty():
+        await asyncio.sleep(0.02)
+    transcriber.stop_stream()
+    await loop_task
+    await asyncio.gather(*suggestion_tasks)
+
+    return {
+        "transcript": " ".join(transcripts),
+        "time_to_transcript": time_to_transcript,
+        "time_to_suggestion": time_to_suggestion,
+        "whisper_seconds": whisper_seconds,
+    }
+
+
+def _p(values: list[float], pct: float) -> float | None:
+    return round(float(np.percentile(values, pct)), 1) if values else None
+
+
+async def run_config(config: dict, recordings: list[tuple[Path, np.ndarray, str | None]],
+                     model: WhisperModel, speed: float, llm: MockLLM) -> dict:
+    ttt, ttfs, wers = [], [], []
+    whisper_seconds = audio_seconds = 0.0
+    for path, audio, reference in recordings:
+        transcriber = AudioTranscriber(
+            chunk_duration=config["chunk_duration"],
+            silence_threshold=config["silence_threshold"],
+            beam_size=config["beam_size"],
+            model=model,
+        )
+        result = await replay_file(transcriber, audio, speed, llm)
+        ttt += result["time_to_transcript"]
+        ttfs += result["time_to_suggestion"]
+        whisper_seconds += result["whisper_seconds"]
+        audio_seconds += len(audio) / SAMPLE_RATE
+        if reference is not None:
+            wers.append(word_error_rate(reference, result["transcript"]))
+
+    return {
+        **config,
+        "wer": round(sum(wers) / len(wers), 3) if wers else None,
+        "rtf": round(whisper_seconds / audio_seconds, 3) if audio_seconds else None,
+        "transcript_p50_ms": _p(ttt, 50),
+        "transcript_p95_ms": _p(ttt, 95),
+        "suggestion_p50_ms": _p(ttfs, 50),
+        "suggestion_p95_ms": _p(ttfs, 95),
+        "utterances": len(ttt),
+    }
+
+
+def print_table(rows: list[dict]):
+    columns = list(rows[0].keys())
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(str(row[c]).ljust(widths[c]) for c in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded interviews and benchmark the pipeline")
+    parser.add_argument("inputs", nargs="+", type=Path, help="WAV files or directories of WAV files")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Playback speed (1 = real time, 0 = as fast as possible)")
+    parser.add_argument("--model", nargs="+", default=["base.en"], help="Whisper model sizes")
+    parser.add_argument("--compute-type", nargs="+", default=["int8"], help="CTranslate2 compute types")
+    parser.add_argument("--beam-size", nargs="+", type=int, default=[3])
+    parser.add_argument("--chunk-duration", nargs="+", type=float, default=[0.25])
+    parser.add_argument("--silence-threshold", nargs="+", type=float, default=[0.01])
+    parser.add_argument("--mock-first-token", type=float, default=0.4,
+                        help="Mock LLM time to first token (seconds)")
+    parser.add_argument("--json", type=Path, help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    wav_paths = []
+    for item in args.inputs:
+        wav_paths += sorted(item.glob("*.wav")) if item.is_dir() else [item]
+    if not wav_paths:
+        parser.error("no WAV files found")
+
+    recordings = []
+    for path in wav_paths:
+        reference_path = path.with_suffix(".txt")
+        reference = reference_path.read_text() if reference_path.exists() else None
+        recordings.append((path, load_wav(path), reference))
+    print(f"[replay] {len(recordings)} recording(s), "
+          f"{sum(len(a) for _, a, _ in recordings) / SAMPLE_RATE:.0f}s of audio")
+
+    llm = MockLLM(first_token_delay=args.mock_first_token)
+    rows = []
+    for model_size, compute_type in itertools.product(args.model, args.compute_type):
+        print(f"[replay] Loading Whisper model '{model_size}' ({compute_type})...")
+        model = WhisperModel(model_size, device="cpu", compute_type=compute_type)
+        for beam_size, chunk_duration, silence_threshold in itertools.product(
+            args.beam_size, args.chunk_duration, args.silence_threshold
+        ):
+            config = {
+                "model": model_size,
+                "compute_type": compute_type,
+                "beam_size": beam_size,
+                "chunk_duration": chunk_duration,
+                "silence_threshold": silence_threshold,
+            }
+            print(f"[replay] Running {config}")
+            rows.append(asyncio.run(run_config(config, recordings, model, args.speed, llm)))
+
+    print()
+    print_table(rows)
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=2))
+        print(f"\n[replay] Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,15 +9,53 @@ from pathlib import Path
 
 import anthropic
 
+from answer_cache import AnswerCache
+from conversation_memory import CACHE_CONTROL, SUGGESTION_SPEAKER, ConversationMemory
+from profile_index import ProfileIndex, tokenize
+
+MODEL = "claude-sonnet-4-20250514"
+SUMMARY_MODEL = "claude-3-5-haiku-20241022"
+
+
+def _compact(value) -> str:
+    """Serialize profile data without indentation to keep the prompt small."""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
 
 class ResponseEngine:
     """Generates real-time interview response suggestions using Claude."""
 
-    def __init__(self, experience_path: str = "experience.json"):
+    def __init__(
+        self,
+        experience_path: str = "experience.json",
+        retrieval_top_k: int | None = 8,
+        answer_cache_path: str | None = "answer_cache.json",
+    ):
+        """
+        Args:
+            experience_path: profile JSON, relative to this file.
+            retrieval_top_k: number of profile chunks retrieved per question.
+                             None embeds the whole profile in the system prompt.
+            answer_cache_path: where answers are kept between sessions,
+                               relative to this file. None keeps them in memory.
+        """
         self.client = anthropic.AsyncAnthropic()  # async client for non-blocking streaming
         self.experience = self._load_experience(experience_path)
-        self.conversation_history: list[dict] = []
+        self.memory = ConversationMemory(summarize=self._summarize)
+        self.retrieval_top_k = retrieval_top_k
+        self.profile_index = (
+            ProfileIndex.from_experience(self.experience) if retrieval_top_k else None
+        )
+        self.answer_cache = AnswerCache(
+            path=str(Path(__file__).parent / answer_cache_path) if answer_cache_path else None
+        )
+        self.answer_cache.seed_common_answers(self.experience.get("common_answers", {}))
         self.system_prompt = self._build_system_prompt()
+        # The system prompt never changes during a session, so it is sent as a
+        # cached block and only the transcript turns are billed as fresh input
+        self.system_blocks = [
+            {"type": "text", "text": self.system_prompt, "cache_control": CACHE_CONTROL}
+        ]
 
     def _load_experience(self, path: str) -> dict:
         """Load the user's experience profile from JSON."""
@@ -25,38 +63,59 @@ class ResponseEngine:
         with open(filepath) as f:
             return json.load(f)
 
-    def _build_system_prompt(self) -> str:
+    def _profile_section(self) -> str:
+        """Full profile dump, or a pointer to per-question excerpts when retrieval is on."""
         exp = self.experience
-        return f"""You are a real-time interview coach. You are listening to a live phone interview and providing suggested responses for the candidate.
-
-CANDIDATE PROFILE:
-Name: {exp.get('name', 'N/A')}
-Title: {exp.get('title', 'N/A')}
-Summary: {exp.get('summary', 'N/A')}
-
-WORK EXPERIENCE:
-{json.dumps(exp.get('work_experience', []), indent=2)}
+        if self.profile_index is not None:
+            return """PROFILE DETAILS:
+Work history, skills, achievements, projects, motivations and PRE-WRITTEN ANSWERS relevant to each question are attached to it as RELEVANT PROFILE EXCERPTS. Draw on those first."""
+        return f"""WORK EXPERIENCE:
+{_compact(exp.get('work_experience', []))}
 
 SKILLS:
-{json.dumps(exp.get('skills', {}), indent=2)}
+{_compact(exp.get('skills', {}))}
 
 EDUCATION:
-{json.dumps(exp.get('education', []), indent=2)}
+{_compact(exp.get('education', []))}
 
 KEY ACHIEVEMENTS:
-{json.dumps(exp.get('achievements', []), indent=2)}
+{_compact(exp.get('achievements', []))}
 
 PROJECTS:
-{json.dumps(exp.get('projects', []), indent=2)}
+{_compact(exp.get('projects', []))}
 
 VALUES & MOTIVATIONS:
-{json.dumps(exp.get('values_and_motivations', []), indent=2)}
+{_compact(exp.get('values_and_motivations', []))}
 
 PRE-WRITTEN ANSWERS:
-{json.dumps(exp.get('common_answers', {}), indent=2)}
+{_compact(exp.get('common_answers', {}))}"""
+
+    def _retrieve_excerpts(self, interviewer_text: str) -> str:
+        """Top-k profile chunks for the question, one per line."""
+        query = interviewer_text
+        if len(tokenize(query)) < 3:
+            # Short follow-ups ("can you say more about that?") borrow the
+            # topic of the previous interviewer line
+            previous = [
+                e["text"] for e in self.memory.turns if e["speaker"] != SUGGESTION_SPEAKER
+            ][-1:]
+            query = " ".join(previous + [query])
+        chunks = self.profile_index.search(query, top_k=self.retrieval_top_k)
+        return "\n".join(chunk.render() for chunk in chunks)
+
+    def _build_system_prompt(self) -> str:
+        exp = self.experience
+        return f"""You are a real-time interview coach. You are listening to a live phone interview and providing suggested responses for the candidate.
+
+CANDIDATE PROFILE:
+Name: {exp.get('name', 'N/A')}
+Title: {exp.get('title', 'N/A')}
+Summary: {exp.get('summary', 'N/A')}
+
+{self._profile_section()}
 
 CURRENT INTERVIEW CONTEXT:
-{json.dumps(exp.get('current_interview', {}), indent=2)}
+{_compact(exp.get('current_interview', {}))}
 
 IMPORTANT CONTEXT:
 - Michelle is interviewing for the Lead Client Experience Manager role at Phreesia's Network Solutions (Life Sciences) division
@@ -65,7 +124,7 @@ IMPORTANT CONTEXT:
 - Her KEY NARRATIVE for this role: she's been on the AGENCY/BUYER side for 15 years — she deeply understands what pharma brands and media buyers need from a partner. Now she's ready to bring that perspective to the PLATFORM side at Phreesia. This is a natural career evolution, not a departure.
 - She has deep HCP (Healthcare Professional) marketing expertise across oncology, cardiovascular, infectious disease, and more
 - Her key differentiators: $22M+ budget management, team of 15, Merck/Keytruda portfolio, automation innovation, deep understanding of what agency buyers look for
-- If there are PRE-WRITTEN ANSWERS above that match the question, use those as the foundation but adapt to feel natural
+- If there are PRE-WRITTEN ANSWERS in the profile that match the question, use those as the foundation but adapt to feel natural
 - SALARY: The range is $250K-$270K + equity. If asked, she's comfortable in that range but should keep it brief and redirect to fit/opportunity
 
 YOUR INSTRUCTIONS:
@@ -84,12 +143,78 @@ YOUR INSTRUCTIONS:
 
 Keep responses concise, natural, and confident. She is a senior leader — responses should reflect executive presence."""
 
-    def add_to_history(self, speaker: str, text: str):
+    @property
+    def conversation_history(self) -> list[dict]:
+        """Turns currently kept verbatim (older ones live in the summary)."""
+        return self.memory.turns
+
+    def add_to_history(self, speaker: str, text: str) -> dict:
         """Track conversation history for context."""
-        self.conversation_history.append({"speaker": speaker, "text": text})
-        # Keep last 20 exchanges for context window management
-        if len(self.conversation_history) > 20:
-            self.conversation_history = self.conversation_history[-20:]
+        return self.memory.add(speaker, text)
+
+    def clear_history(self):
+        self.memory.clear()
+
+    async def _summarize(self, previous_summary: str, transcript: str) -> str:
+        """Fold older transcript turns into the running interview summary."""
+        message = await self.client.messages.create(
+            model=SUMMARY_MODEL,
+            max_tokens=300,
+            messages=[
+                {
+                    "role": "user",
+                    "content": f"""Update this running summary of a job interview with the new transcript below. Keep the questions asked, key facts the candidate shared, and any commitments. Reply with the summary only, under 150 words.
+
+CURRENT SUMMARY:
+{previous_summary or "(none yet)"}
+
+NEW TRANSCRIPT:
+{transcript}""",
+                }
+            ],
+        )
+        return message.content[0].text
+
+    def _build_messages(self, interviewer_text: str) -> list[dict]:
+        """
+        The remembered conversation followed by the new question.
+
+        Must be called before the question is added to history.
+        """
+        # Shallow copy: the memory caches its rendered turns between requests
+        messages = list(self.memory.messages())
+
+        prompt = f"""The interviewer just said: "{interviewer_text}"
+
+Provide a suggested response for the candidate to say RIGHT NOW. Be concise and natural."""
+        if self.profile_index is not None:
+            excerpts = self._retrieve_excerpts(interviewer_text)
+            if excerpts:
+                prompt = f"RELEVANT PROFILE EXCERPTS:\n{excerpts}\n\n{prompt}"
+        prompt_block = {"type": "text", "text": prompt}
+        if messages and messages[-1]["role"] == "user":
+            last = messages[-1]
+            messages[-1] = {"role": "user", "content": last["content"] + [prompt_block]}
+        else:
+            messages.append({"role": "user", "content": [prompt_block]})
+        return messages
+
+    @staticmethod
+    def _log_usage(usage):
+        """Print per-request token usage, including prompt cache hits."""
+        cache_read = getattr(usage, "cache_read_input_tokens", 0) or 0
+        cache_write = getattr(usage, "cache_creation_input_tokens", 0) or 0
+        total_in = usage.input_tokens + cache_read + cache_write
+        hit_rate = cache_read / total_in if total_in else 0.0
+        print(
+            f"[response] tokens in={usage.input_tokens} cache_read={cache_read} "
+            f"cache_write={cache_write} out={usage.output_tokens} "
+            f"cache_hit={hit_rate:.0%}"
+        )
+
+    def lookup_cached_answer(self, interviewer_text: str) -> tuple[str, str, float] | None:
+        """Return (matched_question, answer, score) for a recognized question, or None."""
+        return self.answer_cache.lookup(interviewer_text)
 
     async def generate_response(self, interviewer_text: str) -> str:
         """
@@ -97,33 +222,20 @@ Keep responses concise, natural, and confident. She is a senior leader — respo
 
         Returns the full suggestion text with type, response, key points, etc.
         """
+        messages = self._build_messages(interviewer_text)
         self.add_to_history("Interviewer", interviewer_text)
 
-        # Build the conversation context
-        context_lines = []
-        for entry in self.conversation_history:
-            context_lines.append(f"{entry['speaker']}: {entry['text']}")
-        conversation_context = "\n".join(context_lines)
-
         message = await self.client.messages.create(
-            model="claude-sonnet-4-20250514",
+            model=MODEL,
             max_tokens=1024,
-            system=self.system_prompt,
-            messages=[
-                {
-                    "role": "user",
-                    "content": f"""LIVE INTERVIEW TRANSCRIPT SO FAR:
-{conversation_context}
-
-The interviewer just said: "{interviewer_text}"
-
-Provide a suggested response for the candidate to say RIGHT NOW. Be concise and natural.""",
-                }
-            ],
+            system=self.system_blocks,
+            messages=messages,
         )
+        self._log_usage(message.usage)
 
         response_text = message.content[0].text
-        self.add_to_history("Suggested Response", response_text)
+        self.add_to_history(SUGGESTION_SPEAKER, response_text)
+        self.answer_cache.put(interviewer_text, response_text)
         return response_text
 
     async def generate_response_stream(self, interviewer_text: str):
@@ -132,33 +244,27 @@ Provide a suggested response for the candidate to say RIGHT NOW. Be concise and
 
         Yields text chunks as they arrive from the API.
         """
-        self.add_to_history("Interviewer", interviewer_text)
-
-        context_lines = []
-        for entry in self.conversation_history:
-            context_lines.append(f"{entry['speaker']}: {entry['text']}")
-        conversation_context = "\n".join(context_lines)
+        messages = self._build_messages(interviewer_text)
+        question_entry = self.add_to_history("Interviewer", interviewer_text)
 
         full_response = ""
 
-        async with self.client.messages.stream(
-            model="claude-sonnet-4-20250514",
-            max_tokens=1024,
-            system=self.system_prompt,
-            messages=[
-                {
-                    "role": "user",
-                    "content": f"""LIVE INTERVIEW TRANSCRIPT SO FAR:
-{conversation_context}
-
-The interviewer just said: "{interviewer_text}"
-
-Provide a suggested response for the candidate to say RIGHT NOW. Be concise and natural.""",
-                }
-            ],
-        ) as stream:
-            async for text in stream.text_stream:
-                full_response += text
-                yield text
-
-        self.add_to_history("Suggested Response", full_response)
+        try:
+            async with self.client.messages.stream(
+                model=MODEL,
+                max_tokens=1024,
+                system=self.system_blocks,
+                messages=messages,
+            ) as stream:
+                async for text in stream.text_stream:
+                    full_response += text
+                    yield text
+                final_message = await stream.get_final_message()
+        except BaseException:
+            # Cancelled or failed: forget the question so a retry isn't doubled
+            self.memory.remove(question_entry)
+            raise
+
+        self._log_usage(final_message.usage)
+        self.add_to_history(SUGGESTION_SPEAKER, full_response)
+        self.answer_cache.put(interviewer_text, full_response)
@@ -0,0 +1,133 @@
+"""
+Scheduling of suggestion generation so that overlapping questions don't pile up.
+
+Transcript segments are batched for a short window into one question, at most
+one generation runs at a time, and a generation that no longer matches the
+latest speech is cancelled and replaced.
+"""
+
+import asyncio
+import re
+from difflib import SequenceMatcher
+
+from latency import Trace
+
+
+def words(text: str) -> list[str]:
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def similarity(a: str, b: str) -> float:
+    """Word-level similarity between two transcripts (0.0 - 1.0)."""
+    return SequenceMatcher(None, words(a), words(b)).ratio()
+
+
+class ResponseScheduler:
+    """Keeps a single suggestion generating, always for the latest speech."""
+
+    def __init__(self, generate: callable, batch_window: float = 0.4, match_similarity: float = 0.8):
+        """
+        Args:
+            generate: async callable(question: str, trace: Trace) that streams
+                      one suggestion.
+            batch_window: seconds to wait for more segments before dispatching.
+            match_similarity: questions at least this similar count as the
+                              same, so an in-flight generation is kept.
+        """
+        self.generate = generate
+        self.batch_window = batch_window
+        self.match_similarity = match_similarity
+
+        self._segments: list[str] = []  # final segments not yet answered
+        self._batch_handle: asyncio.TimerHandle | None = None
+        self._task: asyncio.Task | None = None
+        self._task_question = ""
+        self._task_segments = 0  # how many of _segments the running task covers
+        self._task_trace: Trace | None = None
+        self._latest_trace: Trace | None = None  # trace of the newest final segment
+        self._answered_question = ""
+
+    def submit(self, text: str, trace: Trace | None = None, immediate: bool = False):
+        """Add a final transcript segment; dispatches after the batch window."""
+        self._segments.append(text)
+        self._latest_trace = trace or Trace()
+        if self._batch_handle is not None:
+            self._batch_handle.cancel()
+            self._batch_handle = None
+        if immediate:
+            self._dispatch()
+        else:
+            loop = asyncio.get_running_loop()
+            self._batch_handle = loop.call_later(self.batch_window, self._dispatch)
+
+    def speculate(self, partial: str) -> bool:
+        """
+        Start early on a stable partial transcript of the utterance in progress.
+
+        Returns True if a new generation was started.
+        """
+        question = " ".join(self._segments + [partial])
+        if self._is_running() and self._matches(question, self._task_question):
+            return False
+        print(f"[speculate] Starting on partial: {partial[:80]}...")
+        self._start(question, len(self._segments), Trace())
+        return True
+
+    def cancel(self):
+        """Drop pending segments and stop the running generation."""
+        if self._batch_handle is not None:
+            self._batch_handle.cancel()
+            self._batch_handle = None
+        self._segments.clear()
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    def _is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def _matches(self, a: str, b: str) -> bool:
+        return bool(a and b) and similarity(a, b) >= self.match_similarity
+
+    def _dispatch(self):
+        self._batch_handle = None
+        question = " ".join(self._segments)
+        if not question:
+            return
+
+        if self._is_running() and self._matches(question, self._task_question):
+            # Already answering this (e.g. a speculative start); adopt it
+            self._task_segments = len(self._segments)
+            self._task_trace.adopt(self._latest_trace)
+            return
+        if not self._is_running() and self._matches(question, self._answered_question):
+            self._segments.clear()
+            return
+
+        if self._is_running():
+            print("[scheduler] Newer speech arrived, superseding the running suggestion.")
+        self._start(question, len(self._segments), self._latest_trace)
+
+    def _start(self, question: str, n_segments: int, trace: Trace):
+        previous = self._task
+        self._task_question = question
+        self._task_segments = n_segments
+        self._task_trace = trace
+        self._task = asyncio.create_task(self._run(question, trace, previous))
+        self._task.add_done_callback(self._on_done)
+
+    async def _run(self, question: str, trace: Trace, previous: asyncio.Task | None):
+        if previous and not previous.done():
+            # Let the old stream close out before the new one starts, so the
+            # dashboard sees its cancellation first
+            previous.cancel()
+            await asyncio.wait([previous])
+        await self.generate(question, trace)
+
+    def _on_done(self, task: asyncio.Task):
+        if task is not self._task or task.cancelled() or task.exception():
+            return
+        self._answered_question = self._task_question
+        del self._segments[: self._task_segments]
+        self._task_segments = 0
+        self._task = None
@@ -15,7 +15,12 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 
 from audio_capture import AudioTranscriber
+from autotune import DEFAULT_TUNING, ensure_tuning, load_tuning
+from broadcaster import Broadcaster
+from latency import LatencyTracker, Trace
 from response_engine import ResponseEngine
+from response_scheduler import ResponseScheduler, similarity, words
+from session_store import SessionStore
 
 app = FastAPI(title="Interview Response Assistant")
 
@@ -25,8 +30,50 @@ app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 
 # Global state
 transcriber: AudioTranscriber | None = None
+transcribe_task: asyncio.Task | None = None
+whisper_model = None  # loaded on first start, reused by later sessions
 response_engine = ResponseEngine()
-active_connections: list[WebSocket] = []
+broadcaster = Broadcaster()
+latency_tracker = LatencyTracker()
+session_store = SessionStore(str(Path(__file__).parent / "sessions.db"))
+
+last_partial = ""
+
+STABLE_PARTIAL_SIMILARITY = 0.9  # consecutive partials this close mean the question has settled
+MIN_SPECULATIVE_WORDS = 4
+
+
+@app.on_event("startup")
+async def warm_answer_cache():
+    """Reuse answers given in earlier interviews."""
+    count = await asyncio.to_thread(session_store.seed_answer_cache, response_engine.answer_cache)
+    if count:
+        print(f"[store] Seeded answer cache with {count} past answers.")
+
+
+@app.on_event("shutdown")
+async def save_answer_cache():
+    """Keep this session's answers for instant reuse next time."""
+    response_engine.answer_cache.save()
+    session_store.close()
+
+
+@app.get("/metrics")
+async def metrics():
+    """p50/p95 latency per pipeline stage over recent utterances, in ms."""
+    return latency_tracker.summary()
+
+
+@app.get("/search")
+async def search(q: str, limit: int = 20, kind: str | None = None):
+    """Full-text search over transcripts and suggestions from all sessions."""
+    return await asyncio.to_thread(session_store.search, q, limit, kind)
+
+
+@app.get("/sessions/{session_id}")
+async def session_log(session_id: str):
+    """Everything recorded in one session, in order."""
+    return await asyncio.to_thread(session_store.session, session_id)
 
 
 @app.get("/")
@@ -36,20 +83,88 @@ async def root():
 
 
 async def broadcast(message: dict):
-    """Send a message to all connected WebSocket clients."""
-    dead = []
-    for ws in active_connections:
-        try:
-            await ws.send_json(message)
-        except Exception:
-            dead.append(ws)
-    for ws in dead:
-        active_connections.remove(ws)
-
-
-async def on_transcript(speaker: str, text: str):
-    """Called when new transcription is available."""
+    """Queue a message for all connected WebSocket clients without waiting on them."""
+    broadcaster.publish(message)
+
+
+async def stream_response(question: str, trace: Trace | None = None):
+    """Generate a suggestion for `question` and stream it to all clients."""
+    trace = trace or Trace()
+    cached = response_engine.lookup_cached_answer(question)
+    if cached:
+        # Show the remembered answer right away; the refined one streams below
+        matched, answer, score = cached
+        print(f"[cache] Hit ({score:.2f}) on: {matched[:80]}")
+        await broadcast({
+            "type": "cached_response",
+            "question": question,
+            "matched": matched,
+            "text": answer,
+        })
+
+    print(f"[response] Generating response for: {question[:80]}...")
+    await broadcast({"type": "response_start", "question": question})
+
+    trace.mark("request_start")
+    chunks = response_engine.generate_response_stream(question)
+    full_response = []
+    try:
+        async for chunk in chunks:
+            full_response.append(chunk)
+            if "first_token" not in trace.marks:
+                trace.mark("first_token")
+                # Coalesced into ~30 ms frames; never waits on slow clients.
+                # Marked when the first client's socket has taken the frame
+                broadcaster.publish_chunk(chunk, on_sent=lambda: trace.mark("first_broadcast"))
+            else:
+                broadcaster.publish_chunk(chunk)
+        trace.mark("last_token")
+        session_store.log_suggestion(question, "".join(full_response))
+        print("[response] Done.")
+    except asyncio.CancelledError:
+        # Close the generator now so the engine rolls back its history entry
+        await chunks.aclose()
+        await broadcast({"type": "response_cancelled"})
+        raise
+    except Exception as e:
+        print(f"[response] ERROR: {e}")
+        await broadcast({"type": "error", "message": f"Response generation failed: {e}"})
+
+    await broadcast({"type": "response_done"})
+
+    durations = latency_tracker.record(trace)
+    session_store.log_latency(durations)
+    print("[latency] " + " ".join(f"{stage}={ms:.0f}ms" for stage, ms in durations.items()))
+    await broadcast({"type": "latency", "last": durations, "summary": latency_tracker.summary()})
+
+
+# At most one suggestion generates at a time, always for the latest speech
+scheduler = ResponseScheduler(stream_response)
+
+
+async def on_partial(speaker: str, text: str):
+    """Called with an in-progress transcript; speculates once it stops changing."""
+    global last_partial
+
+    stable = (
+        len(words(text)) >= MIN_SPECULATIVE_WORDS
+        and (text.rstrip().endswith("?") or similarity(text, last_partial) >= STABLE_PARTIAL_SIMILARITY)
+    )
+    last_partial = text
+    if stable:
+        scheduler.speculate(text)
+
+
+async def on_transcript(speaker: str, text: str, trace: Trace | None = None, immediate: bool = False):
+    """
+    Called when new transcription is available.
+
+    Returns right away: generation is handed to the scheduler so the audio
+    loop never waits on the LLM.
+    """
+    global last_partial
     timestamp = time.time()
+    last_partial = ""
 
     # Broadcast the transcript to all clients
     await broadcast({
@@ -59,30 +174,28 @@ async def on_transcript(speaker: str, text: str):
         "timestamp": timestamp,
     })
 
-    # Generate AI response
-    print(f"[response] Generating response for: {text[:80]}...")
-    await broadcast({"type": "response_start", "question": text})
+    session_store.log_transcript(speaker, text)
+    scheduler.submit(text, trace=trace, immediate=immediate)
 
-    try:
-        async for chunk in response_engine.generate_response_stream(text):
-            await broadcast({"type": "response_chunk", "text": chunk})
-        print("[response] Done.")
-    except Exception as e:
-        print(f"[response] ERROR: {e}")
-        await broadcast({"type": "error", "message": f"Response generation failed: {e}"})
 
-    await broadcast({"type": "response_done"})
+def stop_transcription():
+    """Stop the shared mic capture and its transcription loop, if running."""
+    global transcriber, transcribe_task
+    if transcriber:
+        transcriber.stop_stream()
+        transcriber = None
+    if transcribe_task:
+        transcribe_task.cancel()
+        transcribe_task = None
 
 
 @app.websocket("/ws")
 async def websocket_endpoint(ws: WebSocket):
     """Main WebSocket endpoint for the dashboard."""
-    global transcriber
+    global transcriber, transcribe_task, whisper_model
 
     await ws.accept()
-    active_connections.append(ws)
-
-    transcribe_task = None
+    broadcaster.connect(ws)
 
     try:
         while True:
@@ -92,57 +205,64 @@ async def websocket_endpoint(ws: WebSocket):
 
             if msg_type == "list_devices":
                 devices = AudioTranscriber.list_devices()
-                await ws.send_json({"type": "devices", "devices": devices})
+                broadcaster.send(ws, {"type": "devices", "devices": devices})
 
             elif msg_type == "start":
                 device_index = msg.get("device_index")
-                if transcriber:
-                    transcriber.stop_stream()
+                stop_transcription()
 
+                # Host-specific choice from autotune.py, if one has been saved
+                tuning = load_tuning() or DEFAULT_TUNING
                 transcriber = AudioTranscriber(
-                    model_size="base.en",
+                    model_size=tuning["model_size"],
+                    compute_type=tuning["compute_type"],
+                    cpu_threads=tuning["cpu_threads"],
+                    model=whisper_model,
                     device_index=device_index,
+                    # Optional candidate mic, so their own voice is never transcribed
+                    candidate_device_index=msg.get("candidate_device_index"),
+                    candidate_channel=msg.get("candidate_channel"),
                 )
+                whisper_model = transcriber.model
                 transcriber.start_stream()
 
-                await ws.send_json({"type": "mic_status", "active": True})
+                broadcaster.send(ws, {"type": "mic_status", "active": True})
 
                 # Start transcription loop in the background
                 transcribe_task = asyncio.create_task(
-                    transcriber.transcribe_stream(on_transcript)
+                    transcriber.transcribe_stream(on_transcript, on_partial)
                 )
 
             elif msg_type == "stop":
-                if transcriber:
-                    transcriber.stop_stream()
-                    transcriber = None
-                if transcribe_task:
-                    transcribe_task.cancel()
-                    transcribe_task = None
-                await ws.send_json({"type": "mic_status", "active": False})
+                stop_transcription()
+                scheduler.cancel()
+                broadcaster.send(ws, {"type": "mic_status", "active": False})
 
             elif msg_type == "manual_input":
                 # Manual mode: user types the interviewer's question
                 text = msg.get("text", "").strip()
                 if text:
-                    await on_transcript("Interviewer", text)
+                    await on_transcript("Interviewer", text, immediate=True)
 
             elif msg_type == "clear_history":
-                response_engine.conversation_history.clear()
+                response_engine.clear_history()
+                # Cleared history means a new interview; the old one stays searchable
+                session_store.new_session()
 
     except WebSocketDisconnect:
         pass
     except Exception as e:
         print(f"[ws] Error: {e}")
     finally:
-        if ws in active_connections:
-            active_connections.remove(ws)
-        if transcriber:
-            transcriber.stop_stream()
-        if transcribe_task:
-            transcribe_task.cancel()
+        # Capture is shared by every dashboard. It stops when the last client
+        # leaves, but not when the server dropped a slow client, which
+        # reconnects and carries on
+        if broadcaster.disconnect(ws) and not broadcaster.connections:
+            stop_transcription()
 
 
 if __name__ == "__main__":
     import uvicorn
+    # Benchmarks Whisper once per host; later runs reuse the saved choice
+    ensure_tuning()
     uvicorn.run(app, host="0.0.0.0", port=8765)
@@ -0,0 +1,198 @@
+"""
+Persistent, searchable log of every interview session.
+
+Transcripts, suggestions and latency traces are appended to a SQLite database
+in WAL mode with a full-text index over the text. Writes go through a queue to
+a background thread, so logging never blocks the event loop or the live
+stream; searches use their own connection and can run alongside writes.
+
+Usage:
+    python session_store.py "tell me about a time"   # search past interviews
+"""
+
+import json
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from conversation_memory import SUGGESTION_SPEAKER
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,          -- transcript | suggestion | latency
+    speaker TEXT,
+    question TEXT,
+    text TEXT,
+    data TEXT                    -- JSON, e.g. latency durations
+);
+CREATE INDEX IF NOT EXISTS events_session ON events(session_id, ts);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+    question, text, content='events', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS events_fts_insert AFTER INSERT ON events BEGIN
+    INSERT INTO events_fts(rowid, question, text) VALUES (new.id, new.question, new.text);
+END;
+"""
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path), check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")  # WAL keeps this crash-safe
+    return conn
+
+
+def _fts_query(query: str) -> str:
+    """Quote each word so user input can't be parsed as FTS syntax."""
+    return " ".join('"' + word.replace('"', "") + '"' for word in query.split() if word.strip('"'))
+
+
+class SessionStore:
+    """Append-only event log with full-text search across sessions."""
+
+    def __init__(self, path: str = "sessions.db", flush_interval: float = 0.5):
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.session_id = ""
+        self._queue: queue.Queue[tuple | None] = queue.Queue()
+
+        conn = _connect(self.path)
+        conn.executescript(SCHEMA)
+        try:
+            conn.executescript(FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: search falls back to LIKE
+            print("[store] FTS5 unavailable, using plain text search.")
+            self.has_fts = False
+        conn.close()
+
+        self._read_conn = _connect(self.path)
+        self._read_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+        self.new_session()
+
+    def new_session(self) -> str:
+        """Start tagging events with a fresh session id."""
+        self.session_id = time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+        return self.session_id
+
+    # -- writes (non-blocking) ------------------------------------------------
+
+    def _append(self, kind: str, speaker: str | None = None, question: str | None = None,
+                text: str | None = None, data: dict | None = None):
+        self._queue.put((
+            self.session_id, time.time(), kind, speaker, question, text,
+            json.dumps(data) if data is not None else None,
+        ))
+
+    def log_transcript(self, speaker: str, text: str):
+        self._append("transcript", speaker=speaker, text=text)
+
+    def log_suggestion(self, question: str, answer: str):
+        self._append("suggestion", speaker=SUGGESTION_SPEAKER, question=question, text=answer)
+
+    def log_latency(self, durations: dict[str, float]):
+        self._append("latency", data=durations)
+
+    def _write_loop(self):
+        conn = _connect(self.path)
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            # Group whatever arrives within the flush interval into one commit
+            deadline = time.monotonic() + self.flush_interval
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if None in batch:
+                running = False
+                batch = [row for row in batch if row is not None]
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO events (session_id, ts, kind, speaker, question, text, data) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        batch,
+                    )
+            except sqlite3.Error as e:
+                print(f"[store] Dropped {len(batch)} events: {e}")
+        conn.close()
+
+    def close(self):
+        """Flush pending writes and stop the writer thread."""
+        self._queue.put(None)
+        self._writer.join(timeout=5)
+        self._read_conn.close()
+
+    # -- reads -----------------------------------------------------------------
+
+    def _query(self, sql: str, params: tuple) -> list[dict]:
+        with self._read_lock:
+            return [dict(row) for row in self._read_conn.execute(sql, params)]
+
+    def search(self, query: str, limit: int = 20, kind: str | None = None) -> list[dict]:
+        """Best-matching transcripts and suggestions across all sessions."""
+        match = _fts_query(query)
+        if not match:
+            return []
+        kind_filter = "AND e.kind = ?" if kind else "AND e.kind != 'latency'"
+        params = (kind,) if kind else ()
+        if self.has_fts:
+            return self._query(
+                "SELECT e.id, e.session_id, e.ts, e.kind, e.speaker, e.question, e.text, "
+                "snippet(events_fts, 1, '[', ']', '...', 12) AS snippet "
+                "FROM events_fts JOIN events e ON e.id = events_fts.rowid "
+                f"WHERE events_fts MATCH ? {kind_filter} ORDER BY rank LIMIT ?",
+                (match, *params, limit),
+            )
+        return self._query(
+            "SELECT e.id, e.session_id, e.ts, e.kind, e.speaker, e.question, e.text, e.text AS snippet "
+            f"FROM events e WHERE (e.text LIKE ? OR e.question LIKE ?) {kind_filter} "
+            "ORDER BY e.ts DESC LIMIT ?",
+            (f"%{query}%", f"%{query}%", *params, limit),
+        )
+
+    def session(self, session_id: str) -> list[dict]:
+        """Every event of one session in order."""
+        return self._query(
+            "SELECT ts, kind, speaker, question, text, data FROM events WHERE session_id = ? ORDER BY ts, id",
+            (session_id,),
+        )
+
+    def recent_suggestions(self, limit: int = 256) -> list[tuple[str, str]]:
+        """(question, answer) pairs from past sessions, oldest first."""
+        rows = self._query(
+            "SELECT question, text FROM events WHERE kind = 'suggestion' ORDER BY ts DESC LIMIT ?",
+            (limit,),
+        )
+        return [(row["question"], row["text"]) for row in reversed(rows)]
+
+    def seed_answer_cache(self, cache) -> int:
+        """Warm an AnswerCache with answers given in earlier interviews."""
+        pairs = self.recent_suggestions(cache.max_entries)
+        for question, answer in pairs:
+            cache.put(question, answer)
+        return len(pairs)
+
+
+if __name__ == "__main__":
+    store = SessionStore(str(Path(__file__).parent / "sessions.db"))
+    for hit in store.search(" ".join(sys.argv[1:])):
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(hit["ts"]))
+        print(f"{when}  [{hit['session_id']}] {hit['speaker']}: {hit['snippet']}")
+    store.close()
@@ -0,0 +1,37 @@
+from answer_cache import AnswerCache
+from session_store import SessionStore
+
+FOLLOW_UP = "Can you tell me more about that?"
+
+
+def test_follow_ups_are_not_cached(tmp_path):
+    path = tmp_path / "answer_cache.json"
+    cache = AnswerCache(path=str(path))
+    cache.put(FOLLOW_UP, "More about the migration project...")
+    cache.put("Tell me about a time you failed", "At my last job...")
+    assert cache.lookup("Tell me more") is None
+
+    cache.save()
+    assert AnswerCache(path=str(path)).lookup("Tell me about a time you failed") is not None
+    assert FOLLOW_UP not in path.read_text()
+
+
+def test_follow_ups_from_past_sessions_are_not_seeded(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.db"), flush_interval=0.01)
+    store.log_suggestion(FOLLOW_UP, "More about the migration project...")
+    store.close()
+
+    store = SessionStore(str(tmp_path / "sessions.db"))
+    cache = AnswerCache()
+    store.seed_answer_cache(cache)
+    store.close()
+    assert cache.lookup("Tell me more") is None
+
+
+def test_short_follow_ups_do_not_match_seeds():
+    cache = AnswerCache()
+    cache.seed_common_answers({"why_phreesia": "Phreesia's mission...", "tell_me_about_yourself": "I lead..."})
+    assert cache.lookup("Why?") is None
+    assert cache.lookup("And why?") is None
+    assert cache.lookup("Why Phreesia?")[0] == "why phreesia"
+    assert cache.lookup("Tell me about yourself")[0] == "tell me about yourself"
@@ -0,0 +1,156 @@
+"""
+Lightweight frame-level voice activity detection.
+
+Runs ahead of Whisper so that only speech reaches the model. Audio is split
+into short frames, each frame is classified with an energy + zero-crossing
+test against an adaptive noise floor, and consecutive speech frames are
+grouped into utterances that end at natural pauses.
+"""
+
+from collections import deque
+
+import numpy as np
+
+
+class VoiceActivityDetector:
+    """Segments a stream of audio samples into speech-only utterances."""
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 30,
+        energy_threshold: float = 0.01,
+        noise_ratio: float = 3.0,
+        zcr_max: float = 0.35,
+        speech_pad_ms: int = 200,
+        min_silence_ms: int = 500,
+        min_speech_ms: int = 250,
+        max_utterance_s: float = 15.0,
+    ):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_len = int(sample_rate * frame_ms / 1000)
+        self.energy_threshold = energy_threshold
+        self.noise_ratio = noise_ratio
+        self.zcr_max = zcr_max
+        self.pad_frames = max(1, speech_pad_ms // frame_ms)
+        self.min_silence_frames = max(1, min_silence_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.max_utterance_frames = int(max_utterance_s * 1000 / frame_ms)
+
+        self.noise_floor = energy_threshold / noise_ratio
+        self._remainder = np.array([], dtype="float32")
+        self._preroll: deque[np.ndarray] = deque(maxlen=self.pad_frames)
+        self._reset_utterance()
+
+    def _reset_utterance(self):
+        self._frames: list[np.ndarray] = []
+        self._energies: list[float] = []
+        self._speech_frames = 0
+        self._trailing_silence = 0
+        self._in_speech = False
+
+    def _classify(self, frames: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return (rms, is_speech) for a (n_frames, frame_len) block."""
+        rms = np.sqrt(np.mean(frames**2, axis=1))
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / self.frame_len
+        threshold = max(self.energy_threshold, self.noise_floor * self.noise_ratio)
+        # Broadband hiss has a very high crossing rate; voiced speech does not
+        is_speech = (rms >= threshold) & (zcr <= self.zcr_max)
+        return rms, is_speech
+
+    def _update_noise_floor(self, rms: float):
+        """Track background level with a slow exponential average."""
+        self.noise_floor = 0.95 * self.noise_floor + 0.05 * rms
+
+    def process(self, audio: np.ndarray) -> list[np.ndarray]:
+        """
+        Feed new samples and return any utterances completed by them.
+
+        Partial frames are carried over to the next call, so callers can
+        pass blocks of any size.
+        """
+        audio = np.concatenate([self._remainder, audio.astype("float32", copy=False)])
+        n_frames = len(audio) // self.frame_len
+        self._remainder = audio[n_frames * self.frame_len:]
+        if n_frames == 0:
+            return []
+
+        frames = audio[: n_frames * self.frame_len].reshape(n_frames, self.frame_len)
+        rms, is_speech = self._classify(frames)
+
+        utterances = []
+        for frame, energy, speech in zip(frames, rms, is_speech):
+            if not self._in_speech:
+                if speech:
+                    self._in_speech = True
+                    self._frames = list(self._preroll)
+                    self._energies = [0.0] * len(self._frames)
+                    self._preroll.clear()
+                else:
+                    self._update_noise_floor(float(energy))
+                    self._preroll.append(frame)
+                    continue
+
+            self._frames.append(frame)
+            self._energies.append(float(energy))
+            if speech:
+                self._speech_frames += 1
+                self._trailing_silence = 0
+            else:
+                self._trailing_silence += 1
+
+            if self._trailing_silence >= self.min_silence_frames:
+                utterance = self._finish(trim=self._trailing_silence - self.pad_frames)
+                if utterance is not None:
+                    utterances.append(utterance)
+            elif len(self._frames) >= self.max_utterance_frames:
+                utterances.append(self._split_at_pause())
+
+        return utterances
+
+    def _finish(self, trim: int = 0) -> np.ndarray | None:
+        """Close the current utterance, dropping it if it is too short."""
+        frames = self._frames[: len(self._frames) - trim] if trim > 0 else self._frames
+        keep = self._speech_frames >= self.min_speech_frames
+        self._reset_utterance()
+        if not keep or not frames:
+            return None
+        return np.concatenate(frames)
+
+    def _split_at_pause(self) -> np.ndarray:
+        """
+        Cut an over-long utterance at its quietest frame in the last second,
+        which is usually a gap between words, and keep the tail buffered.
+        """
+        window = min(len(self._frames) - 1, 1000 // self.frame_ms)
+        start = len(self._frames) - window
+        cut = start + int(np.argmin(self._energies[start:]))
+
+        head = np.concatenate(self._frames[:cut])
+        tail_frames = self._frames[cut:]
+        tail_energies = self._energies[cut:]
+        self._reset_utterance()
+        self._in_speech = True
+        self._frames = tail_frames
+        self._energies = tail_energies
+        self._speech_frames = len(tail_frames)
+        return head
+
+    @property
+    def utterance_duration(self) -> float:
+        """Seconds of audio buffered for the utterance in progress."""
+        return len(self._frames) * self.frame_ms / 1000 if self._in_speech else 0.0
+
+    def current_speech(self) -> np.ndarray | None:
+        """Snapshot of the utterance in progress, for partial transcription."""
+        if not self._in_speech or not self._frames:
+            return None
+        return np.concatenate(self._frames)
+
+    def flush(self) -> np.ndarray | None:
+        """Return whatever speech is still buffered (e.g. when capture stops)."""
+        if not self._in_speech:
+            return None
+        return self._finish(trim=max(0, self._trailing_silence - self.pad_frames))